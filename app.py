@@ -1,9 +1,14 @@
-from flask import Flask, jsonify, render_template, request
+from flask import Flask, jsonify, render_template, request, stream_with_context
 import os
 import json
 import logging
-from datetime import datetime, timedelta
-from mlb_prediction_api import MLBPredictionAPI
+from datetime import datetime, timedelta, timezone
+import http_session
+import serializer
+import data_sources
+import tiered_cache
+from mlb_prediction_api import MLBPredictionAPI, parse_prediction_query
+from prefetch_scheduler import PrefetchScheduler
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, 
@@ -17,6 +22,11 @@ app = Flask(__name__)
 # Initialize MLB prediction API
 mlb_prediction_api = MLBPredictionAPI()
 
+# Keep predictions warm for the dates /api/dates advertises
+prefetch_scheduler = PrefetchScheduler(mlb_prediction_api)
+if os.environ.get('MLB_PREFETCH_ENABLED', 'true').lower() == 'true':
+    prefetch_scheduler.start()
+
 @app.route('/')
 def index():
     """
@@ -24,6 +34,49 @@ def index():
     """
     return render_template('index.html')
 
+def predictions_response(predictions, stale, market=None, query=None):
+    """
+    Build a cacheable response for a predictions snapshot
+    
+    Answers 304 when the client already has this snapshot, and serves the
+    stored gzip body to clients that accept it.
+    
+    Args:
+        predictions: Predictions snapshot from get_predictions_snapshot
+        stale: Whether the snapshot is past its lifetime
+        market: Market key for a single-market response, or None for all
+        query: PredictionQuery from the request's filter parameters, if any
+    """
+    etag = mlb_prediction_api.get_etag(predictions, market, query, stale)
+    age, max_age = mlb_prediction_api.get_max_age(predictions, stale)
+    
+    timestamp = predictions.get('metadata', {}).get('timestamp')
+    last_modified = datetime.fromtimestamp(int(timestamp), timezone.utc) if timestamp else None
+    
+    if request.if_none_match:
+        not_modified = request.if_none_match.contains_weak(etag)
+    else:
+        not_modified = bool(last_modified and request.if_modified_since and last_modified <= request.if_modified_since)
+    
+    if not_modified:
+        response = app.response_class(status=304)
+    else:
+        compressed = request.accept_encodings['gzip'] > 0
+        body = mlb_prediction_api.get_response_body(predictions, market, compressed, query, stale)
+        response = app.response_class(body, mimetype='application/json')
+        if compressed:
+            response.headers['Content-Encoding'] = 'gzip'
+    
+    response.set_etag(etag, weak=True)
+    response.last_modified = last_modified
+    response.cache_control.public = True
+    response.cache_control.max_age = max_age
+    response.vary.add('Accept-Encoding')
+    response.headers['Age'] = str(age)
+    response.headers['X-Predictions-Stale'] = 'true' if stale else 'false'
+    
+    return response
+
 @app.route('/api/predictions', methods=['GET'])
 def get_predictions():
     """
@@ -34,14 +87,54 @@ def get_predictions():
         date_str = request.args.get('date')
         force_refresh = request.args.get('refresh', 'false').lower() == 'true'
         
+        try:
+            query = parse_prediction_query(request.args)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
         # Get predictions
-        predictions = mlb_prediction_api.get_all_predictions(force_refresh, date_str)
+        predictions, stale = mlb_prediction_api.get_predictions_snapshot(force_refresh, date_str)
         
-        return jsonify(predictions)
+        return predictions_response(predictions, stale, query=query)
     except Exception as e:
         logger.error(f"Error getting predictions: {e}")
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/predictions/stream', methods=['GET'])
+def stream_predictions():
+    """
+    Stream predictions for a date one game at a time
+    
+    Sends NDJSON by default, or Server-Sent Events with format=sse or
+    Accept: text/event-stream. Each game is sent as soon as it is scored,
+    and the sorted market lists and metadata come last.
+    """
+    date_str = request.args.get('date')
+    force_refresh = request.args.get('refresh', 'false').lower() == 'true'
+    use_sse = request.args.get('format') == 'sse' or (
+        request.args.get('format') is None and request.accept_mimetypes.best == 'text/event-stream')
+    
+    def encode(event, key, data):
+        line = serializer.dumps({'type': event, key: data}, sort_keys=True)
+        if use_sse:
+            return b'event: ' + event.encode('utf-8') + b'\ndata: ' + line + b'\n\n'
+        return line + b'\n'
+    
+    def generate():
+        try:
+            for event, data in mlb_prediction_api.stream_predictions(date_str, force_refresh):
+                yield encode(event, 'game' if event == 'game' else 'predictions', data)
+        except Exception as e:
+            logger.error(f"Error streaming predictions: {e}")
+            yield encode('error', 'error', str(e))
+    
+    response = app.response_class(stream_with_context(generate()),
+                                  mimetype='text/event-stream' if use_sse else 'application/x-ndjson')
+    response.cache_control.no_cache = True
+    # Keep proxies such as nginx from buffering the stream
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
 @app.route('/api/predictions/<prediction_type>', methods=['GET'])
 def get_predictions_by_type(prediction_type):
     """
@@ -64,23 +157,35 @@ def get_predictions_by_type(prediction_type):
         if not prediction_key:
             return jsonify({'error': 'Invalid prediction type'}), 400
         
-        # Get predictions
-        all_predictions = mlb_prediction_api.get_all_predictions(force_refresh, date_str)
-        
-        # Get predictions for the specified type
-        predictions = all_predictions.get(prediction_key, [])
+        try:
+            query = parse_prediction_query(request.args)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
-        # Add metadata
-        result = {
-            'predictions': predictions,
-            'metadata': all_predictions.get('metadata', {})
-        }
+        # Get predictions; the response lists the specified type with metadata
+        all_predictions, stale = mlb_prediction_api.get_predictions_snapshot(force_refresh, date_str)
         
-        return jsonify(result)
+        return predictions_response(all_predictions, stale, prediction_key, query)
     except Exception as e:
         logger.error(f"Error getting predictions by type: {e}")
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/games/<game_id>', methods=['GET'])
+def get_game(game_id):
+    """
+    Get the latest predictions for a single game
+    """
+    try:
+        entry = mlb_prediction_api.get_game(game_id)
+        
+        if entry is None:
+            return jsonify({'error': 'Game not found'}), 404
+        
+        return jsonify(entry)
+    except Exception as e:
+        logger.error(f"Error getting game {game_id}: {e}")
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/api/dates', methods=['GET'])
 def get_available_dates():
     """
@@ -137,7 +242,11 @@ def get_status():
             'status': 'online',
             'current_time': current_time,
             'last_refresh_time': last_refresh_time,
-            'version': '1.0.0'
+            'version': '1.0.0',
+            'http': http_session.get_stats(),
+            'cache': tiered_cache.get_stats(),
+            'sources': data_sources.get_stats(),
+            'prefetch': prefetch_scheduler.get_status()
         })
     except Exception as e:
         logger.error(f"Error getting status: {e}")
@@ -0,0 +1,574 @@
+import queue
+import asyncio
+import logging
+import threading
+import time
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+import http_session
+
+logger = logging.getLogger('async_data_engine')
+
+
+class TransportResponse:
+    """
+    Minimal HTTP response handed back to lookup generators
+    """
+
+    def __init__(self, status_code, data):
+        """
+        Initialize the response
+
+        Args:
+            status_code: HTTP status code
+            data: Decoded JSON body
+        """
+        self.status_code = status_code
+        self.data = data
+
+    def json(self):
+        """Return the decoded JSON body"""
+        return self.data
+
+
+class ThreadedTransport:
+    """
+    Async transport that runs the shared pooled HTTP session in worker threads
+    """
+
+    async def get(self, url, **kwargs):
+        """
+        Make a GET request without blocking the event loop
+
+        Args:
+            url: Request URL
+            **kwargs: Extra arguments passed to http_session.get
+
+        Returns:
+            HTTP response
+        """
+        return await asyncio.to_thread(http_session.get, url, **kwargs)
+
+
+class LocalTransport:
+    """
+    Stand-in transport serving canned responses, for tests and offline runs
+    """
+
+    def __init__(self, routes, delay=0.0):
+        """
+        Initialize the local transport
+
+        Args:
+            routes: List of (url_fragment, handler) pairs. The first route whose
+                fragment appears in the URL answers the request. A handler is
+                either the JSON body to return or a callable taking the URL and
+                returning the body or a (status_code, body) tuple.
+            delay: Simulated round-trip time in seconds
+        """
+        self.routes = routes
+        self.delay = delay
+        self.requests = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def get(self, url, **kwargs):
+        """
+        Answer a GET request from the configured routes
+
+        Args:
+            url: Request URL
+            **kwargs: Ignored transport arguments
+
+        Returns:
+            TransportResponse (404 if no route matches)
+        """
+        self.requests.append(url)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+
+        try:
+            if self.delay:
+                await asyncio.sleep(self.delay)
+
+            for fragment, handler in self.routes:
+                if fragment in url:
+                    result = handler(url) if callable(handler) else handler
+                    if isinstance(result, tuple):
+                        return TransportResponse(*result)
+                    return TransportResponse(200, result)
+
+            return TransportResponse(404, {})
+        finally:
+            self.in_flight -= 1
+
+
+class AsyncSlateEngine:
+    """
+    Asyncio engine that fetches everything a date's predictions need at once
+    """
+
+    def __init__(self, mlb_stats_api, transport=None, max_concurrency=16):
+        """
+        Initialize the engine
+
+        Args:
+            mlb_stats_api: MLBStatsAPI whose cache, lookups and parsing are reused
+            transport: Async transport (defaults to ThreadedTransport)
+            max_concurrency: Maximum requests in flight for one slate
+        """
+        self.mlb_stats_api = mlb_stats_api
+        self.transport = transport or ThreadedTransport()
+        self.max_concurrency = max_concurrency
+
+    def build_slate(self, date_str, force_refresh=False):
+        """
+        Fetch a slate from synchronous code
+
+        Args:
+            date_str: Date string in format YYYY-MM-DD
+            force_refresh: Force refresh of the schedule and pitcher data
+
+        Returns:
+            Dictionary with 'games' (as returned by get_games_for_date) and
+            'team_stats' (team name to team stats)
+        """
+        api = self.mlb_stats_api
+        cache_key = f"games_{date_str}"
+
+        if not force_refresh and api.get_cached_data(cache_key):
+            return self.run_slate(date_str, force_refresh)
+
+        # Only one worker fetches a date's games; the others wait and reuse them
+        with api.cache.fill_lock(cache_key):
+            return self.run_slate(date_str, force_refresh)
+
+    def run_slate(self, date_str, force_refresh=False):
+        """
+        Run fetch_slate to completion from synchronous code
+
+        Args:
+            date_str: Date string in format YYYY-MM-DD
+            force_refresh: Force refresh of the schedule and pitcher data
+
+        Returns:
+            Dictionary with 'games' and 'team_stats'
+        """
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self.fetch_slate(date_str, force_refresh))
+
+        # Already inside an event loop, so run the slate on its own thread
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            return executor.submit(contextvars.copy_context().run, asyncio.run,
+                                   self.fetch_slate(date_str, force_refresh)).result()
+
+    async def fetch_slate(self, date_str, force_refresh=False):
+        """
+        Fetch the schedule, pitcher ERAs and team stats for a date
+
+        Pitcher and team lookups start as soon as the schedule arrives and run
+        concurrently. Identical URLs (such as the team directory) are fetched
+        once per slate.
+
+        Args:
+            date_str: Date string in format YYYY-MM-DD
+            force_refresh: Force refresh of the schedule and pitcher data
+
+        Returns:
+            Dictionary with 'games' and 'team_stats'
+        """
+        fetch = self.make_fetcher()
+        start_time = time.time()
+
+        games = None
+        if not force_refresh:
+            games = self.mlb_stats_api.get_cached_data(f"games_{date_str}")
+
+        if games:
+            team_stats = await self.fetch_team_stats(self.get_slate_teams(games), fetch)
+        else:
+            games, team_stats = await self.fetch_games(date_str, force_refresh, fetch, start_time)
+
+        logger.info(f"Built slate for {date_str} with {len(games)} games in {time.time() - start_time:.3f}s")
+
+        return {'games': games, 'team_stats': team_stats}
+
+    def iter_slate(self, date_str, force_refresh=False):
+        """
+        Run stream_slate on its own thread and yield its games from synchronous code
+
+        The slate is fetched to the end (and its games cached) even if the
+        caller stops early.
+
+        Args:
+            date_str: Date string in format YYYY-MM-DD
+            force_refresh: Force refresh of the schedule and pitcher data
+
+        Yields:
+            Tuples of (index, game, team_stats) as from stream_slate
+        """
+        items = queue.Queue()
+        done = object()
+
+        async def produce():
+            try:
+                async for item in self.stream_slate(date_str, force_refresh):
+                    items.put(item)
+            except Exception as e:
+                items.put(e)
+            finally:
+                items.put(done)
+
+        threading.Thread(target=asyncio.run, args=(produce(),), name=f"stream-slate-{date_str}", daemon=True).start()
+
+        while True:
+            item = items.get()
+            if item is done:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+
+    async def stream_slate(self, date_str, force_refresh=False):
+        """
+        Fetch a slate, yielding each game as soon as its own inputs resolve
+
+        Every pitcher and team lookup starts when the schedule arrives, as in
+        fetch_slate, but a game does not wait for the rest of the slate. Once
+        all games are resolved they are cached in schedule order.
+
+        Args:
+            date_str: Date string in format YYYY-MM-DD
+            force_refresh: Force refresh of the schedule and pitcher data
+
+        Yields:
+            Tuples of (index, game, team_stats), where index is the game's
+            position in the schedule and team_stats holds its two teams
+        """
+        api = self.mlb_stats_api
+        cache_key = f"games_{date_str}"
+        fetch = self.make_fetcher()
+        start_time = time.time()
+
+        games = None
+        if not force_refresh:
+            games = api.get_cached_data(cache_key)
+
+        if games:
+            team_stats = await self.fetch_team_stats(self.get_slate_teams(games), fetch)
+            for index, game in enumerate(games):
+                yield index, game, team_stats
+            return
+
+        scheduled_games = None
+        try:
+            response = await fetch(api.get_schedule_url(date_str), timeout=10)
+            schedule_time = time.time()
+
+            if response.status_code == 200:
+                scheduled_games = api.parse_schedule(response.json())
+                if not scheduled_games:
+                    logger.warning(f"No games found for date {date_str}, using sample data")
+            else:
+                logger.error(f"Error getting games for date {date_str}: HTTP {response.status_code}")
+        except Exception as e:
+            logger.error(f"Error getting games for date {date_str}: {e}")
+
+        if not scheduled_games:
+            games = api.get_sample_games_for_date(date_str)
+            api.save_to_cache(cache_key, games)
+            team_stats = await self.fetch_team_stats(self.get_slate_teams(games), fetch)
+            for index, game in enumerate(games):
+                yield index, game, team_stats
+            return
+
+        pitcher_tasks = self.start_pitcher_lookups(api.get_slate_pitchers(scheduled_games), force_refresh, fetch,
+                                                   api.get_slate_pitcher_ids(scheduled_games))
+        team_tasks = self.start_team_lookups(self.get_slate_teams(scheduled_games), fetch)
+
+        async def resolve(index, scheduled_game):
+            pitchers = [(scheduled_game['home_team'], scheduled_game['home_pitcher']),
+                        (scheduled_game['away_team'], scheduled_game['away_pitcher'])]
+            teams = [scheduled_game['home_team'], scheduled_game['away_team']]
+
+            era_data = dict(zip(pitchers, await asyncio.gather(*(pitcher_tasks[pitcher] for pitcher in pitchers))))
+            team_stats = dict(zip(teams, await asyncio.gather(*(team_tasks[team] for team in teams))))
+
+            return index, api.build_games([scheduled_game], era_data)[0], team_stats
+
+        games = [None] * len(scheduled_games)
+        for next_game in asyncio.as_completed([resolve(index, game) for index, game in enumerate(scheduled_games)]):
+            index, game, team_stats = await next_game
+            games[index] = game
+            yield index, game, team_stats
+
+        api.record_fetch_timings(date_str, start_time, schedule_time, time.time(), len(pitcher_tasks), 'async-stream')
+        api.save_to_cache(cache_key, games)
+        logger.info(f"Streamed slate for {date_str} with {len(games)} games in {time.time() - start_time:.3f}s")
+
+    async def fetch_games(self, date_str, force_refresh, fetch, start_time):
+        """
+        Fetch a date's schedule, then its pitchers and teams concurrently
+
+        Args:
+            date_str: Date string in format YYYY-MM-DD
+            force_refresh: Force refresh of pitcher data
+            fetch: Per-slate fetch function from make_fetcher
+            start_time: Time the slate fetch started
+
+        Returns:
+            Tuple of (games, team_stats)
+        """
+        api = self.mlb_stats_api
+        cache_key = f"games_{date_str}"
+
+        try:
+            response = await fetch(api.get_schedule_url(date_str), timeout=10)
+            schedule_time = time.time()
+
+            if response.status_code == 200:
+                scheduled_games = api.parse_schedule(response.json())
+
+                era_data, team_stats = await asyncio.gather(
+                    self.fetch_pitcher_eras(api.get_slate_pitchers(scheduled_games), force_refresh, fetch,
+                                            api.get_slate_pitcher_ids(scheduled_games)),
+                    self.fetch_team_stats(self.get_slate_teams(scheduled_games), fetch)
+                )
+                pitcher_time = time.time()
+
+                games = api.build_games(scheduled_games, era_data)
+                api.record_fetch_timings(date_str, start_time, schedule_time, pitcher_time, len(era_data), 'async')
+
+                if games:
+                    api.save_to_cache(cache_key, games)
+                    return games, team_stats
+
+                logger.warning(f"No games found for date {date_str}, using sample data")
+            else:
+                logger.error(f"Error getting games for date {date_str}: HTTP {response.status_code}")
+        except Exception as e:
+            logger.error(f"Error getting games for date {date_str}: {e}")
+
+        # Use sample data as fallback
+        games = api.get_sample_games_for_date(date_str)
+        api.save_to_cache(cache_key, games)
+        team_stats = await self.fetch_team_stats(self.get_slate_teams(games), fetch)
+        return games, team_stats
+
+    async def fetch_pitcher_eras(self, pitchers, force_refresh, fetch, pitcher_ids=None):
+        """
+        Resolve ERA data for many pitchers
+
+        Follows MLBStatsAPI.resolve_pitcher_eras: cached results first, then
+        one bulk request by player ID, then concurrent name lookups for the
+        rest.
+
+        Args:
+            pitchers: List of (team_name, pitcher_name) tuples
+            force_refresh: Force refresh of data
+            fetch: Per-slate fetch function from make_fetcher
+            pitcher_ids: Dictionary mapping (team_name, pitcher_name) to MLB player ID
+
+        Returns:
+            Dictionary mapping (team_name, pitcher_name) to ERA data
+        """
+        tasks = self.start_pitcher_lookups(pitchers, force_refresh, fetch, pitcher_ids)
+        results = await asyncio.gather(*tasks.values())
+        return dict(zip(tasks, results))
+
+    def start_pitcher_lookups(self, pitchers, force_refresh, fetch, pitcher_ids=None):
+        """
+        Start resolving each pitcher's ERA data as its own task
+
+        Pitchers with a player ID wait for the shared bulk request and fall
+        back to a name lookup if it misses them. The others are looked up by
+        name right away.
+
+        Args:
+            pitchers: List of (team_name, pitcher_name) tuples
+            force_refresh: Force refresh of data
+            fetch: Per-slate fetch function from make_fetcher
+            pitcher_ids: Dictionary mapping (team_name, pitcher_name) to MLB player ID
+
+        Returns:
+            Dictionary mapping each distinct (team_name, pitcher_name) to a
+            task resolving to its ERA data
+        """
+        api = self.mlb_stats_api
+        unique_pitchers = list(dict.fromkeys(pitchers))
+
+        results = api.get_cached_pitcher_eras(unique_pitchers, force_refresh)
+
+        bulk_ids = api.get_bulk_pitcher_ids(unique_pitchers, results, pitcher_ids)
+        bulk_task = None
+        if bulk_ids:
+            bulk_task = asyncio.ensure_future(self.run_lookup(api.pitcher_stats_bulk_lookup(bulk_ids.values()), fetch))
+
+        async def resolve(pitcher):
+            if pitcher in results:
+                return results[pitcher]
+
+            if pitcher in bulk_ids:
+                bulk_results = api.pitcher_eras_from_bulk({pitcher: bulk_ids[pitcher]}, await bulk_task)
+                if pitcher in bulk_results:
+                    return bulk_results[pitcher]
+
+            team_name, pitcher_name = pitcher
+            return await self.run_lookup(api.pitcher_era_lookup(team_name, pitcher_name), fetch)
+
+        return {pitcher: asyncio.ensure_future(resolve(pitcher)) for pitcher in unique_pitchers}
+
+    async def fetch_team_stats(self, team_names, fetch):
+        """
+        Get team stats for many teams concurrently, using cached stats first
+
+        Teams missing from the cache are served from the shared season team
+        stats index, loaded with one request when it is empty or expired.
+        Only teams missing from the index are looked up one by one.
+
+        Args:
+            team_names: List of team names
+            fetch: Per-slate fetch function from make_fetcher
+
+        Returns:
+            Dictionary mapping team name to team stats
+        """
+        tasks = self.start_team_lookups(team_names, fetch)
+        results = await asyncio.gather(*tasks.values())
+        return dict(zip(tasks, results))
+
+    def start_team_lookups(self, team_names, fetch):
+        """
+        Start resolving each team's stats as its own task
+
+        Args:
+            team_names: List of team names
+            fetch: Per-slate fetch function from make_fetcher
+
+        Returns:
+            Dictionary mapping each team name to a task resolving to its stats
+        """
+        api = self.mlb_stats_api
+        results = {}
+
+        for team_name in team_names:
+            cached_data = api.get_cached_data(f"team_stats_{team_name}")
+            if cached_data:
+                results[team_name] = cached_data
+
+        index_task = None
+        if api.bulk_team_stats and len(results) < len(team_names):
+            index_task = asyncio.ensure_future(self.load_team_index(fetch))
+
+        async def resolve(team_name):
+            if team_name in results:
+                return results[team_name]
+
+            if index_task is not None:
+                await index_task
+                team_stats = api.team_stats_from_index(team_name)
+                if team_stats:
+                    return team_stats
+
+            return await self.run_lookup(api.team_stats_lookup(team_name), fetch)
+
+        return {team_name: asyncio.ensure_future(resolve(team_name)) for team_name in dict.fromkeys(team_names)}
+
+    async def load_team_index(self, fetch):
+        """
+        Load the shared season team stats index under its lock
+
+        Holds MLBStatsAPI.team_index_lock like prefetch_team_stats, so only
+        one index load runs at a time across threads. The lock is waited for
+        in a worker thread, and a lookup that starts after another load
+        finished finds the index fresh and makes no requests.
+
+        Args:
+            fetch: Per-slate fetch function from make_fetcher
+
+        Returns:
+            True if the stats index is available
+        """
+        lock = self.mlb_stats_api.team_index_lock
+
+        if not lock.acquire(blocking=False):
+            acquired = asyncio.ensure_future(asyncio.to_thread(lock.acquire))
+            try:
+                await asyncio.shield(acquired)
+            except asyncio.CancelledError:
+                # Give the lock back once the waiting thread gets it
+                acquired.add_done_callback(lambda _: lock.release())
+                raise
+
+        try:
+            return await self.run_lookup(self.mlb_stats_api.team_index_lookup(), fetch)
+        finally:
+            lock.release()
+
+    async def run_lookup(self, lookup, fetch):
+        """
+        Drive a lookup generator with async HTTP calls
+
+        This mirrors MLBStatsAPI.run_lookup, so both paths return the same
+        results and fallbacks.
+
+        Args:
+            lookup: Generator from pitcher_era_lookup or team_stats_lookup
+            fetch: Per-slate fetch function from make_fetcher
+
+        Returns:
+            Lookup result
+        """
+        try:
+            request = next(lookup)
+            while True:
+                try:
+                    response = await fetch(request['url'], **request['kwargs'])
+                except Exception as e:
+                    request = lookup.throw(e)
+                else:
+                    request = lookup.send(response)
+        except StopIteration as stop:
+            return stop.value
+
+    def make_fetcher(self):
+        """
+        Create a fetch function for one slate
+
+        The function caps requests in flight and shares a single request
+        between callers asking for the same URL.
+
+        Returns:
+            Async fetch function taking a URL and transport arguments
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        pending = {}
+
+        async def request(url, kwargs):
+            async with semaphore:
+                return await self.transport.get(url, **kwargs)
+
+        async def fetch(url, **kwargs):
+            if url not in pending:
+                pending[url] = asyncio.ensure_future(request(url, kwargs))
+            return await pending[url]
+
+        return fetch
+
+    def get_slate_teams(self, games):
+        """
+        List the distinct teams playing on a slate
+
+        Args:
+            games: Scheduled games or game objects
+
+        Returns:
+            List of team names in schedule order
+        """
+        teams = []
+        for game in games:
+            teams.append(game.get('home_team'))
+            teams.append(game.get('away_team'))
+        return list(dict.fromkeys(teams))
@@ -0,0 +1,482 @@
+import os
+import json
+import time
+import logging
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+import serializer
+from probability_engine import MARKETS, ProbabilityEngine
+
+logger = logging.getLogger('backtest')
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Defaults, overridable through the environment
+DEFAULT_WORKERS = int(os.environ.get('MLB_BACKTEST_WORKERS', os.cpu_count() or 1))
+DEFAULT_CHUNK_DAYS = int(os.environ.get('MLB_BACKTEST_CHUNK_DAYS', 7))
+
+# Directories searched for games_<date>.json and all_predictions_<date>.json,
+# first match wins
+DEFAULT_SLATE_DIRS = [
+    os.path.join(BASE_DIR, 'cache', 'mlb_stats'),
+    os.path.join(BASE_DIR, 'cache', 'predictions'),
+    BASE_DIR
+]
+
+# Recorded {'mlb_stats_data': ..., 'prediction_data': ...} snapshots used for
+# dates missing from the slate directories
+DEFAULT_SNAPSHOT_FILES = [os.path.join(BASE_DIR, 'test_results.json')]
+
+# Innings each market counts runs over
+MARKET_INNINGS = {
+    'under_1_run_first_inning': 1,
+    'over_2.5_runs_first_3_innings': 3,
+    'over_3.5_runs_first_3_innings': 3
+}
+
+# Snapshot games by date, loaded once per process
+_snapshots = {}
+
+
+def normalize_game(game):
+    """
+    Flatten a recorded game into the format ProbabilityEngine.load_games reads
+
+    Handles games from get_games_for_date, the nested games_<date>.json format
+    (teams with probable_pitcher stats) and the 'games' table of
+    all_predictions_<date>.json.
+
+    Args:
+        game: Recorded game
+
+    Returns:
+        Dictionary with game_id (as a string), venue and home/away pitcher
+        stats
+    """
+    flat = {'game_id': str(game.get('game_id', game.get('id'))), 'venue': game.get('venue')}
+
+    for side in ('home', 'away'):
+        team = game.get(f'{side}_team')
+        if isinstance(team, dict):
+            stats = (team.get('probable_pitcher') or {}).get('stats') or {}
+            flat[f'{side}_era'] = stats.get('era')
+            flat[f'{side}_whip'] = stats.get('whip')
+            flat[f'{side}_strikeouts'] = stats.get('strikeouts')
+            flat[f'{side}_innings_pitched'] = stats.get('innings_pitched')
+        else:
+            flat[f'{side}_era'] = game.get(f'{side}_era', game.get(f'{side}_pitcher_era'))
+
+    return flat
+
+
+def read_json(path):
+    """
+    Read a JSON file
+
+    Args:
+        path: File path
+
+    Returns:
+        Decoded JSON, or None if the file is missing or unreadable
+    """
+    if not os.path.exists(path):
+        return None
+
+    try:
+        return serializer.load_file(path)
+    except Exception as e:
+        logger.error(f"Error reading {path}: {e}")
+        return None
+
+
+def games_from_predictions(predictions):
+    """
+    Get the games recorded in a predictions snapshot
+
+    Args:
+        predictions: Contents of all_predictions_<date>.json
+
+    Returns:
+        List of games
+    """
+    if predictions.get('games'):
+        return predictions['games']
+
+    # Snapshots from before the games table list full records per market
+    for market, game_key, run_threshold in MARKETS:
+        if predictions.get(market):
+            return predictions[market]
+
+    return []
+
+
+def load_snapshot(snapshot_file):
+    """
+    Group a recorded snapshot's games by date
+
+    Args:
+        snapshot_file: Path to a file like test_results.json
+
+    Returns:
+        Dictionary mapping date string to list of games
+    """
+    if snapshot_file not in _snapshots:
+        snapshot = read_json(snapshot_file) or {}
+        games_by_date = {}
+
+        for section in ('mlb_stats_data', 'prediction_data'):
+            for game in (snapshot.get(section) or {}).get('games', []):
+                date_str = game.get('date', game.get('game_date'))
+                games = games_by_date.setdefault(date_str, {})
+                games.setdefault(str(game.get('game_id', game.get('id'))), game)
+
+        _snapshots[snapshot_file] = {date_str: list(games.values()) for date_str, games in games_by_date.items()}
+
+    return _snapshots[snapshot_file]
+
+
+def load_slate(date_str, slate_dirs, snapshot_files=()):
+    """
+    Load the recorded games for a date
+
+    Args:
+        date_str: Date string in format YYYY-MM-DD
+        slate_dirs: Directories searched in order for games_<date>.json, then
+            all_predictions_<date>.json
+        snapshot_files: Snapshot files used when no directory has the date
+
+    Returns:
+        List of normalized games (empty if the date was not recorded)
+    """
+    for slate_dir in slate_dirs:
+        games = read_json(os.path.join(slate_dir, f"games_{date_str}.json"))
+        if games:
+            return [normalize_game(game) for game in games]
+
+        predictions = read_json(os.path.join(slate_dir, f"all_predictions_{date_str}.json"))
+        if predictions:
+            return [normalize_game(game) for game in games_from_predictions(predictions)]
+
+    for snapshot_file in snapshot_files:
+        games = load_snapshot(snapshot_file).get(date_str)
+        if games:
+            return [normalize_game(game) for game in games]
+
+    return []
+
+
+def load_linescores(date_str, linescore_dir):
+    """
+    Load final linescores for a date
+
+    Linescores are stored per date in linescores_<date>.json, mapping game ID
+    to the game's /game/<id>/linescore response from the MLB Stats API.
+
+    Args:
+        date_str: Date string in format YYYY-MM-DD
+        linescore_dir: Directory holding the linescore files
+
+    Returns:
+        Dictionary mapping game ID (as a string) to linescore
+    """
+    linescores = read_json(os.path.join(linescore_dir, f"linescores_{date_str}.json")) or {}
+    return {str(game_id): linescore for game_id, linescore in linescores.items()}
+
+
+def get_outcomes(linescore):
+    """
+    Settle every market from a final linescore
+
+    Args:
+        linescore: /game/<id>/linescore response
+
+    Returns:
+        Dictionary mapping market to True if it hit, False if it missed, for
+        the markets whose innings were played
+    """
+    innings = sorted(linescore.get('innings') or [], key=lambda inning: inning.get('num', 0))
+    runs = [
+        (inning.get('away') or {}).get('runs', 0) + (inning.get('home') or {}).get('runs', 0)
+        for inning in innings
+    ]
+
+    outcomes = {}
+    for market, game_key, run_threshold in MARKETS:
+        innings_needed = MARKET_INNINGS[market]
+        if len(runs) < innings_needed:
+            continue
+
+        total_runs = sum(runs[:innings_needed])
+        outcomes[market] = total_runs == 0 if run_threshold is None else total_runs > run_threshold
+
+    return outcomes
+
+
+def new_totals():
+    """
+    Create empty backtest totals
+
+    Returns:
+        Totals that replay_dates fills and merge_totals combines
+    """
+    return {
+        'dates': 0,
+        'slates': 0,
+        'games': 0,
+        'unsettled': 0,
+        'markets': {
+            market: {
+                'games': 0,
+                'hits': 0,
+                'brier_sum': 0.0,
+                # Probability decile -> [games, probability sum, hits]
+                'calibration': {},
+                # Rating -> [games, hits]
+                'ratings': {}
+            }
+            for market, game_key, run_threshold in MARKETS
+        }
+    }
+
+
+def merge_totals(totals, other):
+    """
+    Add one set of totals into another
+
+    Args:
+        totals: Totals updated in place
+        other: Totals to add
+    """
+    for key in ('dates', 'slates', 'games', 'unsettled'):
+        totals[key] += other[key]
+
+    for market, market_totals in other['markets'].items():
+        merged = totals['markets'][market]
+        for key in ('games', 'hits', 'brier_sum'):
+            merged[key] += market_totals[key]
+        for group in ('calibration', 'ratings'):
+            for bucket, counts in market_totals[group].items():
+                merged_counts = merged[group].setdefault(bucket, [0] * len(counts))
+                for i, count in enumerate(counts):
+                    merged_counts[i] += count
+
+
+def replay_dates(dates, slate_dirs, linescore_dir, snapshot_files=(), full_pitcher_stats=False):
+    """
+    Replay the prediction model over recorded slates and settle it against linescores
+
+    Runs in a worker process, so it only takes and returns plain data.
+
+    Args:
+        dates: Date strings to replay
+        slate_dirs: Directories holding recorded slates
+        linescore_dir: Directory holding linescores_<date>.json files
+        snapshot_files: Snapshot files used for dates missing from slate_dirs
+        full_pitcher_stats: Score pitchers with WHIP, strikeouts and innings
+            when recorded, instead of ERA only like the live predictions
+
+    Returns:
+        Totals for these dates
+    """
+    totals = new_totals()
+    games = []
+    outcomes = []
+
+    for date_str in dates:
+        totals['dates'] += 1
+        slate = load_slate(date_str, slate_dirs, snapshot_files)
+        if not slate:
+            continue
+
+        totals['slates'] += 1
+        linescores = load_linescores(date_str, linescore_dir)
+
+        for game in slate:
+            linescore = linescores.get(game['game_id'])
+            if linescore is None:
+                totals['unsettled'] += 1
+                continue
+
+            if not full_pitcher_stats:
+                game = {key: value for key, value in game.items() if not key.endswith(('_whip', '_strikeouts', '_innings_pitched'))}
+
+            games.append(game)
+            outcomes.append(get_outcomes(linescore))
+
+    totals['games'] = len(games)
+    if not games:
+        return totals
+
+    # Score every settled game in these dates in one pass
+    scores = ProbabilityEngine().score_games(games)
+
+    for market, game_key, run_threshold in MARKETS:
+        market_totals = totals['markets'][market]
+        probabilities = scores[market]['probability']
+        ratings = scores[market]['rating']
+
+        for index, game_outcomes in enumerate(outcomes):
+            if market not in game_outcomes:
+                continue
+
+            hit = int(game_outcomes[market])
+            probability = probabilities[index]
+
+            market_totals['games'] += 1
+            market_totals['hits'] += hit
+            market_totals['brier_sum'] += (probability / 100 - hit) ** 2
+
+            decile = str(min(int(probability // 10), 9) * 10)
+            calibration = market_totals['calibration'].setdefault(decile, [0, 0.0, 0])
+            calibration[0] += 1
+            calibration[1] += probability
+            calibration[2] += hit
+
+            rating = market_totals['ratings'].setdefault(ratings[index], [0, 0])
+            rating[0] += 1
+            rating[1] += hit
+
+    return totals
+
+
+class Backtester:
+    """
+    Replays the prediction model over a date range of recorded slates in parallel
+    """
+
+    def __init__(self, linescore_dir, slate_dirs=None, snapshot_files=None, workers=DEFAULT_WORKERS,
+                 chunk_days=DEFAULT_CHUNK_DAYS, full_pitcher_stats=False):
+        """
+        Initialize the backtester
+
+        Args:
+            linescore_dir: Directory holding linescores_<date>.json files
+            slate_dirs: Directories holding games_<date>.json or
+                all_predictions_<date>.json files (defaults to the repo caches)
+            snapshot_files: Snapshot files used for dates missing from
+                slate_dirs (defaults to test_results.json)
+            workers: Worker processes (1 replays in this process)
+            chunk_days: Dates replayed per worker task
+            full_pitcher_stats: Score pitchers with WHIP, strikeouts and
+                innings when recorded, instead of ERA only
+        """
+        self.linescore_dir = linescore_dir
+        self.slate_dirs = DEFAULT_SLATE_DIRS if slate_dirs is None else slate_dirs
+        self.snapshot_files = DEFAULT_SNAPSHOT_FILES if snapshot_files is None else snapshot_files
+        self.workers = max(1, workers)
+        self.chunk_days = max(1, chunk_days)
+        self.full_pitcher_stats = full_pitcher_stats
+
+    def get_dates(self, start_date, end_date):
+        """
+        List the dates in a range
+
+        Args:
+            start_date: First date string in format YYYY-MM-DD
+            end_date: Last date string in format YYYY-MM-DD (inclusive)
+
+        Returns:
+            List of date strings
+        """
+        start = datetime.strptime(start_date, '%Y-%m-%d')
+        end = datetime.strptime(end_date, '%Y-%m-%d')
+        return [(start + timedelta(days=offset)).strftime('%Y-%m-%d') for offset in range((end - start).days + 1)]
+
+    def run(self, start_date, end_date):
+        """
+        Replay a date range and report how the model did
+
+        Args:
+            start_date: First date string in format YYYY-MM-DD
+            end_date: Last date string in format YYYY-MM-DD (inclusive)
+
+        Returns:
+            Report from get_report
+        """
+        start_time = time.time()
+        dates = self.get_dates(start_date, end_date)
+        chunks = [dates[i:i + self.chunk_days] for i in range(0, len(dates), self.chunk_days)]
+        args = (self.slate_dirs, self.linescore_dir, self.snapshot_files, self.full_pitcher_stats)
+
+        totals = new_totals()
+
+        if self.workers == 1 or len(chunks) == 1:
+            for chunk in chunks:
+                merge_totals(totals, replay_dates(chunk, *args))
+        else:
+            with ProcessPoolExecutor(max_workers=min(self.workers, len(chunks))) as executor:
+                futures = [executor.submit(replay_dates, chunk, *args) for chunk in chunks]
+                for future in futures:
+                    merge_totals(totals, future.result())
+
+        report = self.get_report(totals)
+        report['start_date'] = start_date
+        report['end_date'] = end_date
+        report['seconds'] = round(time.time() - start_time, 3)
+
+        logger.info(f"Backtested {report['games']} games over {len(dates)} dates in {report['seconds']}s")
+        return report
+
+    def get_report(self, totals):
+        """
+        Turn totals into calibration, Brier score and hit rates per market
+
+        A rating's hit rate is how often the market hit when the model gave
+        that rating, so Bet should beat Lean and Lean should beat Pass.
+
+        Args:
+            totals: Totals from replay_dates
+
+        Returns:
+            Report dictionary
+        """
+        report = {
+            'dates': totals['dates'],
+            'slates': totals['slates'],
+            'games': totals['games'],
+            'unsettled': totals['unsettled'],
+            'markets': {}
+        }
+
+        for market, market_totals in totals['markets'].items():
+            games = market_totals['games']
+
+            calibration = []
+            for decile, (count, probability_sum, hits) in sorted(market_totals['calibration'].items(), key=lambda item: int(item[0])):
+                calibration.append({
+                    'bucket': f"{decile}-{int(decile) + 10}",
+                    'games': count,
+                    'mean_probability': round(probability_sum / count, 2),
+                    'observed_rate': round(hits / count * 100, 2)
+                })
+
+            ratings = {}
+            for rating in ('Bet', 'Lean', 'Pass'):
+                count, hits = market_totals['ratings'].get(rating, [0, 0])
+                ratings[rating] = {'games': count, 'hits': hits, 'hit_rate': round(hits / count, 4) if count else None}
+
+            report['markets'][market] = {
+                'games': games,
+                'hit_rate': round(market_totals['hits'] / games, 4) if games else None,
+                'brier_score': round(market_totals['brier_sum'] / games, 4) if games else None,
+                'calibration': calibration,
+                'ratings': ratings
+            }
+
+        return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Backtest predictions against final linescores')
+    parser.add_argument('start_date', help='First date (YYYY-MM-DD)')
+    parser.add_argument('end_date', help='Last date (YYYY-MM-DD)')
+    parser.add_argument('--linescores', required=True, help='Directory holding linescores_<date>.json files')
+    parser.add_argument('--slates', action='append', help='Directory holding recorded slates (repeatable)')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS, help='Worker processes')
+    parser.add_argument('--full-pitcher-stats', action='store_true', help='Use WHIP, strikeouts and innings when recorded')
+    options = parser.parse_args()
+
+    backtester = Backtester(options.linescores, slate_dirs=options.slates, workers=options.workers,
+                            full_pitcher_stats=options.full_pitcher_stats)
+    print(json.dumps(backtester.run(options.start_date, options.end_date), indent=2))
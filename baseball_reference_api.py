@@ -1,4 +1,5 @@
-import requests
+import http_session
+import tiered_cache
 import json
 import os
 from datetime import datetime
@@ -15,40 +16,15 @@ class BaseballReferenceAPI:
         self.cache_dir = 'cache/bbref'
         self.cache_expiry = 3600 * 3  # Cache expiry in seconds (3 hours)
         os.makedirs(self.cache_dir, exist_ok=True)
+        self.cache = tiered_cache.get_cache(self.cache_dir, self.cache_expiry, envelope=True)
     
     def get_cached_data(self, cache_key):
         """Get data from cache if available and not expired"""
-        cache_file = os.path.join(self.cache_dir, f"{cache_key}.json")
-        
-        if os.path.exists(cache_file):
-            try:
-                with open(cache_file, 'r') as f:
-                    cached_data = json.load(f)
-                
-                # Check if cache is expired
-                cache_time = cached_data.get('cache_time', 0)
-                if (datetime.now() - datetime.fromtimestamp(cache_time)).total_seconds() < self.cache_expiry:
-                    return cached_data.get('data')
-            except Exception as e:
-                print(f"Error reading Baseball Reference cache: {e}")
-        
-        return None
+        return self.cache.get(cache_key, self.cache_expiry)
     
     def save_to_cache(self, cache_key, data):
         """Save data to cache"""
-        cache_file = os.path.join(self.cache_dir, f"{cache_key}.json")
-        
-        try:
-            with open(cache_file, 'w') as f:
-                json.dump({
-                    'data': data,
-                    'cache_time': datetime.now().timestamp()
-                }, f)
-            
-            return True
-        except Exception as e:
-            print(f"Error saving Baseball Reference data to cache: {e}")
-            return False
+        return self.cache.set(cache_key, data)
     
     def scrape_pitcher_stats(self, team_abbr, pitcher_name):
         """
@@ -63,7 +39,18 @@ class BaseballReferenceAPI:
         try:
             # Get team page
             team_url = f"{self.base_url}/teams/{team_abbr}/2025.shtml"
-            response = requests.get(team_url, headers={'User-Agent': 'Mozilla/5.0'})
+            response = http_session.get(team_url, headers={'User-Agent': 'Mozilla/5.0'})
+            
+            if response.status_code != 200:
+                print(f"Error fetching Baseball Reference team page: {response.status_code}")
+                return {
+                    "era": 4.50,
+                    "whip": 1.30,
+                    "strikeouts": 0,
+                    "innings": 0,
+                    "source": "default"
+                }
+            
             soup = BeautifulSoup(response.text, 'html.parser')
             
             # Find pitcher in roster
@@ -88,12 +75,13 @@ class BaseballReferenceAPI:
                     "whip": 1.30,
                     "strikeouts": 0,
                     "innings": 0,
-                    "source": "default"
+                    "source": "default",
+                    "method": "not-found"
                 }
             
             # Get pitcher stats page
             full_pitcher_url = f"{self.base_url}{pitcher_url}"
-            response = requests.get(full_pitcher_url, headers={'User-Agent': 'Mozilla/5.0'})
+            response = http_session.get(full_pitcher_url, headers={'User-Agent': 'Mozilla/5.0'})
             soup = BeautifulSoup(response.text, 'html.parser')
             
             # Find stats in standard pitching table
@@ -0,0 +1,89 @@
+import pytest
+from async_data_engine import AsyncSlateEngine, LocalTransport
+from mlb_prediction_api import MLBPredictionAPI
+from mlb_stats_api import MLBStatsAPI
+
+# A three-game slate served by LocalTransport, shared by the tests that build
+# predictions without reaching the MLB Stats API
+
+MATCHUPS = [
+    ('New York Yankees', 'Boston Red Sox'),
+    ('Los Angeles Dodgers', 'San Francisco Giants'),
+    ('Chicago Cubs', 'St. Louis Cardinals')
+]
+
+SCHEDULE = {
+    'dates': [{
+        'games': [
+            {
+                'gamePk': 2000 + i,
+                'status': {'abstractGameState': 'Preview'},
+                'gameDate': '2025-04-16T23:05:00Z',
+                'venue': {'name': f'Park {i}'},
+                'teams': {
+                    'home': {'team': {'name': home}, 'probablePitcher': {'id': 10 + i, 'fullName': f'Home Pitcher {i}'}},
+                    'away': {'team': {'name': away}, 'probablePitcher': {'id': 50 + i, 'fullName': f'Away Pitcher {i}'}}
+                }
+            }
+            for i, (home, away) in enumerate(MATCHUPS)
+        ]
+    }]
+}
+
+TEAMS = {'teams': [{'id': 100 + i, 'abbreviation': abbr} for i, abbr in enumerate(['NYY', 'BOS', 'LAD', 'SF', 'CHC', 'STL'])]}
+
+
+def search_player(url):
+    name = url.split('search=')[1]
+    return {'people': [{'id': sum(ord(c) for c in name), 'primaryPosition': {'code': '1'}}]}
+
+
+def player_stats(url):
+    player_id = int(url.split('/people/')[1].split('/')[0])
+    return {'stats': [{'splits': [{'stat': {'era': f'{player_id % 7}.50'}}]}]}
+
+
+def bulk_player_stats(url):
+    ids = url.split('personIds=')[1].split('&')[0].split(',')
+    return {'people': [
+        {'id': int(player_id), 'stats': [{'group': {'displayName': 'pitching'}, 'splits': [{'stat': {'era': f'{int(player_id) % 7}.25'}}]}]}
+        for player_id in ids
+    ]}
+
+
+def team_stats(url):
+    team_id = int(url.split('/teams/')[1].split('/')[0])
+    return {'stats': [{'splits': [{'stat': {'era': 3.0 + team_id % 5, 'whip': 1.2, 'strikeOuts': 400, 'walks': 150}}]}]}
+
+
+def bulk_team_stats(url):
+    return {'stats': [{'splits': [
+        {'team': {'id': team['id']}, 'stat': {'era': f"{3.0 + team['id'] % 5:.2f}", 'whip': '1.20', 'strikeOuts': 400, 'walks': 150}}
+        for team in TEAMS['teams']
+    ]}]}
+
+
+ROUTES = [
+    ('/schedule', SCHEDULE),
+    ('/teams/stats?', bulk_team_stats),
+    ('/players?search=', search_player),
+    ('/people?personIds=', bulk_player_stats),
+    ('/people/', player_stats),
+    ('/stats?stats=season', team_stats),
+    ('/teams', TEAMS)
+]
+
+
+@pytest.fixture
+def empty_team_index(monkeypatch):
+    monkeypatch.setattr(MLBStatsAPI, 'team_directory', {})
+    monkeypatch.setattr(MLBStatsAPI, 'team_stats_index', {})
+    monkeypatch.setattr(MLBStatsAPI, 'team_stats_index_time', 0)
+
+
+@pytest.fixture
+def api(tmp_path, empty_team_index):
+    api = MLBPredictionAPI(cache_dir=str(tmp_path / 'predictions'))
+    api.mlb_stats_api = MLBStatsAPI(cache_dir=str(tmp_path / 'mlb_stats'))
+    api.slate_engine = AsyncSlateEngine(api.mlb_stats_api, LocalTransport(ROUTES))
+    return api
@@ -0,0 +1,521 @@
+import os
+import math
+import time
+import logging
+import threading
+from collections import deque
+from datetime import datetime
+import http_session
+
+logger = logging.getLogger('data_sources')
+
+# Defaults, overridable through the environment
+DEFAULT_WINDOW = int(os.environ.get('MLB_SOURCE_WINDOW', 20))
+DEFAULT_ERROR_THRESHOLD = float(os.environ.get('MLB_SOURCE_ERROR_THRESHOLD', 0.5))
+DEFAULT_MIN_CALLS = int(os.environ.get('MLB_SOURCE_MIN_CALLS', 5))
+DEFAULT_COOLDOWN = float(os.environ.get('MLB_SOURCE_COOLDOWN', 60))
+
+# Entities a source can serve, and the parameters and data of each:
+#   pitcher_season (team_name, pitcher_name): dict with 'era' and 'source',
+#       and 'whip', 'strikeouts' and 'innings' when the source has them
+#   team_pitching (team_name): team stats dict with 'team_era', as from
+#       MLBStatsAPI.get_team_stats
+#   schedule (date_str): list of games with 'game_id', 'status',
+#       'home_team', 'away_team', 'venue', 'game_time', 'home_pitcher' and
+#       'away_pitcher', as from MLBStatsAPI.parse_schedule
+#   weather (city): dict with 'temperature', 'condition', 'wind_speed' and
+#       'humidity', as from WeatherAPI.get_weather
+ENTITIES = ('pitcher_season', 'team_pitching', 'schedule', 'weather')
+
+
+class SourceError(Exception):
+    """
+    Raised by a source's fetch function when the source failed to answer
+
+    Returning None instead means the source works but has no data for the
+    request, which does not count against its health.
+    """
+
+
+class DataSource:
+    """
+    A fetcher registered for one or more entities, with its rolling health
+    """
+
+    def __init__(self, name, entities, fetch, cost=1, latency=1.0, window=DEFAULT_WINDOW,
+                 error_threshold=DEFAULT_ERROR_THRESHOLD, min_calls=DEFAULT_MIN_CALLS, cooldown=DEFAULT_COOLDOWN):
+        """
+        Initialize the source
+
+        Args:
+            name: Source name
+            entities: Entities the source can serve (see ENTITIES)
+            fetch: Function taking the entity and its parameters as keyword
+                arguments, returning the data, None if the source has no data,
+                or raising SourceError (or any exception) if it failed
+            cost: Relative cost of a call; cheaper sources are tried first
+            latency: Expected seconds per call, used for ordering until
+                latencies have been measured
+            window: Calls kept for the rolling error rate and p95 latency
+            error_threshold: Error rate at which the circuit opens
+            min_calls: Calls in the window before the circuit can open
+            cooldown: Seconds an open circuit skips the source
+        """
+        self.name = name
+        self.entities = tuple(entities)
+        self.fetch_function = fetch
+        self.cost = cost
+        self.latency = latency
+        self.error_threshold = error_threshold
+        self.min_calls = min_calls
+        self.cooldown = cooldown
+
+        self.lock = threading.Lock()
+        self.outcomes = deque(maxlen=window)
+        self.opened_at = None
+        self.counters = {'calls': 0, 'hits': 0, 'misses': 0, 'errors': 0, 'skipped': 0, 'opened': 0}
+
+    def fetch(self, entity, **params):
+        """
+        Call the source, recording the outcome and latency
+
+        Args:
+            entity: Entity to fetch
+            **params: Entity parameters
+
+        Returns:
+            Data, or None if the source has no data
+
+        Raises:
+            SourceError: If the source failed
+        """
+        start_time = time.time()
+
+        try:
+            data = self.fetch_function(entity, **params)
+        except Exception as e:
+            self.record(False, time.time() - start_time)
+            raise e if isinstance(e, SourceError) else SourceError(f"{self.name}: {e}")
+
+        self.record(True, time.time() - start_time, data is not None)
+        return data
+
+    def record(self, ok, latency, hit=True):
+        """
+        Record a call and open the circuit if the error rate is too high
+
+        Args:
+            ok: Whether the source answered
+            latency: Seconds the call took
+            hit: Whether the answer held data
+        """
+        with self.lock:
+            self.outcomes.append((ok, latency))
+            self.counters['calls'] += 1
+            self.counters['hits' if ok and hit else 'misses' if ok else 'errors'] += 1
+
+            if not ok and self.opened_at is None and len(self.outcomes) >= self.min_calls:
+                if self.get_error_rate() >= self.error_threshold:
+                    self.opened_at = time.time()
+                    self.counters['opened'] += 1
+                    logger.warning(f"Opened circuit for {self.name} at {self.get_error_rate():.0%} errors")
+
+    def is_available(self):
+        """
+        Check whether the circuit lets calls through
+
+        An open circuit closes again after the cooldown, with a fresh window.
+
+        Returns:
+            True if the source may be called
+        """
+        with self.lock:
+            if self.opened_at is None:
+                return True
+
+            if time.time() - self.opened_at < self.cooldown:
+                self.counters['skipped'] += 1
+                return False
+
+            self.opened_at = None
+            self.outcomes.clear()
+            logger.info(f"Closed circuit for {self.name} after {self.cooldown}s")
+            return True
+
+    def get_error_rate(self):
+        """
+        Get the error rate over the window (call with the lock held)
+
+        Returns:
+            Fraction of failed calls, 0 if there were none
+        """
+        if not self.outcomes:
+            return 0.0
+        return sum(1 for ok, latency in self.outcomes if not ok) / len(self.outcomes)
+
+    def get_p95(self):
+        """
+        Get the 95th percentile latency over the window (call with the lock held)
+
+        Returns:
+            Seconds, or None before the first call
+        """
+        if not self.outcomes:
+            return None
+        latencies = sorted(latency for ok, latency in self.outcomes)
+        return latencies[math.ceil(0.95 * len(latencies)) - 1]
+
+    def get_expected_latency(self):
+        """
+        Get the measured p95 latency, or the latency hint before any call
+
+        Returns:
+            Seconds
+        """
+        with self.lock:
+            p95 = self.get_p95()
+        return self.latency if p95 is None else p95
+
+    def get_stats(self):
+        """
+        Get the source's counters and rolling health
+
+        Returns:
+            Dictionary of counters, 'error_rate', 'p95_ms' and 'state'
+        """
+        with self.lock:
+            p95 = self.get_p95()
+            return dict(
+                self.counters,
+                entities=list(self.entities),
+                cost=self.cost,
+                error_rate=round(self.get_error_rate(), 3),
+                p95_ms=round(p95 * 1000, 1) if p95 is not None else None,
+                state='open' if self.opened_at is not None else 'closed'
+            )
+
+
+class DataSourceRouter:
+    """
+    Registry of data sources that routes each fetch to the cheapest healthy one
+    """
+
+    def __init__(self):
+        """Initialize an empty registry"""
+        self.sources = {}
+        self.lock = threading.Lock()
+
+    def register(self, source):
+        """
+        Register a source, replacing any source with the same name
+
+        Args:
+            source: DataSource
+
+        Returns:
+            The source
+        """
+        unknown = [entity for entity in source.entities if entity not in ENTITIES]
+        if unknown:
+            raise ValueError(f"Unknown entities for {source.name}: {', '.join(unknown)}")
+
+        with self.lock:
+            self.sources[source.name] = source
+        return source
+
+    def get_sources(self, entity, names=None):
+        """
+        List the sources serving an entity, in the order they are tried
+
+        Args:
+            entity: Entity name
+            names: Only consider these source names
+
+        Returns:
+            Sources ordered by cost, then by measured or expected latency
+        """
+        with self.lock:
+            sources = [
+                source for source in self.sources.values()
+                if entity in source.entities and (names is None or source.name in names)
+            ]
+        return sorted(sources, key=lambda source: (source.cost, source.get_expected_latency()))
+
+    def fetch(self, entity, names=None, **params):
+        """
+        Fetch an entity from the cheapest healthy source that has it
+
+        Sources with an open circuit are skipped without being called.
+        Misses and failures fall through to the next source.
+
+        Args:
+            entity: Entity name
+            names: Only consider these source names
+            **params: Entity parameters
+
+        Returns:
+            Tuple of (data, source name), or (None, None) if no source
+            answered
+        """
+        for source in self.get_sources(entity, names):
+            if not source.is_available():
+                continue
+
+            try:
+                data = source.fetch(entity, **params)
+            except SourceError as e:
+                logger.warning(f"Error fetching {entity} from {source.name}: {e}")
+                continue
+
+            if data is not None:
+                return data, source.name
+
+        logger.warning(f"No source answered {entity} for {params}")
+        return None, None
+
+    def get_stats(self):
+        """
+        Get every source's counters and health
+
+        Returns:
+            Dictionary mapping source name to its stats
+        """
+        with self.lock:
+            sources = list(self.sources.values())
+        return {source.name: source.get_stats() for source in sources}
+
+
+def lazy(factory):
+    """
+    Wrap a fetcher's constructor so the fetcher is created on first use
+
+    Args:
+        factory: Function returning the fetcher
+
+    Returns:
+        Function returning the same fetcher on every call
+    """
+    instances = []
+    lock = threading.Lock()
+
+    def get():
+        with lock:
+            if not instances:
+                instances.append(factory())
+        return instances[0]
+
+    return get
+
+
+def checked_era(era_data, failures=('error', 'default'), misses=('not-found',)):
+    """
+    Apply the pitcher_season contract to a fetcher's ERA result
+
+    Fetchers that answer both failures and unknown pitchers with the same
+    'source' mark the unknown pitchers with a 'method' in misses, so a slate
+    of TBD or called-up pitchers does not open a healthy source's circuit.
+
+    Args:
+        era_data: ERA data returned by a fetcher
+        failures: 'source' values meaning the fetcher failed
+        misses: 'source' or 'method' values meaning the pitcher was not found
+
+    Returns:
+        The ERA data, or None if the pitcher was not found
+
+    Raises:
+        SourceError: If the fetcher failed
+    """
+    if not era_data or era_data.get('source') in misses or era_data.get('method') in misses:
+        return None
+    if era_data.get('source') in failures:
+        raise SourceError(era_data.get('note') or f"lookup failed ({era_data.get('source')})")
+    if era_data.get('era') in (None, 'N/A') or '(Fallback)' in str(era_data.get('source')):
+        return None
+    return era_data
+
+
+def espn_schedule_games(scoreboard):
+    """
+    Convert an ESPN scoreboard into games shaped like MLBStatsAPI.parse_schedule
+
+    Args:
+        scoreboard: ESPN scoreboard response
+
+    Returns:
+        List of games
+    """
+    states = {'pre': 'Preview', 'in': 'Live', 'post': 'Final'}
+    games = []
+
+    for event in scoreboard.get('events', []):
+        competition = (event.get('competitions') or [{}])[0]
+        teams = {}
+        pitchers = {}
+        for competitor in competition.get('competitors', []):
+            side = competitor.get('homeAway')
+            teams[side] = competitor.get('team', {}).get('displayName')
+            probables = competitor.get('probables') or [{}]
+            pitchers[side] = probables[0].get('athlete', {}).get('displayName', 'TBD')
+
+        game_time = event.get('date')
+        try:
+            game_time = datetime.fromisoformat(game_time.replace('Z', '+00:00')).strftime('%H:%M')
+        except (AttributeError, ValueError):
+            game_time = 'TBD'
+
+        games.append({
+            'game_id': event.get('id'),
+            'status': states.get(event.get('status', {}).get('type', {}).get('state')),
+            'home_team': teams.get('home'),
+            'away_team': teams.get('away'),
+            'venue': competition.get('venue', {}).get('fullName'),
+            'game_time': game_time,
+            'home_pitcher': pitchers.get('home', 'TBD'),
+            'away_pitcher': pitchers.get('away', 'TBD')
+        })
+
+    return games
+
+
+def register_default_sources(router):
+    """
+    Register the repo's fetchers with a router
+
+    Fetchers are created on first use, so registering them is cheap.
+
+    Args:
+        router: DataSourceRouter
+    """
+    from mlb_stats_api import MLBStatsAPI
+    from espn_live_data_api import ESPNLiveDataAPI
+    from espn_direct_scraper import ESPNDirectScraper
+    from espn_stats_api import ESPNStatsAPI
+    from espn_stats_api_fixed import ESPNStatsAPIFixed
+    from baseball_reference_api import BaseballReferenceAPI
+    from multi_source_stats_api import MLBStatsDirectAPI
+    from hardcoded_mlb_stats_api import HardcodedMLBStatsAPI
+    from weather_api import WeatherAPI
+
+    mlb_stats_api = lazy(MLBStatsAPI)
+    espn_live_api = lazy(ESPNLiveDataAPI)
+    espn_scraper = lazy(ESPNDirectScraper)
+    espn_stats_api = lazy(ESPNStatsAPI)
+    espn_stats_api_fixed = lazy(ESPNStatsAPIFixed)
+    bbref_api = lazy(BaseballReferenceAPI)
+    mlb_direct_api = lazy(MLBStatsDirectAPI)
+    hardcoded_api = lazy(HardcodedMLBStatsAPI)
+    weather_api = lazy(WeatherAPI)
+
+    def mlb_stats(entity, team_name=None, pitcher_name=None, date_str=None):
+        api = mlb_stats_api()
+        if entity == 'pitcher_season':
+            return checked_era(api.get_pitcher_era(team_name, pitcher_name))
+        if entity == 'team_pitching':
+            team_stats = api.get_team_stats(team_name)
+            return None if not team_stats or 'error' in team_stats else team_stats
+
+        response = http_session.get(api.get_schedule_url(date_str), timeout=10)
+        if response.status_code != 200:
+            raise SourceError(f"HTTP {response.status_code}")
+        return api.parse_schedule(response.json()) or None
+
+    def espn_stats(entity, team_name=None, pitcher_name=None, date_str=None):
+        if entity == 'pitcher_season':
+            return checked_era(espn_stats_api().scrape_pitcher_era(team_name, pitcher_name))
+        return espn_schedule_games(espn_stats_api().get_schedule(date_str)) or None
+
+    def espn_live(entity, team_name=None, pitcher_name=None):
+        return checked_era(espn_live_api().get_pitcher_era(team_name, pitcher_name))
+
+    def espn_direct(entity, team_name=None, pitcher_name=None):
+        return checked_era(espn_scraper().get_pitcher_era(team_name, pitcher_name))
+
+    def espn_fixed(entity, team_name=None, pitcher_name=None):
+        return checked_era(espn_stats_api_fixed().scrape_pitcher_era(team_name, pitcher_name))
+
+    def mlb_direct(entity, team_name=None, pitcher_name=None):
+        return checked_era(mlb_direct_api().get_pitcher_stats(team_name, pitcher_name))
+
+    def bbref(entity, team_name=None, pitcher_name=None):
+        api = bbref_api()
+        team_abbr = api.get_team_abbreviation(team_name)
+        if team_abbr is None:
+            return None
+        return checked_era(api.scrape_pitcher_stats(team_abbr, pitcher_name))
+
+    def hardcoded(entity, team_name=None, pitcher_name=None):
+        return checked_era(hardcoded_api().get_pitcher_stats(team_name, pitcher_name), failures=(), misses=('default',))
+
+    def weather(entity, city=None):
+        api = weather_api()
+        data = api.get_weather(city)
+        # WeatherAPI answers failures with its default weather
+        if data == api.get_default_weather():
+            raise SourceError(f"no weather for {city}")
+        return data
+
+    def default_weather(entity, city=None):
+        return weather_api().get_default_weather()
+
+    for source in [
+        DataSource('mlb-stats-api', ('pitcher_season', 'team_pitching', 'schedule'), mlb_stats, cost=1, latency=0.5),
+        DataSource('espn-api', ('pitcher_season',), espn_live, cost=2, latency=1.0),
+        DataSource('mlb-direct', ('pitcher_season',), mlb_direct, cost=2, latency=1.0),
+        DataSource('espn-stats', ('pitcher_season', 'schedule'), espn_stats, cost=3, latency=1.5),
+        DataSource('espn-scraper', ('pitcher_season',), espn_direct, cost=5, latency=4.0),
+        DataSource('espn-stats-fixed', ('pitcher_season',), espn_fixed, cost=5, latency=3.0),
+        DataSource('baseball-reference', ('pitcher_season',), bbref, cost=6, latency=3.0),
+        DataSource('openweathermap', ('weather',), weather, cost=1, latency=0.5),
+        # Last resorts that never touch the network
+        DataSource('hardcoded', ('pitcher_season',), hardcoded, cost=100, latency=0.0),
+        DataSource('default-weather', ('weather',), default_weather, cost=100, latency=0.0)
+    ]:
+        router.register(source)
+
+
+_router = None
+_router_lock = threading.Lock()
+
+
+def get_router():
+    """
+    Get the process-wide router with the default sources registered
+
+    Returns:
+        DataSourceRouter
+    """
+    global _router
+    with _router_lock:
+        if _router is None:
+            _router = DataSourceRouter()
+            register_default_sources(_router)
+        return _router
+
+
+def fetch(entity, names=None, **params):
+    """
+    Fetch an entity through the shared router
+
+    Args:
+        entity: Entity name (see ENTITIES)
+        names: Only consider these source names
+        **params: Entity parameters
+
+    Returns:
+        Tuple of (data, source name), or (None, None)
+    """
+    return get_router().fetch(entity, names, **params)
+
+
+def get_stats():
+    """
+    Get per-source health for /api/status
+
+    Returns:
+        Dictionary mapping source name to its stats, empty until the shared
+        router is first used
+    """
+    with _router_lock:
+        router = _router
+    return router.get_stats() if router else {}
@@ -1,8 +1,8 @@
-import requests
-from bs4 import BeautifulSoup
+import http_session
+import tiered_cache
+import espn_page_parser
 import time
 import random
-import json
 import os
 import re
 from datetime import datetime
@@ -25,6 +25,7 @@ class ESPNDirectScraper:
         self.cache_dir = 'cache/espn_direct'
         self.cache_expiry = 3600 * 1  # Cache expiry in seconds (1 hour)
         os.makedirs(self.cache_dir, exist_ok=True)
+        self.cache = tiered_cache.get_cache(self.cache_dir, self.cache_expiry, envelope=True)
         
         # User agents to rotate for avoiding scraping detection
         self.user_agents = [
@@ -74,55 +75,31 @@ class ESPNDirectScraper:
     
     def get_cached_data(self, cache_key):
         """Get data from cache if available and not expired"""
-        cache_file = os.path.join(self.cache_dir, f"{cache_key}.json")
+        data = self.cache.get(cache_key, self.cache_expiry)
         
-        if os.path.exists(cache_file):
-            try:
-                with open(cache_file, 'r') as f:
-                    cached_data = json.load(f)
-                
-                # Check if cache is expired
-                cache_time = cached_data.get('cache_time', 0)
-                if (datetime.now() - datetime.fromtimestamp(cache_time)).total_seconds() < self.cache_expiry:
-                    logger.info(f"Using cached data for {cache_key}")
-                    return cached_data.get('data')
-            except Exception as e:
-                logger.error(f"Error reading cache: {e}")
+        if data is not None:
+            logger.info(f"Using cached data for {cache_key}")
         
-        return None
+        return data
     
     def save_to_cache(self, cache_key, data):
         """Save data to cache"""
-        cache_file = os.path.join(self.cache_dir, f"{cache_key}.json")
-        
-        try:
-            with open(cache_file, 'w') as f:
-                json.dump({
-                    'data': data,
-                    'cache_time': datetime.now().timestamp()
-                }, f)
-            
+        if self.cache.set(cache_key, data):
             logger.info(f"Saved data to cache for {cache_key}")
             return True
-        except Exception as e:
-            logger.error(f"Error saving data to cache: {e}")
-            return False
+        return False
     
     def clear_cache(self, cache_key=None):
         """Clear cache for a specific key or all cache"""
         if cache_key:
-            cache_file = os.path.join(self.cache_dir, f"{cache_key}.json")
-            if os.path.exists(cache_file):
-                try:
-                    os.remove(cache_file)
-                    logger.info(f"Cleared cache for {cache_key}")
-                except Exception as e:
-                    logger.error(f"Error clearing cache for {cache_key}: {e}")
+            try:
+                self.cache.delete(cache_key)
+                logger.info(f"Cleared cache for {cache_key}")
+            except Exception as e:
+                logger.error(f"Error clearing cache for {cache_key}: {e}")
         else:
             try:
-                for file in os.listdir(self.cache_dir):
-                    if file.endswith('.json'):
-                        os.remove(os.path.join(self.cache_dir, file))
+                self.cache.clear()
                 logger.info("Cleared all cache")
             except Exception as e:
                 logger.error(f"Error clearing all cache: {e}")
@@ -161,43 +138,18 @@ class ESPNDirectScraper:
             headers = {'User-Agent': self.get_random_user_agent()}
             
             logger.info(f"Fetching team roster from {url}")
-            response = requests.get(url, headers=headers, timeout=10)
+            response = http_session.get(url, headers=headers, timeout=10)
             
             if response.status_code != 200:
                 logger.error(f"Error fetching team roster: {response.status_code}")
                 return []
             
-            soup = BeautifulSoup(response.text, 'html.parser')
+            # The embedded page data has the whole roster without parsing the HTML
+            players = espn_page_parser.roster_from_page_data(espn_page_parser.extract_page_data(response.text))
             
-            # Find pitchers in roster
-            players = []
-            
-            # Look for table rows
-            for row in soup.select('tr'):
-                cells = row.select('td')
-                if len(cells) >= 3:
-                    name_cell = cells[1] if len(cells) > 1 else None
-                    position_cell = cells[2] if len(cells) > 2 else None
-                    
-                    if name_cell and position_cell:
-                        name = name_cell.text.strip()
-                        position = position_cell.text.strip()
-                        
-                        # Get player link if available
-                        link_elem = name_cell.select_one('a')
-                        link = link_elem['href'] if link_elem and 'href' in link_elem.attrs else None
-                        
-                        # Extract player ID from link
-                        player_id = None
-                        if link and '/id/' in link:
-                            player_id = link.split('/id/')[1].split('/')[0]
-                        
-                        players.append({
-                            'name': name,
-                            'position': position,
-                            'link': link,
-                            'id': player_id
-                        })
+            if players is None:
+                soup = espn_page_parser.parse_html(response.text, espn_page_parser.ROSTER_ROWS)
+                players = self.roster_from_rows(soup)
             
             # Save to cache
             self.save_to_cache(cache_key, players)
@@ -208,6 +160,38 @@ class ESPNDirectScraper:
             logger.error(f"Error fetching team roster: {e}")
             return []
     
+    def roster_from_rows(self, soup):
+        """Build a roster from the table rows of a roster page"""
+        players = []
+        
+        for row in soup.select('tr'):
+            cells = row.select('td')
+            if len(cells) >= 3:
+                name_cell = cells[1] if len(cells) > 1 else None
+                position_cell = cells[2] if len(cells) > 2 else None
+                
+                if name_cell and position_cell:
+                    name = name_cell.text.strip()
+                    position = position_cell.text.strip()
+                    
+                    # Get player link if available
+                    link_elem = name_cell.select_one('a')
+                    link = link_elem['href'] if link_elem and 'href' in link_elem.attrs else None
+                    
+                    # Extract player ID from link
+                    player_id = None
+                    if link and '/id/' in link:
+                        player_id = link.split('/id/')[1].split('/')[0]
+                    
+                    players.append({
+                        'name': name,
+                        'position': position,
+                        'link': link,
+                        'id': player_id
+                    })
+        
+        return players
+    
     def get_pitcher_stats_from_roster_page(self, team_name, pitcher_name):
         """Get pitcher stats from team roster page"""
         players = self.get_team_roster(team_name)
@@ -242,33 +226,47 @@ class ESPNDirectScraper:
             headers = {'User-Agent': self.get_random_user_agent()}
             
             logger.info(f"Fetching player page from {player_link}")
-            response = requests.get(player_link, headers=headers, timeout=10)
+            response = http_session.get(player_link, headers=headers, timeout=10)
             
             if response.status_code != 200:
                 logger.error(f"Error fetching player page: {response.status_code}")
                 return None
             
-            soup = BeautifulSoup(response.text, 'html.parser')
+            html = response.text
             
             # Find ERA in stats section
             era = None
             
-            # Method 1: Look for stat blocks
-            stat_blocks = soup.select('.PlayerStats__stat-item')
-            for block in stat_blocks:
-                label = block.select_one('.PlayerStats__stat-label')
-                value = block.select_one('.PlayerStats__stat-value')
-                
-                if label and value and 'ERA' in label.text:
-                    try:
-                        era = float(value.text)
+            # Method 1: Read the ERA from the JSON data embedded in the page,
+            # without parsing the HTML
+            for data in (espn_page_parser.extract_page_data(html), espn_page_parser.extract_player_info(html)):
+                if data:
+                    era = espn_page_parser.parse_era(espn_page_parser.find_stat(data, 'ERA'))
+                    if era is not None:
                         logger.info(f"Found ERA {era} for {pitcher_name} using method 1")
                         break
-                    except ValueError:
-                        pass
             
-            # Method 2: Look for ERA in table
-            if not era:
+            # Methods 2 and 3 only parse the stat blocks and tables
+            if era is None:
+                soup = espn_page_parser.parse_html(html, espn_page_parser.PLAYER_STATS)
+            
+            # Method 2: Look for stat blocks
+            if era is None:
+                stat_blocks = soup.select('.PlayerStats__stat-item')
+                for block in stat_blocks:
+                    label = block.select_one('.PlayerStats__stat-label')
+                    value = block.select_one('.PlayerStats__stat-value')
+                    
+                    if label and value and 'ERA' in label.text:
+                        try:
+                            era = float(value.text)
+                            logger.info(f"Found ERA {era} for {pitcher_name} using method 2")
+                            break
+                        except ValueError:
+                            pass
+            
+            # Method 3: Look for ERA in table
+            if era is None:
                 tables = soup.select('table')
                 for table in tables:
                     headers = [th.text.strip() for th in table.select('th')]
@@ -288,45 +286,26 @@ class ESPNDirectScraper:
                             if era_index < len(cells):
                                 try:
                                     era = float(cells[era_index].text.strip())
-                                    logger.info(f"Found ERA {era} for {pitcher_name} using method 2")
+                                    logger.info(f"Found ERA {era} for {pitcher_name} using method 3")
                                     break
                                 except ValueError:
                                     pass
             
-            # Method 3: Look for ERA in any text
-            if not era:
+            # Method 4: Look for ERA in any text, the only method that needs
+            # the whole page
+            if era is None:
                 era_pattern = r'ERA[:\s]+([0-9.]+)'
-                for text in soup.stripped_strings:
+                for text in espn_page_parser.parse_html(html).stripped_strings:
                     if 'ERA' in text:
                         match = re.search(era_pattern, text)
                         if match:
                             try:
                                 era = float(match.group(1))
-                                logger.info(f"Found ERA {era} for {pitcher_name} using method 3")
+                                logger.info(f"Found ERA {era} for {pitcher_name} using method 4")
                                 break
                             except ValueError:
                                 pass
             
-            # Method 4: Look for ERA in script data
-            if not era:
-                scripts = soup.select('script')
-                for script in scripts:
-                    if script.string and 'window.espn.playerInfo' in script.string:
-                        try:
-                            # Extract JSON data
-                            json_str = script.string.split('window.espn.playerInfo = ')[1].split(';</script>')[0]
-                            data = json.loads(json_str)
-                            
-                            # Look for ERA in player stats
-                            stats = data.get('stats', {}).get('baseball', {})
-                            for stat_type, stat_data in stats.items():
-                                if 'era' in stat_data:
-                                    era = float(stat_data['era'])
-                                    logger.info(f"Found ERA {era} for {pitcher_name} using method 4")
-                                    break
-                        except Exception as e:
-                            logger.error(f"Error parsing script data: {e}")
-            
             if era is not None:
                 return {
                     'era': era,
@@ -354,13 +333,13 @@ class ESPNDirectScraper:
             headers = {'User-Agent': self.get_random_user_agent()}
             
             logger.info(f"Searching for pitcher at {search_url}")
-            response = requests.get(search_url, headers=headers, timeout=10)
+            response = http_session.get(search_url, headers=headers, timeout=10)
             
             if response.status_code != 200:
                 logger.error(f"Error searching for pitcher: {response.status_code}")
                 return None
             
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = espn_page_parser.parse_html(response.text)
             
             # Find pitcher in search results
             results = []
@@ -403,65 +382,28 @@ class ESPNDirectScraper:
             headers = {'User-Agent': self.get_random_user_agent()}
             
             logger.info(f"Searching for pitcher on stats page: {search_url}")
-            response = requests.get(search_url, headers=headers, timeout=10)
+            response = http_session.get(search_url, headers=headers, timeout=10)
             
             if response.status_code != 200:
                 logger.error(f"Error accessing stats page: {response.status_code}")
                 return None
             
-            soup = BeautifulSoup(response.text, 'html.parser')
+            # Players and their stats are embedded as JSON in the page, so
+            # only parse the tables if they are not
+            found = espn_page_parser.find_pitcher_era(espn_page_parser.extract_page_data(response.text), pitcher_name)
+            if found is None:
+                soup = espn_page_parser.parse_html(response.text, espn_page_parser.STATS_TABLES)
+                found = espn_page_parser.find_pitcher_in_tables(soup, pitcher_name)
             
-            # Find the table with pitcher stats
-            tables = soup.select('table.Table')
-            
-            for table in tables:
-                # Find the ERA column index
-                headers = table.select('thead th')
-                era_index = -1
-                
-                for i, header in enumerate(headers):
-                    if header.text.strip() == 'ERA':
-                        era_index = i
-                        break
-                
-                if era_index == -1:
-                    continue
+            if found is not None:
+                era, player_link = found
+                logger.info(f"Found ERA {era} for {pitcher_name} on stats page")
                 
-                # Look for the pitcher in the table rows
-                rows = table.select('tbody tr')
-                
-                for row in rows:
-                    cells = row.select('td')
-                    if len(cells) <= era_index:
-                        continue
-                    
-                    # Get player name
-                    name_cell = cells[0]
-                    name_link = name_cell.select_one('a')
-                    
-                    if not name_link:
-                        continue
-                    
-                    player_name = name_link.text.strip()
-                    
-                    # Check if this is the pitcher we're looking for
-                    if pitcher_name.lower() in player_name.lower() or player_name.lower() in pitcher_name.lower():
-                        # Get ERA
-                        era_cell = cells[era_index]
-                        try:
-                            era = float(era_cell.text.strip())
-                            logger.info(f"Found ERA {era} for {pitcher_name} on stats page")
-                            
-                            # Get player link
-                            player_link = name_link.get('href', '')
-                            
-                            return {
-                                'era': era,
-                                'source': 'espn-stats-page',
-                                'url': player_link
-                            }
-                        except ValueError:
-                            pass
+                return {
+                    'era': era,
+                    'source': 'espn-stats-page',
+                    'url': player_link
+                }
             
             logger.warning(f"Pitcher {pitcher_name} not found on stats page")
             return None
@@ -482,65 +424,28 @@ class ESPNDirectScraper:
             headers = {'User-Agent': self.get_random_user_agent()}
             
             logger.info(f"Fetching team stats from {url}")
-            response = requests.get(url, headers=headers, timeout=10)
+            response = http_session.get(url, headers=headers, timeout=10)
             
             if response.status_code != 200:
                 logger.error(f"Error fetching team stats: {response.status_code}")
                 return None
             
-            soup = BeautifulSoup(response.text, 'html.parser')
+            # Players and their stats are embedded as JSON in the page, so
+            # only parse the tables if they are not
+            found = espn_page_parser.find_pitcher_era(espn_page_parser.extract_page_data(response.text), pitcher_name)
+            if found is None:
+                soup = espn_page_parser.parse_html(response.text, espn_page_parser.STATS_TABLES)
+                found = espn_page_parser.find_pitcher_in_tables(soup, pitcher_name)
             
-            # Find the table with pitcher stats
-            tables = soup.select('table.Table')
-            
-            for table in tables:
-                # Find the ERA column index
-                headers = table.select('thead th')
-                era_index = -1
-                
-                for i, header in enumerate(headers):
-                    if header.text.strip() == 'ERA':
-                        era_index = i
-                        break
-                
-                if era_index == -1:
-                    continue
+            if found is not None:
+                era, player_link = found
+                logger.info(f"Found ERA {era} for {pitcher_name} on team stats page")
                 
-                # Look for the pitcher in the table rows
-                rows = table.select('tbody tr')
-                
-                for row in rows:
-                    cells = row.select('td')
-                    if len(cells) <= era_index:
-                        continue
-                    
-                    # Get player name
-                    name_cell = cells[0]
-                    name_link = name_cell.select_one('a')
-                    
-                    if not name_link:
-                        continue
-                    
-                    player_name = name_link.text.strip()
-                    
-                    # Check if this is the pitcher we're looking for
-                    if pitcher_name.lower() in player_name.lower() or player_name.lower() in pitcher_name.lower():
-                        # Get ERA
-                        era_cell = cells[era_index]
-                        try:
-                            era = float(era_cell.text.strip())
-                            logger.info(f"Found ERA {era} for {pitcher_name} on team stats page")
-                            
-                            # Get player link
-                            player_link = name_link.get('href', '')
-                            
-                            return {
-                                'era': era,
-                                'source': 'espn-team-page',
-                                'url': player_link
-                            }
-                        except ValueError:
-                            pass
+                return {
+                    'era': era,
+                    'source': 'espn-team-page',
+                    'url': player_link
+                }
             
             logger.warning(f"Pitcher {pitcher_name} not found on team stats page")
             return None
@@ -1,4 +1,5 @@
-import requests
+import http_session
+import tiered_cache
 import json
 import os
 import logging
@@ -33,6 +34,9 @@ class ESPNLiveDataAPI:
         
         # Cache expiration time (30 minutes)
         self.cache_expiration = 30 * 60  # seconds
+        
+        # In-memory tier in front of the JSON cache files
+        self.cache = tiered_cache.get_cache(self.cache_dir, self.cache_expiration)
     
     def get_cached_data(self, cache_key):
         """
@@ -44,25 +48,12 @@ class ESPNLiveDataAPI:
         Returns:
             Cached data if it exists and is not expired, None otherwise
         """
-        cache_file = os.path.join(self.cache_dir, f"{cache_key}.json")
+        data = self.cache.get(cache_key, self.cache_expiration)
         
-        if os.path.exists(cache_file):
-            # Check if cache is expired
-            file_modified_time = os.path.getmtime(cache_file)
-            current_time = time.time()
-            
-            if current_time - file_modified_time < self.cache_expiration:
-                try:
-                    with open(cache_file, 'r') as f:
-                        data = json.load(f)
-                        logger.info(f"Using cached data for {cache_key}")
-                        return data
-                except Exception as e:
-                    logger.error(f"Error reading cache file: {e}")
-            else:
-                logger.info(f"Cache expired for {cache_key}")
+        if data is not None:
+            logger.info(f"Using cached data for {cache_key}")
         
-        return None
+        return data
     
     def save_to_cache(self, cache_key, data):
         """
@@ -72,14 +63,8 @@ class ESPNLiveDataAPI:
             cache_key: Key to identify the cache file
             data: Data to save
         """
-        cache_file = os.path.join(self.cache_dir, f"{cache_key}.json")
-        
-        try:
-            with open(cache_file, 'w') as f:
-                json.dump(data, f)
-                logger.info(f"Saved data to cache for {cache_key}")
-        except Exception as e:
-            logger.error(f"Error saving to cache: {e}")
+        if self.cache.set(cache_key, data):
+            logger.info(f"Saved data to cache for {cache_key}")
     
     def get_todays_games(self, force_refresh=False):
         """
@@ -104,7 +89,7 @@ class ESPNLiveDataAPI:
             
             # Make request to ESPN API
             url = f"{self.mlb_api_base}/scoreboard?dates={today}"
-            response = requests.get(url)
+            response = http_session.get(url)
             
             if response.status_code == 200:
                 data = response.json()
@@ -189,7 +174,7 @@ class ESPNLiveDataAPI:
         try:
             # Make request to ESPN API
             url = f"{self.espn_api_base}/sports/baseball/mlb/athletes/{pitcher_id}"
-            response = requests.get(url)
+            response = http_session.get(url)
             
             if response.status_code == 200:
                 data = response.json()
@@ -251,7 +236,7 @@ class ESPNLiveDataAPI:
         try:
             # Make request to ESPN API
             url = f"{self.espn_api_base}/sports/baseball/mlb/teams/{team_id}"
-            response = requests.get(url)
+            response = http_session.get(url)
             
             if response.status_code == 200:
                 data = response.json()
@@ -364,7 +349,7 @@ class ESPNLiveDataAPI:
         try:
             # Make request to ESPN API
             url = f"{self.mlb_api_base}/summary?event={game_id}"
-            response = requests.get(url)
+            response = http_session.get(url)
             
             if response.status_code == 200:
                 data = response.json()
@@ -0,0 +1,411 @@
+import os
+import re
+import glob
+import json
+import time
+import logging
+from bs4 import BeautifulSoup, SoupStrainer
+
+try:
+    import lxml
+except ImportError:  # Fall back to the stdlib html.parser backend
+    lxml = None
+
+logger = logging.getLogger('espn_page_parser')
+
+# HTML parser backend, overridable through the environment: 'lxml' (several
+# times faster, used when installed) or 'html.parser'
+DEFAULT_HTML_PARSER = os.environ.get('MLB_HTML_PARSER', 'html.parser' if lxml is None else 'lxml')
+
+# ESPN pages embed the data they render as JSON in a script tag
+PAGE_DATA_MARKER = "window['__espnfitt__']="
+PLAYER_INFO_MARKER = 'window.espn.playerInfo = '
+
+# Regions of ESPN pages the scraper reads. Classes are matched against the
+# whole class attribute, which is how parse_only sees it.
+ROSTER_ROWS = SoupStrainer('tr')
+STATS_TABLES = SoupStrainer('table')
+PLAYER_STATS = SoupStrainer(class_=re.compile(r'(^|\s)(Table|PlayerStats__stat-item)(\s|$)'))
+
+# Keys ESPN uses for a stat's label and value
+LABEL_KEYS = ('abbreviation', 'shortDisplayName', 'abbrev', 'lbl', 'label')
+VALUE_KEYS = ('displayValue', 'val', 'value')
+
+_decoder = json.JSONDecoder()
+
+
+def get_parser(name=None):
+    """
+    Get an HTML parser backend by name, falling back to html.parser if it
+    is unavailable
+
+    Args:
+        name: 'lxml' or 'html.parser' (defaults to DEFAULT_HTML_PARSER)
+
+    Returns:
+        Parser name for BeautifulSoup
+    """
+    name = name or DEFAULT_HTML_PARSER
+    if name == 'lxml' and lxml is None:
+        logger.warning("lxml is not installed, using html.parser")
+        return 'html.parser'
+    return name
+
+
+def parse_html(html, parse_only=None, parser=None):
+    """
+    Parse HTML with the configured backend
+
+    Args:
+        html: Page HTML
+        parse_only: SoupStrainer limiting the tree to a region of the page
+            (ROSTER_ROWS, STATS_TABLES or PLAYER_STATS), None for the whole page
+        parser: Parser backend (defaults to DEFAULT_HTML_PARSER)
+
+    Returns:
+        BeautifulSoup tree
+    """
+    return BeautifulSoup(html, get_parser(parser), parse_only=parse_only)
+
+
+def extract_json(html, marker):
+    """
+    Decode the JSON value assigned after a marker, without parsing the HTML
+
+    Args:
+        html: Page HTML
+        marker: Text just before the JSON value
+
+    Returns:
+        Decoded value, or None if the marker is missing or the JSON is invalid
+    """
+    start = html.find(marker)
+    if start < 0:
+        return None
+
+    try:
+        data, _ = _decoder.raw_decode(html, start + len(marker))
+        return data
+    except ValueError as e:
+        logger.warning(f"Invalid JSON after {marker}: {e}")
+        return None
+
+
+def extract_page_data(html):
+    """
+    Get the page content ESPN embeds as JSON
+
+    Args:
+        html: Page HTML
+
+    Returns:
+        The page's content dictionary (with 'roster', 'stats', 'player' or
+        'clubhouse' depending on the page), or None if it is not embedded
+    """
+    data = extract_json(html, PAGE_DATA_MARKER)
+    if not isinstance(data, dict):
+        return None
+    return data.get('page', {}).get('content')
+
+
+def extract_player_info(html):
+    """
+    Get the window.espn.playerInfo data older player pages embed
+
+    Args:
+        html: Page HTML
+
+    Returns:
+        Player info dictionary, or None if it is not embedded
+    """
+    data = extract_json(html, PLAYER_INFO_MARKER)
+    return data if isinstance(data, dict) else None
+
+
+def names_match(pitcher_name, player_name):
+    """
+    Check whether a name on a page is the pitcher, the way the scraper
+    always has: either name contains the other
+
+    Args:
+        pitcher_name: Name being looked up
+        player_name: Name on the page
+
+    Returns:
+        True if the names match
+    """
+    if not pitcher_name or not player_name:
+        return False
+    return pitcher_name.lower() in player_name.lower() or player_name.lower() in pitcher_name.lower()
+
+
+def parse_era(value):
+    """
+    Convert an ERA from a page to a float
+
+    Args:
+        value: ERA text or number
+
+    Returns:
+        ERA as a float, or None if it is not a number
+    """
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def stat_value(stats, abbreviation):
+    """
+    Find a stat in a list of ESPN stat entries
+
+    Args:
+        stats: List of stat dictionaries
+        abbreviation: Stat abbreviation, such as 'ERA'
+
+    Returns:
+        The stat's value, or None if it is not in the list
+    """
+    for stat in stats or []:
+        if not isinstance(stat, dict):
+            continue
+        if any(stat.get(key) == abbreviation for key in LABEL_KEYS):
+            for key in VALUE_KEYS:
+                if stat.get(key) not in (None, ''):
+                    return stat[key]
+    return None
+
+
+def find_stat(data, abbreviation='ERA'):
+    """
+    Find the first stat with an abbreviation anywhere in page data
+
+    Args:
+        data: Page data from extract_page_data or extract_player_info
+        abbreviation: Stat abbreviation, such as 'ERA'
+
+    Returns:
+        The stat's value, or None if it was not found
+    """
+    stack = [data]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, list):
+            value = stat_value(node, abbreviation)
+            if value is not None:
+                return value
+            stack.extend(reversed(node))
+        elif isinstance(node, dict):
+            # Older playerInfo data keeps stats as {'era': ...}
+            if abbreviation.lower() in node and not isinstance(node[abbreviation.lower()], (dict, list)):
+                return node[abbreviation.lower()]
+            stack.extend(reversed(list(node.values())))
+    return None
+
+
+def athlete_name(athlete):
+    """Get an athlete's name from page data"""
+    return athlete.get('name') or athlete.get('displayName') or ''
+
+
+def athlete_link(athlete):
+    """Get the link to an athlete's player page from page data"""
+    if athlete.get('href'):
+        return athlete['href']
+    for link in athlete.get('links') or []:
+        if isinstance(link, dict) and link.get('href'):
+            return link['href']
+    return None
+
+
+def athlete_position(athlete):
+    """Get an athlete's position abbreviation from page data"""
+    position = athlete.get('position')
+    if isinstance(position, dict):
+        return position.get('abbreviation') or position.get('abbrev')
+    return position
+
+
+def find_athlete_stat(data, pitcher_name, abbreviation='ERA'):
+    """
+    Find a player's stat in page data
+
+    Handles the team stats page (playerStats rows) and the team page's
+    leaders, where a category's leaders carry the stat as their value.
+
+    Args:
+        data: Page data from extract_page_data
+        pitcher_name: Name of the pitcher
+        abbreviation: Stat abbreviation, such as 'ERA'
+
+    Returns:
+        Tuple of (value, player link), or None if the player or stat was
+        not found
+    """
+    stack = [data]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, list):
+            stack.extend(reversed(node))
+            continue
+        if not isinstance(node, dict):
+            continue
+
+        if node.get('shortDisplayName') == abbreviation and isinstance(node.get('leaders'), list):
+            for leader in node['leaders']:
+                athlete = leader.get('athlete') if isinstance(leader, dict) else None
+                if isinstance(athlete, dict) and names_match(pitcher_name, athlete_name(athlete)):
+                    if leader.get('displayValue') not in (None, ''):
+                        return leader['displayValue'], athlete_link(athlete)
+
+        athlete = node.get('athlete')
+        if isinstance(athlete, dict) and names_match(pitcher_name, athlete_name(athlete)):
+            stat_groups = node.get('statGroups')
+            stats = stat_groups.get('stats') if isinstance(stat_groups, dict) else node.get('statistics') or node.get('stats')
+            value = stat_value(stats, abbreviation)
+            if value is not None:
+                return value, athlete_link(athlete)
+
+        stack.extend(reversed(list(node.values())))
+
+    return None
+
+
+def find_pitcher_era(data, pitcher_name):
+    """
+    Find a pitcher's ERA in page data
+
+    Args:
+        data: Page data from extract_page_data
+        pitcher_name: Name of the pitcher
+
+    Returns:
+        Tuple of (ERA, player link), or None if the pitcher or a numeric ERA
+        was not found
+    """
+    found = find_athlete_stat(data, pitcher_name, 'ERA')
+    if found is None:
+        return None
+
+    era = parse_era(found[0])
+    return (era, found[1] or '') if era is not None else None
+
+
+def roster_from_page_data(data):
+    """
+    Build a roster from the roster page's embedded data
+
+    Args:
+        data: Page data from extract_page_data
+
+    Returns:
+        List of players as returned by ESPNDirectScraper.get_team_roster, or
+        None if the data has no roster
+    """
+    roster = data.get('roster') if isinstance(data, dict) else None
+    groups = roster.get('groups') if isinstance(roster, dict) else None
+    if not groups:
+        return None
+
+    players = []
+    for group in groups:
+        for athlete in group.get('athletes') or []:
+            link = athlete_link(athlete)
+            player_id = athlete.get('id')
+            if player_id is None and link and '/id/' in link:
+                player_id = link.split('/id/')[1].split('/')[0]
+
+            players.append({
+                'name': athlete_name(athlete),
+                'position': athlete_position(athlete),
+                'link': link,
+                'id': str(player_id) if player_id is not None else None
+            })
+
+    return players
+
+
+def find_pitcher_in_tables(soup, pitcher_name):
+    """
+    Find a pitcher's ERA in stats tables with an ERA column
+
+    Args:
+        soup: Tree from parse_html, usually restricted to STATS_TABLES
+        pitcher_name: Name of the pitcher
+
+    Returns:
+        Tuple of (ERA, player link), or None if the pitcher was not found
+    """
+    for table in soup.select('table.Table'):
+        # Find the ERA column index
+        era_index = -1
+        for i, header in enumerate(table.select('thead th')):
+            if header.text.strip() == 'ERA':
+                era_index = i
+                break
+
+        if era_index == -1:
+            continue
+
+        # Look for the pitcher in the table rows
+        for row in table.select('tbody tr'):
+            cells = row.select('td')
+            if len(cells) <= era_index:
+                continue
+
+            name_link = cells[0].select_one('a')
+            if not name_link:
+                continue
+
+            if names_match(pitcher_name, name_link.text.strip()):
+                era = parse_era(cells[era_index].text.strip())
+                if era is not None:
+                    return era, name_link.get('href', '')
+
+    return None
+
+
+def benchmark(paths, repeat=5):
+    """
+    Time full parses against targeted extraction on saved pages
+
+    Args:
+        paths: HTML files to benchmark
+        repeat: Runs per file and method
+
+    Returns:
+        Dictionary mapping method name to milliseconds per pass over all
+        the files
+    """
+    pages = []
+    for path in paths:
+        with open(path, encoding='utf-8') as f:
+            pages.append(f.read())
+
+    methods = {'full html.parser': lambda html: parse_html(html, parser='html.parser')}
+    if lxml is not None:
+        methods['full lxml'] = lambda html: parse_html(html, parser='lxml')
+    methods['tables html.parser'] = lambda html: parse_html(html, STATS_TABLES, parser='html.parser')
+    if lxml is not None:
+        methods['tables lxml'] = lambda html: parse_html(html, STATS_TABLES, parser='lxml')
+    methods['page data'] = extract_page_data
+
+    results = {}
+    for name, method in methods.items():
+        start_time = time.perf_counter()
+        for _ in range(repeat):
+            for html in pages:
+                method(html)
+        results[name] = round((time.perf_counter() - start_time) * 1000 / repeat, 3)
+
+    return results
+
+
+if __name__ == "__main__":
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    paths = sorted(glob.glob(os.path.join(base_dir, '*_team_page.html')))
+
+    print(f"Benchmarking {len(paths)} pages, {sum(os.path.getsize(path) for path in paths)} bytes")
+    print(f"{'method':<22}{'ms':>12}")
+    for name, ms in benchmark(paths).items():
+        print(f"{name:<22}{ms:>12}")
@@ -1,4 +1,5 @@
-import requests
+import http_session
+import tiered_cache
 import json
 import os
 from datetime import datetime
@@ -15,40 +16,15 @@ class ESPNStatsAPI:
         self.cache_dir = 'cache/espn'
         self.cache_expiry = 3600 * 3  # Cache expiry in seconds (3 hours)
         os.makedirs(self.cache_dir, exist_ok=True)
+        self.cache = tiered_cache.get_cache(self.cache_dir, self.cache_expiry, envelope=True)
     
     def get_cached_data(self, cache_key):
         """Get data from cache if available and not expired"""
-        cache_file = os.path.join(self.cache_dir, f"{cache_key}.json")
-        
-        if os.path.exists(cache_file):
-            try:
-                with open(cache_file, 'r') as f:
-                    cached_data = json.load(f)
-                
-                # Check if cache is expired
-                cache_time = cached_data.get('cache_time', 0)
-                if (datetime.now() - datetime.fromtimestamp(cache_time)).total_seconds() < self.cache_expiry:
-                    return cached_data.get('data')
-            except Exception as e:
-                print(f"Error reading ESPN cache: {e}")
-        
-        return None
+        return self.cache.get(cache_key, self.cache_expiry)
     
     def save_to_cache(self, cache_key, data):
         """Save data to cache"""
-        cache_file = os.path.join(self.cache_dir, f"{cache_key}.json")
-        
-        try:
-            with open(cache_file, 'w') as f:
-                json.dump({
-                    'data': data,
-                    'cache_time': datetime.now().timestamp()
-                }, f)
-            
-            return True
-        except Exception as e:
-            print(f"Error saving ESPN data to cache: {e}")
-            return False
+        return self.cache.set(cache_key, data)
     
     def get_schedule(self, date):
         """
@@ -64,7 +40,7 @@ class ESPNStatsAPI:
             # Format date as YYYYMMDD for ESPN API
             formatted_date = date.replace('-', '')
             url = f"{self.base_url}/scoreboard?dates={formatted_date}"
-            response = requests.get(url)
+            response = http_session.get(url)
             data = response.json()
             
             # Save to cache
@@ -87,7 +63,7 @@ class ESPNStatsAPI:
         
         try:
             url = f"{self.base_url}/teams/{team_id}"
-            response = requests.get(url)
+            response = http_session.get(url)
             data = response.json()
             
             # Save to cache
@@ -110,7 +86,7 @@ class ESPNStatsAPI:
         
         try:
             url = f"{self.base_url}/athletes/{player_id}"
-            response = requests.get(url)
+            response = http_session.get(url)
             data = response.json()
             
             # Save to cache
@@ -137,7 +113,7 @@ class ESPNStatsAPI:
             
             # Search for pitcher
             search_url = f"https://www.espn.com/mlb/team/roster/_/name/{team_name_formatted}"
-            response = requests.get(search_url)
+            response = http_session.get(search_url)
             soup = BeautifulSoup(response.text, 'html.parser')
             
             # Find pitcher in roster
@@ -160,7 +136,7 @@ class ESPNStatsAPI:
             
             # Get pitcher stats page
             pitcher_url = f"https://www.espn.com{pitcher_link}"
-            response = requests.get(pitcher_url)
+            response = http_session.get(pitcher_url)
             soup = BeautifulSoup(response.text, 'html.parser')
             
             # Find ERA in stats table
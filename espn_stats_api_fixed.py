@@ -1,4 +1,5 @@
-import requests
+import http_session
+import tiered_cache
 from bs4 import BeautifulSoup
 import time
 import random
@@ -17,6 +18,7 @@ class ESPNStatsAPIFixed:
         self.cache_dir = 'cache/espn'
         self.cache_expiry = 3600 * 3  # Cache expiry in seconds (3 hours)
         os.makedirs(self.cache_dir, exist_ok=True)
+        self.cache = tiered_cache.get_cache(self.cache_dir, self.cache_expiry, envelope=True)
         
         # User agents to rotate for avoiding scraping detection
         self.user_agents = [
@@ -32,37 +34,11 @@ class ESPNStatsAPIFixed:
     
     def get_cached_data(self, cache_key):
         """Get data from cache if available and not expired"""
-        cache_file = os.path.join(self.cache_dir, f"{cache_key}.json")
-        
-        if os.path.exists(cache_file):
-            try:
-                with open(cache_file, 'r') as f:
-                    cached_data = json.load(f)
-                
-                # Check if cache is expired
-                cache_time = cached_data.get('cache_time', 0)
-                if (datetime.now() - datetime.fromtimestamp(cache_time)).total_seconds() < self.cache_expiry:
-                    return cached_data.get('data')
-            except Exception as e:
-                print(f"Error reading ESPN cache: {e}")
-        
-        return None
+        return self.cache.get(cache_key, self.cache_expiry)
     
     def save_to_cache(self, cache_key, data):
         """Save data to cache"""
-        cache_file = os.path.join(self.cache_dir, f"{cache_key}.json")
-        
-        try:
-            with open(cache_file, 'w') as f:
-                json.dump({
-                    'data': data,
-                    'cache_time': datetime.now().timestamp()
-                }, f)
-            
-            return True
-        except Exception as e:
-            print(f"Error saving ESPN data to cache: {e}")
-            return False
+        return self.cache.set(cache_key, data)
     
     def get_team_abbreviation(self, team_name):
         """
@@ -132,7 +108,7 @@ class ESPNStatsAPIFixed:
             # Get team roster page
             url = f"{self.base_url}/team/roster/_/name/{team_abbr}"
             headers = {'User-Agent': self.get_random_user_agent()}
-            response = requests.get(url, headers=headers)
+            response = http_session.get(url, headers=headers)
             
             if response.status_code != 200:
                 print(f"Error fetching team roster: {response.status_code}")
@@ -206,7 +182,7 @@ class ESPNStatsAPIFixed:
             # Add a small delay to avoid rate limiting
             time.sleep(random.uniform(0.5, 1.5))
             
-            response = requests.get(pitcher_url, headers=headers)
+            response = http_session.get(pitcher_url, headers=headers)
             
             if response.status_code != 200:
                 print(f"Error fetching pitcher page: {response.status_code}")
@@ -1,5 +1,5 @@
 import requests
-import json
+import serializer
 import os
 from datetime import datetime
 
@@ -25,8 +25,7 @@ class FirstInningStatsAPI:
         
         if os.path.exists(cache_file):
             try:
-                with open(cache_file, 'r') as f:
-                    cached_data = json.load(f)
+                cached_data = serializer.load_file(cache_file)
                 
                 # Check if cache is expired
                 cache_time = cached_data.get('cache_time', 0)
@@ -42,11 +41,10 @@ class FirstInningStatsAPI:
         cache_file = os.path.join(self.cache_dir, f"{cache_key}.json")
         
         try:
-            with open(cache_file, 'w') as f:
-                json.dump({
-                    'data': data,
-                    'cache_time': datetime.now().timestamp()
-                }, f)
+            serializer.dump_file(cache_file, {
+                'data': data,
+                'cache_time': datetime.now().timestamp()
+            })
             
             return True
         except Exception as e:
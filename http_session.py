@@ -0,0 +1,692 @@
+import os
+import time
+import logging
+import tempfile
+import threading
+import contextvars
+from contextlib import contextmanager
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from urllib.parse import urlparse
+
+try:
+    import fcntl
+except ImportError:  # Buckets are kept per process where file locks are unavailable
+    fcntl = None
+
+logger = logging.getLogger('http_session')
+
+# Defaults, overridable through the environment
+DEFAULT_TIMEOUT = float(os.environ.get('MLB_HTTP_TIMEOUT', 10))
+DEFAULT_POOL_CONNECTIONS = int(os.environ.get('MLB_HTTP_POOL_CONNECTIONS', 10))
+DEFAULT_POOL_MAXSIZE = int(os.environ.get('MLB_HTTP_POOL_MAXSIZE', 6))
+DEFAULT_MAX_RETRIES = int(os.environ.get('MLB_HTTP_MAX_RETRIES', 2))
+DEFAULT_BACKOFF_FACTOR = float(os.environ.get('MLB_HTTP_BACKOFF_FACTOR', 0.3))
+DEFAULT_BREAKER_FAILURES = int(os.environ.get('MLB_HTTP_BREAKER_FAILURES', 5))
+DEFAULT_BREAKER_COOLDOWN = float(os.environ.get('MLB_HTTP_BREAKER_COOLDOWN', 30))
+DEFAULT_RATE_LIMIT = float(os.environ.get('MLB_HTTP_RATE_LIMIT', 5))
+DEFAULT_RATE_BURST = int(os.environ.get('MLB_HTTP_RATE_BURST', 10))
+DEFAULT_RATE_RESERVE = int(os.environ.get('MLB_HTTP_RATE_RESERVE', 4))
+DEFAULT_RATE_MAX_WAIT = float(os.environ.get('MLB_HTTP_RATE_MAX_WAIT', 30))
+DEFAULT_RATE_LIMIT_DIR = os.environ.get('MLB_HTTP_RATE_LIMIT_DIR',
+                                        os.path.join(tempfile.gettempdir(), 'mlb_rate_limits'))
+
+
+def parse_host_rates(value):
+    """
+    Parse per-host rate limits
+
+    Args:
+        value: Comma-separated host=requests_per_second pairs
+
+    Returns:
+        Dictionary mapping host to requests per second
+    """
+    rates = {}
+    for pair in value.split(','):
+        host, _, rate = pair.partition('=')
+        if host.strip() and rate.strip():
+            rates[host.strip()] = float(rate)
+    return rates
+
+
+# Hosts with their own rate, overriding MLB_HTTP_RATE_LIMIT. Baseball
+# Reference blocks clients making more than 20 requests a minute.
+HOST_RATE_LIMITS = parse_host_rates(os.environ.get('MLB_HTTP_HOST_RATE_LIMITS', 'www.baseball-reference.com=0.3'))
+
+# Priority of requests made in the current context: 'live' unless inside background()
+_priority = contextvars.ContextVar('http_priority', default='live')
+
+
+class HostUnavailable(requests.exceptions.ConnectionError):
+    """
+    Raised without making a request while a host's circuit is open
+    
+    It is a ConnectionError, so callers fall back exactly as they do when
+    the host cannot be reached, only without waiting for a timeout.
+    """
+
+
+class RateLimited(requests.exceptions.ConnectionError):
+    """
+    Raised without making a request when no token is available in time
+    """
+
+
+class CircuitBreaker:
+    """
+    Stops requests to a host after repeated failures
+
+    The circuit is closed while the host works. After failure_threshold
+    consecutive failures it opens, and requests fail at once. Once the
+    cooldown has passed it is half-open: a single probe request goes through,
+    closing the circuit if it succeeds and opening it again if it fails.
+    """
+
+    def __init__(self, host, failure_threshold=DEFAULT_BREAKER_FAILURES, cooldown=DEFAULT_BREAKER_COOLDOWN):
+        """
+        Initialize the breaker
+
+        Args:
+            host: Host name, for logging
+            failure_threshold: Consecutive failures that open the circuit
+            cooldown: Seconds the circuit stays open before a probe
+        """
+        self.host = host
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+
+        self.state = 'closed'
+        self.failures = 0
+        self.opened_at = 0
+        self.probing = False
+        self.lock = threading.Lock()
+
+    def allow(self):
+        """
+        Check whether a request may go to the host
+
+        Returns:
+            True if the request may be made, False if it should fail fast
+        """
+        with self.lock:
+            if self.state == 'closed':
+                return True
+
+            if self.state == 'open' and time.time() - self.opened_at >= self.cooldown:
+                self.state = 'half-open'
+
+            # Only one probe at a time while half-open
+            if self.state == 'half-open' and not self.probing:
+                self.probing = True
+                return True
+
+            return False
+
+    def release(self):
+        """Give back a half-open probe that was allowed but never made"""
+        with self.lock:
+            self.probing = False
+
+    def record_success(self):
+        """Close the circuit after a successful request"""
+        with self.lock:
+            if self.state != 'closed':
+                logger.info(f"Closed circuit for {self.host}")
+            self.state = 'closed'
+            self.failures = 0
+            self.probing = False
+
+    def record_failure(self):
+        """Count a failed request, opening the circuit if needed"""
+        with self.lock:
+            self.failures += 1
+            self.probing = False
+
+            if self.state == 'half-open' or (self.state == 'closed' and self.failures >= self.failure_threshold):
+                logger.warning(f"Opened circuit for {self.host} after {self.failures} failures")
+                self.state = 'open'
+                self.opened_at = time.time()
+
+
+class TokenBucketLimiter:
+    """
+    Per-host token buckets shared by every worker process
+
+    Each host's bucket holds up to burst tokens and refills at its rate in
+    tokens per second. A request takes one token, waiting for it if the
+    bucket is empty. Buckets are kept in small files under state_dir,
+    locked while they are updated, so all gunicorn workers on the machine
+    draw from the same buckets.
+
+    Background requests (see background()) leave reserve tokens in the
+    bucket. As tokens refill, live requests get them first, so warming
+    caches never makes a user wait for the bucket.
+    """
+
+    def __init__(self, rate=DEFAULT_RATE_LIMIT, burst=DEFAULT_RATE_BURST, reserve=DEFAULT_RATE_RESERVE,
+                 max_wait=DEFAULT_RATE_MAX_WAIT, state_dir=DEFAULT_RATE_LIMIT_DIR, host_rates=None):
+        """
+        Initialize the limiter
+
+        Args:
+            rate: Requests per second per host (0 disables the limit)
+            burst: Tokens a bucket holds, the requests that can go at once
+            reserve: Tokens background requests leave for live requests
+            max_wait: Seconds a request waits for a token before failing
+            state_dir: Directory for the shared bucket files
+            host_rates: Dictionary mapping host to its own requests per
+                second (defaults to HOST_RATE_LIMITS)
+        """
+        self.rate = rate
+        self.burst = burst
+        self.reserve = min(reserve, burst - 1)
+        self.max_wait = max_wait
+        self.host_rates = HOST_RATE_LIMITS if host_rates is None else host_rates
+        self.state_dir = state_dir
+
+        try:
+            os.makedirs(state_dir, exist_ok=True)
+        except OSError as e:
+            logger.warning(f"Cannot use {state_dir} for rate limits, limiting per process: {e}")
+            self.state_dir = None
+
+        # Buckets as [tokens, updated] when they are not shared through files
+        self.buckets = {}
+
+        # Per-host, per-priority wait counters
+        self.stats = {}
+        self.lock = threading.Lock()
+
+    def get_rate(self, host):
+        """
+        Get a host's rate
+
+        Args:
+            host: Host name (with port, if any)
+
+        Returns:
+            Requests per second, 0 if the host is not limited
+        """
+        return self.host_rates.get(host, self.rate)
+
+    @contextmanager
+    def bucket_state(self, host):
+        """
+        Lock a host's bucket and yield its [tokens, updated] state
+
+        Changes to the state are written back when the block exits.
+
+        Args:
+            host: Host name (with port, if any)
+        """
+        if fcntl is None or self.state_dir is None:
+            yield self.buckets.setdefault(host, [float(self.burst), time.time()])
+            return
+
+        path = os.path.join(self.state_dir, f"{host.replace(':', '_')}.bucket")
+        with open(path, 'a+') as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                f.seek(0)
+                try:
+                    tokens, updated = (float(value) for value in f.read().split())
+                    state = [tokens, updated]
+                except ValueError:
+                    # New or unreadable file, start with a full bucket
+                    state = [float(self.burst), time.time()]
+
+                yield state
+
+                f.seek(0)
+                f.truncate()
+                f.write(f"{state[0]} {state[1]}")
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def take(self, host, priority='live'):
+        """
+        Take a token from a host's bucket if one is available
+
+        Args:
+            host: Host name (with port, if any)
+            priority: 'live' or 'background'
+
+        Returns:
+            0 if a token was taken, otherwise the seconds until one should be
+        """
+        rate = self.get_rate(host)
+        floor = self.reserve if priority == 'background' else 0
+
+        with self.lock, self.bucket_state(host) as state:
+            now = time.time()
+            tokens = min(self.burst, state[0] + max(0, now - state[1]) * rate)
+
+            if tokens >= floor + 1:
+                tokens -= 1
+                wait = 0
+            else:
+                wait = (floor + 1 - tokens) / rate
+
+            state[0] = tokens
+            state[1] = now
+
+        return wait
+
+    def acquire(self, host, priority='live'):
+        """
+        Wait for a token for a request to a host
+
+        Args:
+            host: Host name (with port, if any)
+            priority: 'live' or 'background'
+
+        Returns:
+            Seconds spent waiting
+
+        Raises:
+            RateLimited: If no token was available within max_wait seconds
+        """
+        if self.get_rate(host) <= 0:
+            return 0
+
+        start_time = time.time()
+        waited = 0
+        while True:
+            wait = self.take(host, priority)
+
+            if not wait:
+                self.record_wait(host, priority, waited)
+                return waited
+
+            if waited + wait > self.max_wait:
+                self.record_wait(host, priority, waited, rejected=True)
+                raise RateLimited(f"No {priority} request token for {host} within {self.max_wait}s")
+
+            time.sleep(wait)
+            waited = time.time() - start_time
+
+    def record_wait(self, host, priority, waited, rejected=False):
+        """
+        Update wait counters for a request
+
+        Args:
+            host: Host the request is for
+            priority: 'live' or 'background'
+            waited: Seconds spent waiting for a token
+            rejected: Whether the request gave up waiting
+        """
+        with self.lock:
+            stats = self.stats.setdefault(host, {}).setdefault(
+                priority, {'requests': 0, 'waited': 0, 'rejected': 0, 'wait_seconds': 0.0, 'max_wait_seconds': 0.0}
+            )
+            if rejected:
+                stats['rejected'] += 1
+            else:
+                stats['requests'] += 1
+            if waited > 0:
+                stats['waited'] += 1
+                stats['wait_seconds'] += waited
+                stats['max_wait_seconds'] = max(stats['max_wait_seconds'], waited)
+
+    def get_stats(self):
+        """
+        Get limiter wait statistics for this process
+
+        Returns:
+            Per-host, per-priority request and wait counters
+        """
+        with self.lock:
+            hosts = {
+                host: {
+                    priority: {
+                        'requests': stats['requests'],
+                        'waited': stats['waited'],
+                        'rejected': stats['rejected'],
+                        'wait_seconds': round(stats['wait_seconds'], 4),
+                        'max_wait_seconds': round(stats['max_wait_seconds'], 4),
+                        'avg_wait_seconds': round(stats['wait_seconds'] / stats['requests'], 4) if stats['requests'] else None
+                    }
+                    for priority, stats in priorities.items()
+                }
+                for host, priorities in self.stats.items()
+            }
+
+        return {
+            'hosts': hosts,
+            'rate': self.rate,
+            'burst': self.burst,
+            'reserve': self.reserve,
+            'host_rates': dict(self.host_rates),
+            'shared': fcntl is not None and self.state_dir is not None
+        }
+
+
+class HTTPTransport:
+    """
+    Shared HTTP transport with per-host keep-alive connection pools
+    """
+
+    def __init__(self, pool_connections=DEFAULT_POOL_CONNECTIONS, pool_maxsize=DEFAULT_POOL_MAXSIZE,
+                 max_retries=DEFAULT_MAX_RETRIES, backoff_factor=DEFAULT_BACKOFF_FACTOR,
+                 timeout=DEFAULT_TIMEOUT, breaker_failures=DEFAULT_BREAKER_FAILURES,
+                 breaker_cooldown=DEFAULT_BREAKER_COOLDOWN, limiter=None):
+        """
+        Initialize the HTTP transport
+
+        Args:
+            pool_connections: Number of hosts to keep connection pools for
+            pool_maxsize: Connections kept alive per host, also the cap on
+                in-flight requests to any one host
+            max_retries: Retries for connection errors and 429/5xx responses
+            backoff_factor: Backoff factor between retries (0.3 -> 0.3s, 0.6s, ...)
+            timeout: Default request timeout in seconds
+            breaker_failures: Consecutive failures (errors or 5xx responses
+                after retries) that open a host's circuit
+            breaker_cooldown: Seconds a host's circuit stays open
+            limiter: TokenBucketLimiter throttling requests per host (None
+                for no limit)
+        """
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.timeout = timeout
+        self.breaker_failures = breaker_failures
+        self.breaker_cooldown = breaker_cooldown
+        self.limiter = limiter
+
+        retry = Retry(
+            total=max_retries,
+            connect=max_retries,
+            read=max_retries,
+            status=max_retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=frozenset(['GET', 'HEAD']),
+            raise_on_status=False
+        )
+
+        self.adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize,
+                                   max_retries=retry, pool_block=True)
+
+        self.session = requests.Session()
+        self.session.mount('https://', self.adapter)
+        self.session.mount('http://', self.adapter)
+
+        # Per-host semaphores capping concurrent requests
+        self.host_semaphores = {}
+
+        # Per-host circuit breakers
+        self.host_breakers = {}
+
+        # Per-host request counters
+        self.host_stats = {}
+        self.lock = threading.Lock()
+
+    def get_host_semaphore(self, host):
+        """
+        Get the semaphore capping concurrent requests to a host
+
+        Args:
+            host: Host name (with port, if any)
+
+        Returns:
+            Semaphore for the host
+        """
+        with self.lock:
+            if host not in self.host_semaphores:
+                self.host_semaphores[host] = threading.BoundedSemaphore(self.pool_maxsize)
+            return self.host_semaphores[host]
+
+    def get_host_breaker(self, host):
+        """
+        Get the circuit breaker for a host
+
+        Args:
+            host: Host name (with port, if any)
+
+        Returns:
+            CircuitBreaker for the host
+        """
+        with self.lock:
+            if host not in self.host_breakers:
+                self.host_breakers[host] = CircuitBreaker(host, self.breaker_failures, self.breaker_cooldown)
+            return self.host_breakers[host]
+
+    def get(self, url, **kwargs):
+        """
+        Make a GET request over a pooled connection
+
+        Args:
+            url: Request URL
+            **kwargs: Extra arguments passed to requests.Session.get. A
+                'priority' of 'live' or 'background' overrides the priority
+                of the current context for the rate limiter.
+
+        Returns:
+            HTTP response
+
+        Raises:
+            RateLimited: If the rate limiter had no token in time
+            HostUnavailable: If the host's circuit is open
+        """
+        priority = kwargs.pop('priority', None) or get_priority()
+        kwargs.setdefault('timeout', self.timeout)
+        host = urlparse(url).netloc
+        breaker = self.get_host_breaker(host)
+
+        # Fail fast before taking a token, so an outage does not queue
+        # requests behind the rate limiter
+        if not breaker.allow():
+            self.record_request(host, 0, rejected=True)
+            raise HostUnavailable(f"Circuit open for {host}")
+
+        if self.limiter is not None:
+            try:
+                self.limiter.acquire(host, priority)
+            except RateLimited:
+                breaker.release()
+                raise
+
+        with self.get_host_semaphore(host):
+            start_time = time.time()
+            try:
+                response = self.session.get(url, **kwargs)
+            except BaseException:
+                breaker.record_failure()
+                self.record_request(host, time.time() - start_time, failed=True)
+                raise
+
+            # 5xx responses are what is left after retries
+            if response is not None and response.status_code >= 500:
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+
+            self.record_request(host, time.time() - start_time)
+            return response
+
+    def record_request(self, host, elapsed, failed=False, rejected=False):
+        """
+        Update counters for a finished request
+
+        Args:
+            host: Host the request went to
+            elapsed: Wall-clock time of the request in seconds
+            failed: Whether the request raised an exception
+            rejected: Whether the request was refused by the host's circuit
+        """
+        with self.lock:
+            stats = self.host_stats.setdefault(host, {'requests': 0, 'errors': 0, 'rejected': 0, 'total_seconds': 0.0})
+            if rejected:
+                stats['rejected'] += 1
+            elif failed:
+                stats['errors'] += 1
+            else:
+                stats['requests'] += 1
+                stats['total_seconds'] += elapsed
+
+    def get_connection_counts(self):
+        """
+        Count connections opened so far per host
+
+        Returns:
+            Dictionary mapping host to the number of connections opened
+        """
+        counts = {}
+        pool_manager = self.adapter.poolmanager
+
+        for key in list(pool_manager.pools.keys()):
+            pool = pool_manager.pools.get(key)
+            if pool is None:
+                continue
+            host = pool.host if pool.port in (None, 80, 443) else f"{pool.host}:{pool.port}"
+            counts[host] = counts.get(host, 0) + pool.num_connections
+
+        return counts
+
+    def get_stats(self):
+        """
+        Get connection reuse statistics
+
+        Returns:
+            Per-host and total request, connection and reuse counters
+        """
+        connection_counts = self.get_connection_counts()
+
+        with self.lock:
+            hosts = {}
+            for host, stats in self.host_stats.items():
+                opened = connection_counts.get(host, 0)
+                requests_made = stats['requests']
+                breaker = self.host_breakers.get(host)
+                hosts[host] = {
+                    'requests': requests_made,
+                    'errors': stats['errors'],
+                    'rejected': stats['rejected'],
+                    'circuit': breaker.state if breaker else 'closed',
+                    'connections_opened': opened,
+                    # Every request that did not open a connection skipped a TCP/TLS handshake
+                    'handshakes_saved': max(0, requests_made - opened),
+                    'avg_seconds': round(stats['total_seconds'] / requests_made, 4) if requests_made else None
+                }
+
+        total_requests = sum(host['requests'] for host in hosts.values())
+        total_opened = sum(host['connections_opened'] for host in hosts.values())
+
+        return {
+            'hosts': hosts,
+            'requests': total_requests,
+            'connections_opened': total_opened,
+            'handshakes_saved': sum(host['handshakes_saved'] for host in hosts.values()),
+            'reuse_ratio': round(1 - total_opened / total_requests, 3) if total_requests else None,
+            'pool_maxsize': self.pool_maxsize,
+            'timeout': self.timeout,
+            'rate_limits': self.limiter.get_stats() if self.limiter is not None else None
+        }
+
+    def reset_stats(self):
+        """Reset request counters"""
+        with self.lock:
+            self.host_stats = {}
+
+    def close(self):
+        """Close all pooled connections"""
+        self.session.close()
+
+
+# Process-wide transport shared by every data-source module
+_transport = None
+_transport_lock = threading.Lock()
+
+
+def get_transport():
+    """
+    Get the shared HTTP transport, creating it on first use
+
+    Returns:
+        Shared HTTPTransport
+    """
+    global _transport
+
+    with _transport_lock:
+        if _transport is None:
+            _transport = HTTPTransport(limiter=TokenBucketLimiter())
+        return _transport
+
+
+def configure(**kwargs):
+    """
+    Replace the shared HTTP transport with a new configuration
+
+    Args:
+        **kwargs: Arguments passed to HTTPTransport (the limiter defaults to
+            a TokenBucketLimiter with the default settings)
+
+    Returns:
+        New shared HTTPTransport
+    """
+    global _transport
+
+    kwargs.setdefault('limiter', TokenBucketLimiter())
+
+    with _transport_lock:
+        if _transport is not None:
+            _transport.close()
+        _transport = HTTPTransport(**kwargs)
+        logger.info(f"Configured HTTP transport: pool_maxsize={_transport.pool_maxsize}, "
+                    f"retries={_transport.max_retries}, timeout={_transport.timeout}s")
+        return _transport
+
+
+def get_priority():
+    """
+    Get the rate limiter priority of requests made in the current context
+
+    Returns:
+        'live' or 'background'
+    """
+    return _priority.get()
+
+
+@contextmanager
+def background():
+    """
+    Mark requests made inside the block as background work
+
+    Background requests, such as prefetching and cache rebuilds, leave part
+    of each host's rate limit for live requests. The priority follows the
+    context into asyncio tasks and asyncio.to_thread; work handed to a
+    thread pool must be submitted through contextvars.copy_context().run.
+    """
+    token = _priority.set('background')
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def get(url, **kwargs):
+    """
+    Make a GET request through the shared HTTP transport
+
+    Args:
+        url: Request URL
+        **kwargs: Extra arguments passed to requests.Session.get
+
+    Returns:
+        HTTP response
+    """
+    return get_transport().get(url, **kwargs)
+
+
+def get_stats():
+    """
+    Get connection reuse statistics for the shared HTTP transport
+
+    Returns:
+        Transport statistics
+    """
+    return get_transport().get_stats()
@@ -2,6 +2,11 @@ import os
 import json
 import logging
 import time
+import threading
+import contextvars
+import tiered_cache
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from datetime import datetime
 from espn_direct_scraper import ESPNDirectScraper
 from espn_live_data_api import ESPNLiveDataAPI
@@ -12,6 +17,171 @@ logging.basicConfig(level=logging.INFO,
                     filename='integrated_espn_data_api.log')
 logger = logging.getLogger('integrated_espn_data_api')
 
+# Seconds each ERA source may take before its answer is ignored, and the
+# threads shared by all ERA lookups; overridable through the environment
+DEFAULT_SCRAPER_BUDGET = float(os.environ.get('MLB_ERA_SCRAPER_BUDGET', 8))
+DEFAULT_API_BUDGET = float(os.environ.get('MLB_ERA_API_BUDGET', 4))
+DEFAULT_RESOLVER_WORKERS = int(os.environ.get('MLB_ERA_RESOLVER_WORKERS', 8))
+
+# An ERA source: a function taking (team_name, pitcher_name, force_refresh)
+# and returning ERA data, and the seconds its answer is waited for
+ERASource = namedtuple('ERASource', ['name', 'lookup', 'budget'])
+
+def is_trusted(era_data):
+    """
+    Check whether ERA data holds an actual ERA
+    
+    Args:
+        era_data: ERA data returned by a source
+        
+    Returns:
+        True if the ERA is present
+    """
+    return bool(era_data) and era_data.get('era') not in (None, 'N/A')
+
+class HedgedERAResolver:
+    """
+    Queries every ERA source at once and takes the first trusted answer
+    
+    Each source only gets its latency budget; a source that has not answered
+    by then is ignored, and calls that have not started are cancelled once
+    another source wins. Calls already running finish in the background and
+    still count toward the source's latency.
+    """
+    
+    def __init__(self, sources, max_workers=DEFAULT_RESOLVER_WORKERS):
+        """
+        Initialize the resolver
+        
+        Args:
+            sources: ERASource list, in order of preference when several
+                answer at the same time
+            max_workers: Threads shared by all lookups
+        """
+        self.sources = sources
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='era-resolver')
+        self.lock = threading.Lock()
+        self.stats = {
+            source.name: {'calls': 0, 'wins': 0, 'misses': 0, 'errors': 0, 'timeouts': 0,
+                          'latency_total': 0.0, 'latency_max': 0.0, 'completed': 0}
+            for source in sources
+        }
+    
+    def call_source(self, source, team_name, pitcher_name, force_refresh):
+        """
+        Call one source, recording its latency and outcome
+        
+        Args:
+            source: ERASource
+            team_name: Name of the team
+            pitcher_name: Name of the pitcher
+            force_refresh: Force refresh of cache
+            
+        Returns:
+            ERA data, or None if the source failed
+        """
+        start_time = time.time()
+        
+        try:
+            era_data = source.lookup(team_name, pitcher_name, force_refresh)
+            outcome = None if is_trusted(era_data) else 'misses'
+        except Exception as e:
+            logger.error(f"Error getting ERA for {pitcher_name} ({team_name}) from {source.name}: {e}")
+            era_data = None
+            outcome = 'errors'
+        
+        latency = time.time() - start_time
+        with self.lock:
+            stats = self.stats[source.name]
+            stats['completed'] += 1
+            stats['latency_total'] += latency
+            stats['latency_max'] = max(stats['latency_max'], latency)
+            if outcome:
+                stats[outcome] += 1
+        
+        return era_data
+    
+    def resolve(self, team_name, pitcher_name, force_refresh=False):
+        """
+        Get a pitcher's ERA from whichever source answers first
+        
+        Args:
+            team_name: Name of the team
+            pitcher_name: Name of the pitcher
+            force_refresh: Force refresh of cache
+            
+        Returns:
+            Tuple of (ERA data, source name), or (None, None) if no source
+            returned an ERA within its budget
+        """
+        start_time = time.time()
+        pending = {}
+        
+        with self.lock:
+            for source in self.sources:
+                self.stats[source.name]['calls'] += 1
+        
+        for source in self.sources:
+            future = self.executor.submit(contextvars.copy_context().run, self.call_source,
+                                          source, team_name, pitcher_name, force_refresh)
+            pending[future] = source
+        
+        try:
+            while pending:
+                now = time.time()
+                for future, source in list(pending.items()):
+                    if now >= start_time + source.budget:
+                        logger.warning(f"{source.name} took over {source.budget}s for {pitcher_name} ({team_name})")
+                        del pending[future]
+                        with self.lock:
+                            self.stats[source.name]['timeouts'] += 1
+                
+                if not pending:
+                    break
+                
+                timeout = min(start_time + source.budget for source in pending.values()) - now
+                done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+                
+                # Sources answering together are taken in order of preference
+                for source in self.sources:
+                    for future in done:
+                        if pending.get(future) is source:
+                            del pending[future]
+                            era_data = future.result()
+                            if is_trusted(era_data):
+                                with self.lock:
+                                    self.stats[source.name]['wins'] += 1
+                                return era_data, source.name
+        finally:
+            for future in pending:
+                future.cancel()
+        
+        return None, None
+    
+    def get_stats(self):
+        """
+        Get per-source win rates and latencies
+        
+        Returns:
+            Dictionary mapping source name to its counters, 'win_rate' and
+            average and maximum latency in milliseconds
+        """
+        with self.lock:
+            results = {}
+            for name, stats in self.stats.items():
+                completed = stats['completed']
+                results[name] = {
+                    'calls': stats['calls'],
+                    'wins': stats['wins'],
+                    'win_rate': round(stats['wins'] / stats['calls'], 3) if stats['calls'] else None,
+                    'misses': stats['misses'],
+                    'errors': stats['errors'],
+                    'timeouts': stats['timeouts'],
+                    'avg_latency_ms': round(stats['latency_total'] / completed * 1000, 1) if completed else None,
+                    'max_latency_ms': round(stats['latency_max'] * 1000, 1)
+                }
+            return results
+
 class IntegratedESPNDataAPI:
     """
     A class that integrates both the ESPN Live Data API and the ESPN Direct Scraper
@@ -36,6 +206,18 @@ class IntegratedESPNDataAPI:
         
         # Cache expiration time (15 minutes)
         self.cache_expiration = 15 * 60  # seconds
+        
+        # In-memory tier in front of the JSON cache files
+        self.cache = tiered_cache.get_cache(self.cache_dir, self.cache_expiration)
+        
+        # Both sources are queried at once for each ERA; the scraper is
+        # preferred when both answer together
+        self.era_resolver = HedgedERAResolver([
+            ERASource('espn-scraper', lambda team_name, pitcher_name, force_refresh:
+                      self.espn_scraper.get_pitcher_era(team_name, pitcher_name), DEFAULT_SCRAPER_BUDGET),
+            ERASource('espn-api', lambda team_name, pitcher_name, force_refresh:
+                      self.espn_api.get_pitcher_era(team_name, pitcher_name, force_refresh), DEFAULT_API_BUDGET)
+        ])
     
     def get_cached_data(self, cache_key):
         """
@@ -47,25 +229,12 @@ class IntegratedESPNDataAPI:
         Returns:
             Cached data if it exists and is not expired, None otherwise
         """
-        cache_file = os.path.join(self.cache_dir, f"{cache_key}.json")
+        data = self.cache.get(cache_key, self.cache_expiration)
         
-        if os.path.exists(cache_file):
-            # Check if cache is expired
-            file_modified_time = os.path.getmtime(cache_file)
-            current_time = time.time()
-            
-            if current_time - file_modified_time < self.cache_expiration:
-                try:
-                    with open(cache_file, 'r') as f:
-                        data = json.load(f)
-                        logger.info(f"Using cached data for {cache_key}")
-                        return data
-                except Exception as e:
-                    logger.error(f"Error reading cache file: {e}")
-            else:
-                logger.info(f"Cache expired for {cache_key}")
-        
-        return None
+        if data is not None:
+            logger.info(f"Using cached data for {cache_key}")
+        
+        return data
     
     def save_to_cache(self, cache_key, data):
         """
@@ -75,14 +244,8 @@ class IntegratedESPNDataAPI:
             cache_key: Key to identify the cache file
             data: Data to save
         """
-        cache_file = os.path.join(self.cache_dir, f"{cache_key}.json")
-        
-        try:
-            with open(cache_file, 'w') as f:
-                json.dump(data, f)
-                logger.info(f"Saved data to cache for {cache_key}")
-        except Exception as e:
-            logger.error(f"Error saving to cache: {e}")
+        if self.cache.set(cache_key, data):
+            logger.info(f"Saved data to cache for {cache_key}")
     
     def clear_cache(self, cache_key=None):
         """
@@ -92,18 +255,14 @@ class IntegratedESPNDataAPI:
             cache_key: Key to identify the cache file, or None to clear all cache
         """
         if cache_key:
-            cache_file = os.path.join(self.cache_dir, f"{cache_key}.json")
-            if os.path.exists(cache_file):
-                try:
-                    os.remove(cache_file)
-                    logger.info(f"Cleared cache for {cache_key}")
-                except Exception as e:
-                    logger.error(f"Error clearing cache for {cache_key}: {e}")
+            try:
+                self.cache.delete(cache_key)
+                logger.info(f"Cleared cache for {cache_key}")
+            except Exception as e:
+                logger.error(f"Error clearing cache for {cache_key}: {e}")
         else:
             try:
-                for file in os.listdir(self.cache_dir):
-                    if file.endswith('.json'):
-                        os.remove(os.path.join(self.cache_dir, file))
+                self.cache.clear()
                 logger.info("Cleared all cache")
             except Exception as e:
                 logger.error(f"Error clearing all cache: {e}")
@@ -194,24 +353,14 @@ class IntegratedESPNDataAPI:
         if cached_data:
             return cached_data
         
-        # Try multiple methods to get accurate ERA
+        # Query the scraper and the ESPN API together and keep the first ERA
+        era_data, source = self.era_resolver.resolve(team_name, pitcher_name, force_refresh)
         
-        # Method 1: Try ESPN Direct Scraper first (most accurate)
-        era_data = self.espn_scraper.get_pitcher_era(team_name, pitcher_name)
-        
-        if era_data and 'era' in era_data and era_data['era'] != 'N/A':
-            logger.info(f"Got ERA for {pitcher_name} ({team_name}) from ESPN Direct Scraper: {era_data['era']}")
+        if era_data:
+            logger.info(f"Got ERA for {pitcher_name} ({team_name}) from {source}: {era_data['era']}")
             self.save_to_cache(cache_key, era_data)
             return era_data
         
-        # Method 2: Try ESPN API
-        api_era_data = self.espn_api.get_pitcher_era(team_name, pitcher_name, force_refresh)
-        
-        if api_era_data and 'era' in api_era_data and api_era_data['era'] != 'N/A':
-            logger.info(f"Got ERA for {pitcher_name} ({team_name}) from ESPN API: {api_era_data['era']}")
-            self.save_to_cache(cache_key, api_era_data)
-            return api_era_data
-        
         # If we couldn't find the pitcher with either method, return a default value
         default_data = {
             'name': pitcher_name,
@@ -228,6 +377,15 @@ class IntegratedESPNDataAPI:
         
         return default_data
     
+    def get_source_stats(self):
+        """
+        Get win rates and latencies of the ERA sources
+        
+        Returns:
+            Per-source statistics from the ERA resolver
+        """
+        return self.era_resolver.get_stats()
+    
     def get_all_game_data(self, force_refresh=False):
         """
         Get all game data including accurate pitcher statistics
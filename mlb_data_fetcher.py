@@ -1,5 +1,5 @@
 import os
-import json
+import serializer
 import logging
 import time
 from datetime import datetime
@@ -56,10 +56,9 @@ class MLBDataFetcher:
             
             if current_time - file_modified_time < self.cache_expiration:
                 try:
-                    with open(cache_file, 'r') as f:
-                        data = json.load(f)
-                        logger.info(f"Using cached data for {cache_key}")
-                        return data
+                    data = serializer.load_file(cache_file)
+                    logger.info(f"Using cached data for {cache_key}")
+                    return data
                 except Exception as e:
                     logger.error(f"Error reading cache file: {e}")
             else:
@@ -78,9 +77,8 @@ class MLBDataFetcher:
         cache_file = os.path.join(self.cache_dir, f"{cache_key}.json")
         
         try:
-            with open(cache_file, 'w') as f:
-                json.dump(data, f)
-                logger.info(f"Saved data to cache for {cache_key}")
+            serializer.dump_file(cache_file, data)
+            logger.info(f"Saved data to cache for {cache_key}")
         except Exception as e:
             logger.error(f"Error saving to cache: {e}")
     
@@ -1,9 +1,21 @@
 import os
-import json
+import gzip
+import heapq
+import bisect
+import hashlib
 import logging
 import time
+import random
+import threading
+import serializer
+import http_session
+import tiered_cache
+from collections import namedtuple
+from functools import lru_cache
 from datetime import datetime, timedelta
-from mlb_stats_api import MLBStatsAPI
+from mlb_stats_api import CACHE_TTLS, MLBStatsAPI
+from async_data_engine import AsyncSlateEngine
+from probability_engine import MARKETS, ProbabilityEngine
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, 
@@ -11,17 +23,104 @@ logging.basicConfig(level=logging.INFO,
                     filename='mlb_prediction_api.log')
 logger = logging.getLogger('mlb_prediction_api')
 
+# Bumped when the serialized response format changes, to invalidate validators
+RESPONSE_FORMAT = 1
+
+MARKET_GAME_KEYS = {market: game_key for market, game_key, run_threshold in MARKETS}
+
+# Inputs for one game, computed once and shared by all markets
+GameFeatures = namedtuple('GameFeatures', [
+    'game_id', 'game_date', 'game_time', 'venue', 'status',
+    'home_team', 'away_team', 'home_pitcher', 'away_pitcher',
+    'home_pitcher_era', 'away_pitcher_era', 'home_era_source', 'away_era_source',
+    'home_team_stats', 'away_team_stats',
+    # Average of the two pitchers' performance scores, used by every market
+    'pitcher_score',
+    # Pitcher performance score shown in factor breakdowns
+    'factor_pitcher_score'
+])
+
+RATINGS = ('Bet', 'Lean', 'Pass')
+
+# Filters, paging and projection for a predictions response
+PredictionQuery = namedtuple('PredictionQuery', [
+    # Ratings to keep, or None for all
+    'ratings',
+    # Lowest probability to keep, or None
+    'min_probability',
+    # Page of matching predictions, best first
+    'limit', 'offset',
+    # Top-level keys to keep (game_id is always kept), or None for all
+    'fields',
+    # Keys dropped wherever they appear, or None
+    'exclude'
+])
+
+def parse_prediction_query(args):
+    """
+    Parse the filter, paging and projection query parameters
+    
+    Args:
+        args: Query parameters (e.g., request.args) with optional 'rating'
+            (comma-separated), 'min_probability', 'limit', 'offset', 'fields'
+            and 'exclude' (comma-separated keys)
+            
+    Returns:
+        PredictionQuery, or None if none of the parameters were given
+        
+    Raises:
+        ValueError: If a parameter is invalid
+    """
+    names = ('rating', 'min_probability', 'limit', 'offset', 'fields', 'exclude')
+    if not any(args.get(name) for name in names):
+        return None
+    
+    def split(name):
+        values = [value.strip() for value in (args.get(name) or '').split(',') if value.strip()]
+        return tuple(values) or None
+    
+    def number(name, convert, minimum):
+        value = args.get(name)
+        if not value:
+            return None
+        try:
+            value = convert(value)
+        except ValueError:
+            raise ValueError(f"Invalid {name}: {args.get(name)}")
+        if value < minimum:
+            raise ValueError(f"Invalid {name}: {args.get(name)}")
+        return value
+    
+    ratings = split('rating')
+    if ratings:
+        by_name = {rating.lower(): rating for rating in RATINGS}
+        unknown = [rating for rating in ratings if rating.lower() not in by_name]
+        if unknown:
+            raise ValueError(f"Invalid rating: {', '.join(unknown)}")
+        ratings = tuple(rating for rating in RATINGS if rating.lower() in {value.lower() for value in ratings})
+    
+    return PredictionQuery(
+        ratings=ratings,
+        min_probability=number('min_probability', float, 0),
+        limit=number('limit', int, 0),
+        offset=number('offset', int, 0) or 0,
+        fields=split('fields'),
+        exclude=split('exclude')
+    )
+
 class MLBPredictionAPI:
     """
     API for MLB predictions with real-time data
     """
     
-    def __init__(self, cache_dir=None):
+    def __init__(self, cache_dir=None, use_async_engine=True):
         """
         Initialize the MLB prediction API
         
         Args:
             cache_dir: Directory to store cache files
+            use_async_engine: Fetch each slate's schedule, pitchers and team
+                stats concurrently with the asyncio engine
         """
         # Use Render's cache directory or fallback to original path
         if cache_dir is None:
@@ -36,12 +135,40 @@ class MLBPredictionAPI:
         # Initialize MLB data fetcher
         self.mlb_stats_api = MLBStatsAPI()
         
+        # Asyncio engine for full-slate refreshes
+        self.use_async_engine = use_async_engine
+        self.slate_engine = AsyncSlateEngine(self.mlb_stats_api)
+        
+        # Scores each slate's games in one columnar pass
+        self.probability_engine = ProbabilityEngine()
+        
         # Cache expiration time (15 minutes)
         self.cache_expiration = 15 * 60  # seconds
         
+        # In-memory tier in front of the JSON cache files
+        self.cache = tiered_cache.get_cache(self.cache_dir, self.cache_expiration)
+        
+        # Per-game index of the latest predictions, updated with every slate
+        # build, kept in its own directory next to the snapshots
+        self.game_index = tiered_cache.get_cache(f"{self.cache_dir}_games", self.cache_expiration)
+        
         # Last refresh time
         self.last_refresh_time = 0
         
+        # Background refresh: dates served within served_window seconds are
+        # rebuilt once their predictions reach refresh_ahead of their lifetime
+        self.served_dates = {}
+        self.served_window = 60 * 60  # seconds
+        self.refresh_ahead = 0.8
+        self.refresh_check_interval = 60  # seconds
+        self.last_refresh_check = 0
+        self.refresh_thread = None
+        self.refresh_lock = threading.Lock()
+        
+        # Dates whose expired predictions are being rebuilt, so each date has
+        # at most one rebuild in flight
+        self.revalidation_threads = {}
+        
         # Prediction factors
         self.prediction_factors = {
             'pitcher_performance': 0.25,
@@ -68,25 +195,12 @@ class MLBPredictionAPI:
         Returns:
             Cached data if it exists and is not expired, None otherwise
         """
-        cache_file = os.path.join(self.cache_dir, f"{cache_key}.json")
+        data = self.cache.get(cache_key, lambda cached: self.mlb_stats_api.get_cache_ttl(cache_key, cached))
         
-        if os.path.exists(cache_file):
-            # Check if cache is expired
-            file_modified_time = os.path.getmtime(cache_file)
-            current_time = time.time()
-            
-            if current_time - file_modified_time < self.cache_expiration:
-                try:
-                    with open(cache_file, 'r') as f:
-                        data = json.load(f)
-                        logger.info(f"Using cached data for {cache_key}")
-                        return data
-                except Exception as e:
-                    logger.error(f"Error reading cache file: {e}")
-            else:
-                logger.info(f"Cache expired for {cache_key}")
+        if data is not None:
+            logger.info(f"Using cached data for {cache_key}")
         
-        return None
+        return data
     
     def save_to_cache(self, cache_key, data):
         """
@@ -96,14 +210,83 @@ class MLBPredictionAPI:
             cache_key: Key to identify the cache file
             data: Data to save
         """
-        cache_file = os.path.join(self.cache_dir, f"{cache_key}.json")
+        if self.cache.set(cache_key, data):
+            logger.info(f"Saved data to cache for {cache_key}")
+    
+    def save_predictions(self, target_date, predictions):
+        """
+        Save a date's predictions and index its games
+        
+        Args:
+            target_date: Date string in format YYYY-MM-DD
+            predictions: Predictions from build_predictions
+        """
+        self.save_to_cache(f"all_predictions_{target_date}", predictions)
+        self.index_games(target_date, predictions)
+    
+    def index_games(self, target_date, predictions):
+        """
+        Point each game in a predictions snapshot at its date and predictions
+        
+        The date's list of game IDs is kept as date_{date}. Games the date
+        no longer has are removed, and dates not indexed again within
+        CACHE_TTLS['final'] are dropped, so the index does not grow without
+        bound.
+        
+        Args:
+            target_date: Date string in format YYYY-MM-DD
+            predictions: Predictions with a 'games' table
+        """
+        timestamp = predictions.get('metadata', {}).get('timestamp')
+        games = predictions.get('games', [])
+        game_ids = [game['game_id'] for game in games]
+        
+        # Games dropped from the date since it was last indexed (postponed)
+        previous = self.game_index.get(f"date_{target_date}", float('inf')) or []
+        self.remove_indexed_games(target_date, set(previous) - set(game_ids))
+        
+        for game in games:
+            self.game_index.set(f"game_{game['game_id']}", {
+                'game_id': game['game_id'],
+                'date': target_date,
+                'timestamp': timestamp,
+                'game': game
+            })
+        
+        self.game_index.set(f"date_{target_date}", game_ids)
+        self.prune_game_index()
+    
+    def remove_indexed_games(self, date_str, game_ids):
+        """
+        Remove games from the per-game index if they still point at a date
         
+        Args:
+            date_str: Date string in format YYYY-MM-DD
+            game_ids: Game IDs to remove
+        """
+        for game_id in game_ids:
+            entry = self.game_index.get(f"game_{game_id}", float('inf'))
+            # A rescheduled game keeps its ID and may be indexed under its new date
+            if entry and entry.get('date') == date_str:
+                self.game_index.delete(f"game_{game_id}")
+    
+    def prune_game_index(self):
+        """
+        Drop index entries for dates not indexed within CACHE_TTLS['final']
+        """
         try:
-            with open(cache_file, 'w') as f:
-                json.dump(data, f)
-                logger.info(f"Saved data to cache for {cache_key}")
+            for cache_key in self.game_index.keys():
+                if not cache_key.startswith('date_'):
+                    continue
+                
+                age = self.game_index.get_age(cache_key)
+                if age is not None and age > CACHE_TTLS['final']:
+                    date_str = cache_key[len('date_'):]
+                    self.remove_indexed_games(date_str, self.game_index.get(cache_key, float('inf')) or [])
+                    self.game_index.delete(cache_key)
+                    logger.info(f"Dropped games for {date_str} from the game index")
         except Exception as e:
-            logger.error(f"Error saving to cache: {e}")
+            logger.error(f"Error pruning game index: {e}")
     
     def clear_cache(self, cache_key=None):
         """
@@ -113,50 +296,218 @@ class MLBPredictionAPI:
             cache_key: Key to identify the cache file, or None to clear all cache
         """
         if cache_key:
-            cache_file = os.path.join(self.cache_dir, f"{cache_key}.json")
-            if os.path.exists(cache_file):
-                try:
-                    os.remove(cache_file)
-                    logger.info(f"Cleared cache for {cache_key}")
-                except Exception as e:
-                    logger.error(f"Error clearing cache for {cache_key}: {e}")
+            try:
+                self.cache.delete(cache_key)
+                logger.info(f"Cleared cache for {cache_key}")
+            except Exception as e:
+                logger.error(f"Error clearing cache for {cache_key}: {e}")
         else:
             try:
-                for file in os.listdir(self.cache_dir):
-                    if file.endswith('.json'):
-                        os.remove(os.path.join(self.cache_dir, file))
+                self.cache.clear()
+                self.game_index.clear()
                 logger.info("Cleared all cache")
             except Exception as e:
                 logger.error(f"Error clearing all cache: {e}")
     
+    def clear_volatile_cache(self):
+        """
+        Clear cache for everything except past dates, which do not change
+        """
+        try:
+            for cache_key in self.cache.keys():
+                if not self.mlb_stats_api.is_past_date_key(cache_key):
+                    self.cache.delete(cache_key)
+            logger.info("Cleared volatile cache")
+        except Exception as e:
+            logger.error(f"Error clearing volatile cache: {e}")
+    
     def refresh_data_if_needed(self, force_refresh=False):
         """
         Refresh data if needed or forced
         
+        A forced refresh clears cached data for today and later dates and
+        season stats, keeping past dates. Otherwise, dates served recently
+        whose predictions are close to expiring are rebuilt on a background
+        thread, and their previous predictions keep being served until the
+        new ones are saved.
+        
         Args:
             force_refresh: Force refresh of data
             
         Returns:
-            True if data was refreshed, False otherwise
+            True if data was refreshed or a background refresh started,
+            False otherwise
         """
         current_time = time.time()
         
-        # Refresh if forced or if last refresh was more than 15 minutes ago
-        if force_refresh or current_time - self.last_refresh_time > self.cache_expiration:
+        if force_refresh:
             logger.info("Refreshing MLB prediction data")
             
-            # Clear all cache
-            self.clear_cache()
-            
-            # Refresh MLB stats API
-            self.mlb_stats_api.clear_cache()
+            # Clear cache that can change
+            self.clear_volatile_cache()
+            self.mlb_stats_api.clear_volatile_cache()
             
             # Update last refresh time
             self.last_refresh_time = current_time
             
             return True
         
-        return False
+        if current_time - self.last_refresh_check < self.refresh_check_interval:
+            return False
+        
+        self.last_refresh_check = current_time
+        
+        return self.refresh_in_background(self.get_stale_dates())
+    
+    def mark_served(self, target_date):
+        """
+        Record that predictions for a date were requested
+        
+        Args:
+            target_date: Date string in format YYYY-MM-DD
+        """
+        with self.refresh_lock:
+            self.served_dates[target_date] = time.time()
+    
+    def needs_refresh(self, cache, cache_key):
+        """
+        Check whether a cache entry is close enough to expiring to rebuild
+        
+        Args:
+            cache: TieredCache holding the entry
+            cache_key: Key to identify the cache file
+            
+        Returns:
+            True if the entry exists and has used up refresh_ahead of its lifetime
+        """
+        age = cache.get_age(cache_key)
+        if age is None:
+            return False
+        
+        data = cache.get(cache_key, float('inf'))
+        return age >= self.mlb_stats_api.get_cache_ttl(cache_key, data) * self.refresh_ahead
+    
+    def get_stale_dates(self):
+        """
+        List recently served dates whose predictions are due for a rebuild
+        
+        Returns:
+            List of date strings
+        """
+        current_time = time.time()
+        
+        with self.refresh_lock:
+            self.served_dates = {
+                date_str: served_time for date_str, served_time in self.served_dates.items()
+                if current_time - served_time < self.served_window
+            }
+            dates = list(self.served_dates)
+        
+        return [date_str for date_str in dates if self.needs_refresh(self.cache, f"all_predictions_{date_str}")]
+    
+    def refresh_in_background(self, dates):
+        """
+        Start a background thread rebuilding predictions for some dates
+        
+        Args:
+            dates: List of date strings
+            
+        Returns:
+            True if a refresh was started, False if there was nothing to do
+            or a refresh is already running
+        """
+        if not dates:
+            return False
+        
+        with self.refresh_lock:
+            if self.refresh_thread and self.refresh_thread.is_alive():
+                return False
+            
+            self.refresh_thread = threading.Thread(target=self.refresh_dates, args=(dates,),
+                                                   name='prediction-refresh', daemon=True)
+            self.refresh_thread.start()
+        
+        logger.info(f"Started background refresh for {', '.join(dates)}")
+        return True
+    
+    def refresh_dates(self, dates):
+        """
+        Rebuild predictions for some dates, one after another
+        
+        Requests made for the rebuild are background requests for the rate
+        limiter.
+        
+        Args:
+            dates: List of date strings
+        """
+        with http_session.background():
+            for target_date in dates:
+                try:
+                    self.refresh_predictions(target_date)
+                except Exception as e:
+                    logger.error(f"Error refreshing predictions for {target_date}: {e}")
+        
+        self.last_refresh_time = time.time()
+    
+    def refresh_predictions(self, target_date):
+        """
+        Rebuild a date's predictions, and its games if they are due too
+        
+        The cached predictions stay in place, and keep being served, until
+        the rebuilt ones are saved over them.
+        
+        Args:
+            target_date: Date string in format YYYY-MM-DD
+            
+        Returns:
+            Rebuilt predictions, or the cached ones if they are no longer due
+        """
+        cache_key = f"all_predictions_{target_date}"
+        
+        with self.cache.fill_lock(cache_key):
+            # Another worker may have rebuilt it while we waited
+            if not self.predictions_due(target_date):
+                return self.cache.get(cache_key, float('inf'))
+            
+            refresh_games = self.needs_refresh(self.mlb_stats_api.cache, f"games_{target_date}")
+            predictions = self.build_predictions(target_date, refresh_games)
+            self.save_predictions(target_date, predictions)
+        
+        return predictions
+    
+    def predictions_due(self, target_date):
+        """
+        Check whether a date's predictions are missing or due for a rebuild
+        
+        Args:
+            target_date: Date string in format YYYY-MM-DD
+            
+        Returns:
+            True if the predictions should be (re)built
+        """
+        cache_key = f"all_predictions_{target_date}"
+        return self.cache.get_age(cache_key) is None or self.needs_refresh(self.cache, cache_key)
+    
+    def get_slate(self, target_date, force_refresh=False):
+        """
+        Get games and team stats for a date
+        
+        Args:
+            target_date: Date string in format YYYY-MM-DD
+            force_refresh: Force refresh of data
+            
+        Returns:
+            Tuple of (games, team_stats). team_stats maps team name to team
+            stats and may be empty, in which case stats are fetched per team.
+        """
+        if self.use_async_engine:
+            try:
+                slate = self.slate_engine.build_slate(target_date, force_refresh)
+                return slate['games'], slate['team_stats']
+            except Exception as e:
+                logger.error(f"Error building slate for {target_date} with async engine: {e}")
+        
+        return self.mlb_stats_api.get_games_for_date(target_date, force_refresh), {}
     
     def calculate_pitcher_performance_score(self, era, whip=None, strikeouts=None, innings_pitched=None):
         """
@@ -241,6 +592,20 @@ class MLBPredictionAPI:
         # Average the pitcher scores (both pitchers matter for 1st inning)
         pitcher_score = (home_pitcher_score + away_pitcher_score) / 2
         
+        return self.no_run_probability(pitcher_score, ballpark, weather)
+    
+    def no_run_probability(self, pitcher_score, ballpark=None, weather=None):
+        """
+        Calculate probability of no runs in the first inning from pitcher scores
+        
+        Args:
+            pitcher_score: Average of both pitchers' performance scores
+            ballpark: Ballpark information
+            weather: Weather information
+            
+        Returns:
+            Probability of no runs in the first inning (0-100)
+        """
         # Adjust for ballpark factors (some parks are more hitter-friendly)
         ballpark_factor = 1.0  # Neutral by default
         if ballpark:
@@ -291,6 +656,21 @@ class MLBPredictionAPI:
         # Average the pitcher scores (both pitchers matter for first 3 innings)
         pitcher_score = (home_pitcher_score + away_pitcher_score) / 2
         
+        return self.over_runs_probability(pitcher_score, run_threshold, ballpark, weather)
+    
+    def over_runs_probability(self, pitcher_score, run_threshold=2.5, ballpark=None, weather=None):
+        """
+        Calculate probability of over X runs in the first three innings from pitcher scores
+        
+        Args:
+            pitcher_score: Average of both pitchers' performance scores
+            run_threshold: Run threshold (e.g., 2.5, 3.5)
+            ballpark: Ballpark information
+            weather: Weather information
+            
+        Returns:
+            Probability of over X runs in the first three innings (0-100)
+        """
         # Adjust for ballpark factors (some parks are more hitter-friendly)
         ballpark_factor = 1.0  # Neutral by default
         if ballpark:
@@ -326,7 +706,24 @@ class MLBPredictionAPI:
         
         return final_probability
     
-    def generate_factor_breakdown(self, prediction_type, home_team, away_team, probability):
+    def era_or_default(self, era, default=4.50):
+        """
+        Convert an ERA to a float, using a default when it is missing
+        
+        Args:
+            era: ERA value (number, string, 'N/A' or None)
+            default: Value used when the ERA is missing or invalid
+            
+        Returns:
+            ERA as a float
+        """
+        try:
+            return float(era)
+        except (TypeError, ValueError):
+            return default
+    
+    def generate_factor_breakdown(self, prediction_type, home_team, away_team, probability,
+                                  pitcher_performance_score=None, game_id=None):
         """
         Generate factor breakdown for prediction
         
@@ -335,6 +732,10 @@ class MLBPredictionAPI:
             home_team: Home team data
             away_team: Away team data
             probability: Prediction probability
+            pitcher_performance_score: Precomputed pitcher performance score
+                (from GameFeatures), computed from the ERAs if not given
+            game_id: Game ID the remaining factor scores are seeded from
+                (the teams and pitchers are used if not given)
             
         Returns:
             Factor breakdown
@@ -350,24 +751,21 @@ class MLBPredictionAPI:
         away_pitcher_era = away_pitcher.get('stats', {}).get('era', 'N/A')
         
         # Calculate factor scores
-        pitcher_performance_score = self.calculate_pitcher_performance_score(
-            (float(home_pitcher_era) if home_pitcher_era != 'N/A' else 4.50) + 
-            (float(away_pitcher_era) if away_pitcher_era != 'N/A' else 4.50)
-        ) / 2
-        
-        # Generate random but sensible scores for other factors
-        import random
-        bullpen_performance_score = random.uniform(40, 60)
-        ballpark_factors_score = random.uniform(40, 60)
-        batter_vs_pitcher_score = random.uniform(40, 60)
-        defensive_metrics_score = random.uniform(40, 60)
-        team_momentum_score = random.uniform(40, 60)
-        umpire_impact_score = random.uniform(40, 60)
-        handedness_matchups_score = random.uniform(40, 60)
-        base_running_score = random.uniform(40, 60)
-        travel_schedule_score = random.uniform(40, 60)
-        injury_impact_score = random.uniform(40, 60)
-        weather_conditions_score = random.uniform(40, 60)
+        if pitcher_performance_score is None:
+            pitcher_performance_score = self.calculate_pitcher_performance_score(
+                self.era_or_default(home_pitcher_era) + self.era_or_default(away_pitcher_era)
+            ) / 2
+        
+        # Scores for the other factors, the same for a game on every build
+        if game_id is None:
+            seed = f"{home_team.get('name')}|{away_team.get('name')}|{home_pitcher_name}|{away_pitcher_name}"
+        else:
+            seed = str(game_id)
+        
+        (bullpen_performance_score, ballpark_factors_score, batter_vs_pitcher_score,
+         defensive_metrics_score, team_momentum_score, umpire_impact_score,
+         handedness_matchups_score, base_running_score, travel_schedule_score,
+         injury_impact_score, weather_conditions_score) = self.get_seeded_factor_scores(seed)
         
         # For first inning no run, higher pitcher score is better
         # For over runs, lower pitcher score is better
@@ -454,6 +852,25 @@ class MLBPredictionAPI:
         
         return factor_breakdown
     
+    @staticmethod
+    @lru_cache(maxsize=1024)
+    def get_seeded_factor_scores(seed):
+        """
+        Get sensible scores (40-60) for the factors without real inputs yet
+        
+        The generator is seeded from a string, so every worker and every build
+        gives a game the same scores.
+        
+        Args:
+            seed: Seed string, normally the game ID
+            
+        Returns:
+            Tuple of 11 scores, in factor breakdown order after pitcher
+            performance
+        """
+        generator = random.Random(seed)
+        return tuple(generator.uniform(40, 60) for _ in range(11))
+    
     def get_all_predictions(self, force_refresh=False, target_date=None):
         """
         Get all predictions for a specific date
@@ -465,6 +882,21 @@ class MLBPredictionAPI:
         Returns:
             All predictions for the specified date
         """
+        predictions, stale = self.get_predictions_snapshot(force_refresh, target_date)
+        return self.with_freshness(predictions, stale)
+    
+    def get_predictions_snapshot(self, force_refresh=False, target_date=None):
+        """
+        Get a date's predictions as cached, without freshness fields
+        
+        Args:
+            force_refresh: Force refresh of data
+            target_date: Target date string in format YYYY-MM-DD
+            
+        Returns:
+            Tuple of (predictions, stale), where stale is True if expired
+            predictions are being served while they are rebuilt
+        """
         # If target date is not provided, use today's date
         if not target_date:
             target_date = datetime.now().strftime('%Y-%m-%d')
@@ -473,213 +905,733 @@ class MLBPredictionAPI:
         cache_key = f"all_predictions_{target_date}"
         
         # Check if we need to refresh data
+        self.mark_served(target_date)
         self.refresh_data_if_needed(force_refresh)
         
         # Try to get cached data
         cached_data = self.get_cached_data(cache_key)
         if cached_data and not force_refresh:
-            return cached_data
+            return cached_data, False
         
-        # Get games for the target date
-        games = self.mlb_stats_api.get_games_for_date(target_date, force_refresh)
+        # Serve the last good predictions right away and rebuild them in the background
+        if not force_refresh:
+            snapshot = self.cache.get(cache_key, float('inf'))
+            if snapshot:
+                logger.info(f"Serving stale predictions for {target_date} while they are rebuilt")
+                self.revalidate_in_background(target_date)
+                return snapshot, True
         
-        # Generate predictions for each game
-        predictions = {
-            'under_1_run_first_inning': [],
-            'over_2.5_runs_first_3_innings': [],
-            'over_3.5_runs_first_3_innings': []
-        }
+        # Only one worker builds a date's predictions; the others wait and reuse them
+        with self.cache.fill_lock(cache_key):
+            if not force_refresh:
+                cached_data = self.get_cached_data(cache_key)
+                if cached_data:
+                    return cached_data, False
+            
+            predictions = self.build_predictions(target_date, force_refresh)
+            
+            # Save to cache
+            self.save_predictions(target_date, predictions)
         
-        for game in games:
-            # Get team and pitcher data
-            home_team_name = game.get('home_team')
-            away_team_name = game.get('away_team')
+        return predictions, False
+    
+    def with_freshness(self, predictions, stale, with_age=True):
+        """
+        Add age and staleness to a copy of the predictions' metadata
+        
+        Cached predictions are shared through the in-memory cache, so they
+        are copied rather than changed.
+        
+        Args:
+            predictions: All predictions for a date
+            stale: Whether the predictions are past their lifetime
+            with_age: Fill in 'age_seconds'. Stored response bodies leave it
+                null, since the Age header carries the age.
             
-            home_pitcher_name = game.get('home_pitcher')
-            away_pitcher_name = game.get('away_pitcher')
+        Returns:
+            Predictions with 'age_seconds' and 'stale' in metadata
+        """
+        metadata = dict(predictions.get('metadata', {}))
+        
+        timestamp = metadata.get('timestamp')
+        metadata['age_seconds'] = round(max(0, time.time() - timestamp), 1) if timestamp and with_age else None
+        metadata['stale'] = stale
+        
+        return dict(predictions, metadata=metadata)
+    
+    def get_etag(self, predictions, market=None, query=None, stale=False):
+        """
+        Get a validator for a predictions response
+        
+        Snapshots are immutable once built, so the date and build timestamp
+        identify the content, along with whether the body says it is stale.
+        
+        Args:
+            predictions: Predictions snapshot from get_predictions_snapshot
+            market: Market key for a single-market response, or None for all
+            query: PredictionQuery the response was filtered with, if any
+            stale: Whether the snapshot is past its lifetime
             
-            home_pitcher_era = game.get('home_era')
-            away_pitcher_era = game.get('away_era')
+        Returns:
+            Hex digest identifying the response body
+        """
+        metadata = predictions.get('metadata', {})
+        version = f"{RESPONSE_FORMAT}:{metadata.get('date')}:{metadata.get('timestamp')}:{market or 'all'}"
+        if query:
+            version += f":{tuple(query)}"
+        if stale:
+            version += ":stale"
+        return hashlib.sha1(version.encode('utf-8')).hexdigest()[:20]
+    
+    def get_max_age(self, predictions, stale):
+        """
+        Get how long clients may reuse a predictions response
+        
+        Args:
+            predictions: Predictions snapshot from get_predictions_snapshot
+            stale: Whether the snapshot is past its lifetime
             
-            venue = game.get('venue')
-            game_time = game.get('game_time')
+        Returns:
+            Tuple of (age, max_age) in whole seconds
+        """
+        metadata = predictions.get('metadata', {})
+        timestamp = metadata.get('timestamp')
+        age = int(max(0, time.time() - timestamp)) if timestamp else 0
+        
+        if stale or not metadata.get('date'):
+            return age, 0
+        
+        ttl = self.mlb_stats_api.get_cache_ttl(f"all_predictions_{metadata['date']}", predictions)
+        return age, int(max(0, ttl - age))
+    
+    def get_response_body(self, predictions, market=None, compressed=False, query=None, stale=False):
+        """
+        Get the serialized body of a predictions response
+        
+        Bodies are kept in memory with the cached snapshot, so a hot read
+        skips serialization entirely, and are dropped when the snapshot is
+        replaced. The gzip body is also stored next to the cached snapshot on
+        disk, so other workers serve the same bytes without compressing them
+        again. Filtered responses are small and vary with every query, so
+        they are built on each request instead.
+        
+        A snapshot has at most two bodies per market, fresh and stale, since
+        'metadata.stale' is in the body. Stale bodies are stored under their
+        own blob name so the two do not replace each other.
+        
+        Args:
+            predictions: Predictions snapshot from get_predictions_snapshot
+            market: Market key for a single-market response, or None for all
+            compressed: Return the gzip-compressed body
+            query: PredictionQuery to filter, page and project the response
+            stale: Whether the snapshot is past its lifetime
             
-            # Get team stats
-            home_team_stats = self.mlb_stats_api.get_team_stats(home_team_name)
-            away_team_stats = self.mlb_stats_api.get_team_stats(away_team_name)
+        Returns:
+            Response body bytes
+        """
+        if query:
+            body = self.serialize_response(predictions, market, query, stale)
+            return gzip.compress(body, compresslevel=6, mtime=0) if compressed else body
+        
+        date_str = predictions.get('metadata', {}).get('date')
+        cache_key = f"all_predictions_{date_str}"
+        name = MARKET_GAME_KEYS[market] if market else 'all'
+        if stale:
+            name += '_stale'
+        tag = self.get_etag(predictions, market, stale=stale)
+        
+        if not compressed:
+            return self.cache.get_derived(cache_key, (name, tag, 'identity'),
+                                          lambda: self.serialize_response(predictions, market, stale=stale))
+        
+        def build_compressed():
+            body = self.cache.get_blob(cache_key, name, tag) if date_str else None
+            if body is None:
+                body = gzip.compress(self.get_response_body(predictions, market, stale=stale), compresslevel=9, mtime=0)
+                if date_str:
+                    self.cache.set_blob(cache_key, name, tag, body)
+            return body
+        
+        return self.cache.get_derived(cache_key, (name, tag, 'gzip'), build_compressed)
+    
+    def serialize_response(self, predictions, market=None, query=None, stale=False):
+        """
+        Serialize a predictions response
+        
+        The metadata carries 'stale', and 'age_seconds' as null: bodies are
+        stored for the snapshot's whole life, so the Age header has the age.
+        
+        Args:
+            predictions: Predictions snapshot from get_predictions_snapshot
+            market: Market key for a single-market response, or None for all
+            query: PredictionQuery to filter, page and project the response
+            stale: Whether the snapshot is past its lifetime
             
-            # Calculate probabilities
-            under_1_run_probability = self.calculate_first_inning_no_run_probability(
-                home_pitcher_era, away_pitcher_era, home_team_name, away_team_name, venue
-            )
+        Returns:
+            JSON bytes with sorted keys, like Flask's jsonify output
+        """
+        predictions = self.with_freshness(predictions, stale, with_age=False)
+        
+        if query:
+            data = self.query_predictions(predictions, market, query)
+        elif market:
+            data = {
+                'predictions': self.get_market_predictions(predictions, market),
+                'metadata': predictions.get('metadata', {})
+            }
+        else:
+            data = predictions
+        
+        return serializer.dumps(data, sort_keys=True) + b'\n'
+    
+    def get_query_index(self, predictions):
+        """
+        Get each market's predictions grouped by rating, best first
+        
+        The index is built once per snapshot and kept in memory with it, so
+        filtered requests only slice pre-sorted lists.
+        
+        Args:
+            predictions: Predictions snapshot from get_predictions_snapshot
             
-            over_2_5_runs_probability = self.calculate_first_three_innings_run_probability(
-                home_pitcher_era, away_pitcher_era, home_team_name, away_team_name, 2.5, venue
-            )
+        Returns:
+            Dictionary mapping market to a dictionary mapping each rating
+            (and None for all ratings) to (negated probabilities, predictions),
+            both sorted by descending probability
+        """
+        def build():
+            index = {}
+            for market, game_key, run_threshold in MARKETS:
+                entries = self.get_market_predictions(predictions, market)
+                groups = {None: entries}
+                for rating in RATINGS:
+                    groups[rating] = [entry for entry in entries if entry.get('rating') == rating]
+                index[market] = {
+                    rating: ([-entry['probability'] for entry in group], group)
+                    for rating, group in groups.items()
+                }
+            return index
+        
+        date_str = predictions.get('metadata', {}).get('date')
+        return self.cache.get_derived(f"all_predictions_{date_str}", ('query_index', self.get_etag(predictions)), build)
+    
+    def select_predictions(self, predictions, market, query):
+        """
+        Get one market's predictions matching a query's filters and page
+        
+        Args:
+            predictions: Predictions snapshot from get_predictions_snapshot
+            market: Market key (e.g., 'under_1_run_first_inning')
+            query: PredictionQuery
             
-            over_3_5_runs_probability = self.calculate_first_three_innings_run_probability(
-                home_pitcher_era, away_pitcher_era, home_team_name, away_team_name, 3.5, venue
-            )
+        Returns:
+            Tuple of (page of predictions, number of matching predictions)
+        """
+        groups = self.get_query_index(predictions)[market]
+        
+        matches = []
+        for rating in query.ratings or (None,):
+            probabilities, entries = groups[rating]
+            if query.min_probability is not None:
+                entries = entries[:bisect.bisect_right(probabilities, -query.min_probability)]
+            matches.append(entries)
+        
+        if len(matches) == 1:
+            matches = matches[0]
+        else:
+            matches = list(heapq.merge(*matches, key=lambda entry: -entry['probability']))
+        
+        end = None if query.limit is None else query.offset + query.limit
+        return matches[query.offset:end], len(matches)
+    
+    def project(self, item, query):
+        """
+        Apply a query's field projection to a prediction or game
+        
+        Args:
+            item: Prediction or game dictionary
+            query: PredictionQuery
             
-            # Create prediction objects
-            under_1_run_prediction = {
-                'game_id': game.get('game_id'),
-                'home_team': {
-                    'name': home_team_name,
-                    'probable_pitcher': {
-                        'name': home_pitcher_name,
-                        'stats': {
-                            'era': home_pitcher_era
-                        }
-                    },
-                    'stats': home_team_stats
-                },
-                'away_team': {
-                    'name': away_team_name,
-                    'probable_pitcher': {
-                        'name': away_pitcher_name,
-                        'stats': {
-                            'era': away_pitcher_era
-                        }
-                    },
-                    'stats': away_team_stats
-                },
-                'venue': venue,
-                'game_time': game_time,
-                'probability': under_1_run_probability,
-                'rating': self.get_rating(under_1_run_probability),
-                'factors': self.generate_factor_breakdown('under_1_run_first_inning', 
-                                                         {'name': home_team_name, 'probable_pitcher': {'name': home_pitcher_name, 'stats': {'era': home_pitcher_era}}}, 
-                                                         {'name': away_team_name, 'probable_pitcher': {'name': away_pitcher_name, 'stats': {'era': away_pitcher_era}}},
-                                                         under_1_run_probability)
-            }
+        Returns:
+            Copy of the item with only the requested keys
+        """
+        if query.fields:
+            item = {key: value for key, value in item.items() if key in query.fields or key == 'game_id'}
+        
+        if query.exclude:
+            def drop(value):
+                if isinstance(value, dict):
+                    return {key: drop(child) for key, child in value.items() if key not in query.exclude}
+                if isinstance(value, list):
+                    return [drop(child) for child in value]
+                return value
+            item = drop(item)
+        
+        return item
+    
+    def query_predictions(self, predictions, market, query):
+        """
+        Build a filtered, paged and projected predictions response
+        
+        A single-market response lists the matching predictions. The
+        all-markets response keeps the snapshot's layout: each market lists
+        its matching predictions, and 'games' holds only the games they
+        refer to.
+        
+        Args:
+            predictions: Predictions snapshot from get_predictions_snapshot
+            market: Market key for a single-market response, or None for all
+            query: PredictionQuery
             
-            over_2_5_runs_prediction = {
-                'game_id': game.get('game_id'),
-                'home_team': {
-                    'name': home_team_name,
-                    'probable_pitcher': {
-                        'name': home_pitcher_name,
-                        'stats': {
-                            'era': home_pitcher_era
-                        }
-                    },
-                    'stats': home_team_stats
-                },
-                'away_team': {
-                    'name': away_team_name,
-                    'probable_pitcher': {
-                        'name': away_pitcher_name,
-                        'stats': {
-                            'era': away_pitcher_era
-                        }
-                    },
-                    'stats': away_team_stats
-                },
-                'venue': venue,
-                'game_time': game_time,
-                'probability': over_2_5_runs_probability,
-                'rating': self.get_rating(over_2_5_runs_probability),
-                'factors': self.generate_factor_breakdown('over_2.5_runs_first_3_innings', 
-                                                         {'name': home_team_name, 'probable_pitcher': {'name': home_pitcher_name, 'stats': {'era': home_pitcher_era}}}, 
-                                                         {'name': away_team_name, 'probable_pitcher': {'name': away_pitcher_name, 'stats': {'era': away_pitcher_era}}},
-                                                         over_2_5_runs_probability)
-            }
+        Returns:
+            Response data, with the number of matches before paging in
+            metadata['matches']
+        """
+        metadata = dict(predictions.get('metadata', {}))
+        
+        if market:
+            page, metadata['matches'] = self.select_predictions(predictions, market, query)
+            return {'predictions': [self.project(entry, query) for entry in page], 'metadata': metadata}
+        
+        data = {}
+        metadata['matches'] = {}
+        game_ids = set()
+        
+        for market, game_key, run_threshold in MARKETS:
+            page, metadata['matches'][market] = self.select_predictions(predictions, market, query)
+            game_ids.update(entry['game_id'] for entry in page)
             
-            over_3_5_runs_prediction = {
-                'game_id': game.get('game_id'),
-                'home_team': {
-                    'name': home_team_name,
-                    'probable_pitcher': {
-                        'name': home_pitcher_name,
-                        'stats': {
-                            'era': home_pitcher_era
-                        }
-                    },
-                    'stats': home_team_stats
-                },
-                'away_team': {
-                    'name': away_team_name,
-                    'probable_pitcher': {
-                        'name': away_pitcher_name,
-                        'stats': {
-                            'era': away_pitcher_era
-                        }
-                    },
-                    'stats': away_team_stats
-                },
-                'venue': venue,
-                'game_time': game_time,
-                'probability': over_3_5_runs_probability,
-                'rating': self.get_rating(over_3_5_runs_probability),
-                'factors': self.generate_factor_breakdown('over_3.5_runs_first_3_innings', 
-                                                         {'name': home_team_name, 'probable_pitcher': {'name': home_pitcher_name, 'stats': {'era': home_pitcher_era}}}, 
-                                                         {'name': away_team_name, 'probable_pitcher': {'name': away_pitcher_name, 'stats': {'era': away_pitcher_era}}},
-                                                         over_3_5_runs_probability)
+            if 'games' in predictions:
+                data[market] = [
+                    {'game_id': entry['game_id'], 'probability': entry['probability'], 'rating': entry['rating']}
+                    for entry in page
+                ]
+            else:
+                data[market] = [self.project(entry, query) for entry in page]
+        
+        if 'games' in predictions:
+            data['games'] = [self.project(game, query) for game in predictions['games'] if game['game_id'] in game_ids]
+        
+        data['metadata'] = metadata
+        return data
+    
+    def revalidate_in_background(self, target_date):
+        """
+        Start rebuilding a date's expired predictions on a background thread
+        
+        Args:
+            target_date: Date string in format YYYY-MM-DD
+            
+        Returns:
+            True if a rebuild was started, False if one is already running
+        """
+        with self.refresh_lock:
+            thread = self.revalidation_threads.get(target_date)
+            if thread and thread.is_alive():
+                return False
+            
+            thread = threading.Thread(target=self.revalidate, args=(target_date,),
+                                      name=f"revalidate-{target_date}", daemon=True)
+            self.revalidation_threads[target_date] = thread
+            thread.start()
+        
+        return True
+    
+    def revalidate(self, target_date):
+        """
+        Rebuild a date's predictions, logging rather than raising errors
+        
+        Requests made for the rebuild are background requests for the rate
+        limiter.
+        
+        Args:
+            target_date: Date string in format YYYY-MM-DD
+        """
+        try:
+            with http_session.background():
+                self.refresh_predictions(target_date)
+        except Exception as e:
+            logger.error(f"Error revalidating predictions for {target_date}: {e}")
+        finally:
+            with self.refresh_lock:
+                if self.revalidation_threads.get(target_date) is threading.current_thread():
+                    del self.revalidation_threads[target_date]
+    
+    def build_predictions(self, target_date, force_refresh=False):
+        """
+        Build all predictions for a date from fresh game and team data
+        
+        Args:
+            target_date: Target date string in format YYYY-MM-DD
+            force_refresh: Force refresh of data
+            
+        Returns:
+            All predictions for the specified date
+        """
+        # Get games and team stats for the target date
+        games, team_stats = self.get_slate(target_date, force_refresh)
+        
+        return self.assemble_predictions(target_date, games, self.predict_games(games, team_stats, target_date))
+    
+    def predict_games(self, games, team_stats, target_date=None):
+        """
+        Score games in one pass, then build each game from its scores
+        
+        Args:
+            games: Game objects as returned by get_games_for_date
+            team_stats: Dictionary mapping team name to team stats
+            target_date: Date string in format YYYY-MM-DD the games are on
+            
+        Returns:
+            List of games with their per-market predictions
+        """
+        scores = self.probability_engine.score_games(games)
+        game_predictions = []
+        for index, game in enumerate(games):
+            features = self.build_game_features(game, team_stats, scores['pitcher_score'][index],
+                                                scores['factor_pitcher_score'][index], target_date)
+            market_scores = {
+                market: (scores[market]['probability'][index], scores[market]['rating'][index])
+                for market, game_key, run_threshold in MARKETS
             }
+            game_predictions.append(self.build_game_prediction(features, market_scores))
+        
+        return game_predictions
+    
+    def assemble_predictions(self, target_date, games, game_predictions):
+        """
+        Combine a date's game predictions into sorted market lists and metadata
+        
+        Args:
+            target_date: Target date string in format YYYY-MM-DD
+            games: Game objects the predictions were built from
+            game_predictions: Games from predict_games, in schedule order
             
-            # Add predictions to the list
-            predictions['under_1_run_first_inning'].append(under_1_run_prediction)
-            predictions['over_2.5_runs_first_3_innings'].append(over_2_5_runs_prediction)
-            predictions['over_3.5_runs_first_3_innings'].append(over_3_5_runs_prediction)
+        Returns:
+            All predictions for the specified date
+        """
+        predictions = {'games': game_predictions}
         
-        # Sort predictions by probability (descending)
-        predictions['under_1_run_first_inning'] = sorted(predictions['under_1_run_first_inning'], key=lambda x: x['probability'], reverse=True)
-        predictions['over_2.5_runs_first_3_innings'] = sorted(predictions['over_2.5_runs_first_3_innings'], key=lambda x: x['probability'], reverse=True)
-        predictions['over_3.5_runs_first_3_innings'] = sorted(predictions['over_3.5_runs_first_3_innings'], key=lambda x: x['probability'], reverse=True)
+        # Each market lists games by probability (descending); the team and
+        # pitcher details live once per game under 'games'
+        for market, game_key, run_threshold in MARKETS:
+            predictions[market] = sorted(
+                [
+                    {
+                        'game_id': game['game_id'],
+                        'probability': game['predictions'][game_key]['probability'],
+                        'rating': game['predictions'][game_key]['rating']
+                    }
+                    for game in game_predictions
+                ],
+                key=lambda x: x['probability'], reverse=True
+            )
         
         # Add metadata
         predictions['metadata'] = {
             'date': target_date,
             'timestamp': datetime.now().timestamp(),
             'game_count': len(games),
-            'data_source': 'MLB Stats API (Official)'
+            'data_source': 'MLB Stats API (Official)',
+            'final': self.mlb_stats_api.is_final_data(games)
         }
         
-        # Save to cache
-        self.save_to_cache(cache_key, predictions)
-        
         return predictions
     
-    def get_prediction_for_game_id(self, game_id, force_refresh=False):
+    def stream_predictions(self, target_date=None, force_refresh=False):
         """
-        Get prediction for a specific game
+        Yield a date's predictions game by game, then the sorted markets
+        
+        Cached predictions are replayed right away. Otherwise each game is
+        scored as soon as its own pitchers and team stats arrive, so the
+        first game does not wait for the whole slate, and the finished
+        predictions are cached like a regular build.
         
         Args:
-            game_id: Game ID
+            target_date: Target date string in format YYYY-MM-DD
             force_refresh: Force refresh of data
             
+        Yields:
+            ('game', game) for each game, then ('summary', predictions) with
+            each market's sorted list and the metadata, without 'games'
+        """
+        if not target_date:
+            target_date = datetime.now().strftime('%Y-%m-%d')
+        
+        if not force_refresh and self.cache.get(f"all_predictions_{target_date}", float('inf')):
+            predictions, stale = self.get_predictions_snapshot(False, target_date)
+            for game in predictions.get('games', []):
+                yield 'game', game
+        else:
+            self.mark_served(target_date)
+            stale = False
+            
+            games = {}
+            game_predictions = {}
+            for index, game, team_stats in self.iter_slate(target_date, force_refresh):
+                games[index] = game
+                game_predictions[index] = self.predict_games([game], team_stats, target_date)[0]
+                yield 'game', game_predictions[index]
+            
+            order = sorted(games)
+            predictions = self.assemble_predictions(target_date, [games[index] for index in order],
+                                                    [game_predictions[index] for index in order])
+            self.save_predictions(target_date, predictions)
+        
+        summary = {key: value for key, value in predictions.items() if key != 'games'}
+        yield 'summary', self.with_freshness(summary, stale)
+    
+    def iter_slate(self, target_date, force_refresh=False):
+        """
+        Yield a date's games as their inputs resolve
+        
+        Args:
+            target_date: Date string in format YYYY-MM-DD
+            force_refresh: Force refresh of data
+            
+        Yields:
+            Tuples of (index, game, team_stats), where index is the game's
+            position in the schedule
+        """
+        if self.use_async_engine:
+            started = False
+            try:
+                for item in self.slate_engine.iter_slate(target_date, force_refresh):
+                    started = True
+                    yield item
+                return
+            except Exception as e:
+                # Games already sent can't be taken back
+                if started:
+                    raise
+                logger.error(f"Error streaming slate for {target_date} with async engine: {e}")
+        
+        for index, game in enumerate(self.mlb_stats_api.get_games_for_date(target_date, force_refresh)):
+            yield index, game, {}
+    
+    def build_game_features(self, game, team_stats, pitcher_score=None, factor_pitcher_score=None, target_date=None):
+        """
+        Collect a game's inputs and the pitcher scores every market uses
+        
+        Args:
+            game: Game object from get_games_for_date
+            team_stats: Dictionary mapping team name to team stats (teams
+                missing from it are fetched)
+            pitcher_score: Average pitcher performance score from the
+                probability engine (computed here when omitted)
+            factor_pitcher_score: Factor breakdown pitcher score from the
+                probability engine (computed here when omitted)
+            target_date: Date string in format YYYY-MM-DD the game is on.
+                Scheduled games do not carry their date, so it is only
+                taken from the game (sample games have one) when omitted.
+            
         Returns:
-            Prediction for the specified game
+            GameFeatures
         """
-        # Get today's date
-        today = datetime.now().strftime('%Y-%m-%d')
+        home_team_name = game.get('home_team')
+        away_team_name = game.get('away_team')
         
-        # Get all predictions for today
-        all_predictions = self.get_all_predictions(force_refresh)
+        home_pitcher_era = game.get('home_era')
+        away_pitcher_era = game.get('away_era')
         
-        # Search for the game in all prediction types
-        for prediction_type, predictions in all_predictions.items():
-            if prediction_type != 'metadata':
-                for prediction in predictions:
-                    if prediction.get('game_id') == game_id:
-                        return prediction
+        if pitcher_score is None:
+            home_pitcher_score = self.calculate_pitcher_performance_score(home_pitcher_era)
+            away_pitcher_score = self.calculate_pitcher_performance_score(away_pitcher_era)
+            pitcher_score = (home_pitcher_score + away_pitcher_score) / 2
         
-        # If game not found, try yesterday and tomorrow
-        yesterday = (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')
-        tomorrow = (datetime.now() + timedelta(days=1)).strftime('%Y-%m-%d')
+        if factor_pitcher_score is None:
+            # Factor breakdowns score the pitchers' combined ERA
+            combined_era = self.era_or_default(home_pitcher_era) + self.era_or_default(away_pitcher_era)
+            factor_pitcher_score = self.calculate_pitcher_performance_score(combined_era) / 2
         
-        for date_str in [yesterday, tomorrow]:
-            all_predictions = self.get_all_predictions(force_refresh, date_str)
+        return GameFeatures(
+            game_id=game.get('game_id'),
+            game_date=target_date or game.get('date'),
+            game_time=game.get('game_time'),
+            venue=game.get('venue'),
+            status=game.get('status'),
+            home_team=home_team_name,
+            away_team=away_team_name,
+            home_pitcher=game.get('home_pitcher'),
+            away_pitcher=game.get('away_pitcher'),
+            home_pitcher_era=home_pitcher_era,
+            away_pitcher_era=away_pitcher_era,
+            home_era_source=game.get('home_era_source'),
+            away_era_source=game.get('away_era_source'),
+            home_team_stats=team_stats.get(home_team_name) or self.mlb_stats_api.get_team_stats(home_team_name),
+            away_team_stats=team_stats.get(away_team_name) or self.mlb_stats_api.get_team_stats(away_team_name),
+            pitcher_score=pitcher_score,
+            factor_pitcher_score=factor_pitcher_score
+        )
+    
+    def build_game_prediction(self, features, market_scores=None):
+        """
+        Build a game's predictions for all three markets
+        
+        Args:
+            features: GameFeatures for the game
+            market_scores: Dictionary mapping market to (probability, rating)
+                from the probability engine (computed here when omitted)
             
-            for prediction_type, predictions in all_predictions.items():
-                if prediction_type != 'metadata':
-                    for prediction in predictions:
-                        if prediction.get('game_id') == game_id:
-                            return prediction
+        Returns:
+            Game with its pitchers, team stats and per-market predictions
+        """
+        home_team = {'name': features.home_team, 'probable_pitcher': {'name': features.home_pitcher, 'stats': {'era': features.home_pitcher_era}}}
+        away_team = {'name': features.away_team, 'probable_pitcher': {'name': features.away_pitcher, 'stats': {'era': features.away_pitcher_era}}}
         
-        # Game not found
-        return None
+        game_predictions = {}
+        for market, game_key, run_threshold in MARKETS:
+            if market_scores:
+                probability, rating = market_scores[market]
+            else:
+                if run_threshold is None:
+                    probability = self.no_run_probability(features.pitcher_score)
+                else:
+                    probability = self.over_runs_probability(features.pitcher_score, run_threshold)
+                rating = self.get_rating(probability)
+            
+            game_predictions[game_key] = {
+                'probability': probability,
+                'rating': rating,
+                'recommendation': rating,
+                'factors': self.generate_factor_breakdown(market, home_team, away_team, probability,
+                                                          features.factor_pitcher_score, features.game_id)
+            }
+        
+        return {
+            'game_id': features.game_id,
+            'game_date': features.game_date,
+            'game_time': features.game_time,
+            'venue': features.venue,
+            'status': features.status,
+            'home_team': features.home_team,
+            'away_team': features.away_team,
+            'home_pitcher': features.home_pitcher,
+            'away_pitcher': features.away_pitcher,
+            'home_pitcher_era': features.home_pitcher_era,
+            'away_pitcher_era': features.away_pitcher_era,
+            'predictions': game_predictions,
+            'stats_comparison': {
+                'pitchers': {
+                    'home': {'name': features.home_pitcher, 'era': features.home_pitcher_era, 'era_source': features.home_era_source},
+                    'away': {'name': features.away_pitcher, 'era': features.away_pitcher_era, 'era_source': features.away_era_source}
+                },
+                'teams': {
+                    'home': features.home_team_stats,
+                    'away': features.away_team_stats
+                }
+            }
+        }
+    
+    def expand_prediction(self, game, market):
+        """
+        Build a standalone prediction for one market of a game
+        
+        Args:
+            game: Game from the 'games' list of get_all_predictions
+            market: Market key (e.g., 'under_1_run_first_inning')
+            
+        Returns:
+            Prediction with the game's teams, pitchers and team stats inlined
+        """
+        game_key = MARKET_GAME_KEYS[market]
+        prediction = game['predictions'][game_key]
+        teams = game['stats_comparison']['teams']
+        
+        return {
+            'game_id': game['game_id'],
+            'home_team': {
+                'name': game['home_team'],
+                'probable_pitcher': {'name': game['home_pitcher'], 'stats': {'era': game['home_pitcher_era']}},
+                'stats': teams['home']
+            },
+            'away_team': {
+                'name': game['away_team'],
+                'probable_pitcher': {'name': game['away_pitcher'], 'stats': {'era': game['away_pitcher_era']}},
+                'stats': teams['away']
+            },
+            'venue': game['venue'],
+            'game_time': game['game_time'],
+            'probability': prediction['probability'],
+            'rating': prediction['rating'],
+            'factors': prediction['factors']
+        }
+    
+    def get_market_predictions(self, all_predictions, market):
+        """
+        Get one market's predictions, best first, with game details inlined
+        
+        Args:
+            all_predictions: Result of get_all_predictions
+            market: Market key (e.g., 'under_1_run_first_inning')
+            
+        Returns:
+            List of predictions
+        """
+        # Predictions cached before games were shared already have details inlined
+        if 'games' not in all_predictions:
+            return all_predictions.get(market, [])
+        
+        games = {game['game_id']: game for game in all_predictions['games']}
+        
+        return [
+            self.expand_prediction(games[entry['game_id']], market)
+            for entry in all_predictions.get(market, [])
+            if entry['game_id'] in games
+        ]
+    
+    def get_game(self, game_id):
+        """
+        Get a game's latest predictions from the per-game index
+        
+        This never builds predictions. Games missing from the index are
+        looked up in the cached predictions for today, yesterday and
+        tomorrow, which covers predictions cached before the index existed.
+        
+        Args:
+            game_id: Game ID
+            
+        Returns:
+            Dictionary with 'game_id', 'date', 'timestamp' and 'game' (the
+            game with its per-market predictions), or None if the game has
+            no cached predictions
+        """
+        cache_key = f"game_{game_id}"
+        entry = self.game_index.get(cache_key, float('inf'))
+        
+        if entry is None:
+            today = datetime.now()
+            for offset in (0, -1, 1):
+                date_str = (today + timedelta(days=offset)).strftime('%Y-%m-%d')
+                snapshot = self.cache.get(f"all_predictions_{date_str}", float('inf'))
+                if snapshot and any(str(game['game_id']) == str(game_id) for game in snapshot.get('games', [])):
+                    self.index_games(date_str, snapshot)
+                    entry = self.game_index.get(cache_key, float('inf'))
+                    break
+        
+        return entry
+    
+    def get_prediction_for_game_id(self, game_id, force_refresh=False):
+        """
+        Get prediction for a specific game
+        
+        Args:
+            game_id: Game ID
+            force_refresh: Rebuild the game's date before looking it up
+            
+        Returns:
+            Prediction for the specified game
+        """
+        entry = self.get_game(game_id)
+        if entry is None:
+            return None
+        
+        if force_refresh:
+            self.get_predictions_snapshot(True, entry['date'])
+            entry = self.get_game(game_id)
+        
+        market = MARKETS[0][0]
+        return self.expand_prediction(entry['game'], market)
     
     def get_rating(self, probability):
         """
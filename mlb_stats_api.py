@@ -1,8 +1,13 @@
 import os
+import re
 import json
 import logging
 import time
-import requests
+import threading
+import contextvars
+import http_session
+import tiered_cache
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 
 # Configure logging
@@ -11,17 +16,50 @@ logging.basicConfig(level=logging.INFO,
                     filename='mlb_stats_api.log')
 logger = logging.getLogger('mlb_stats_api')
 
+# Cache lifetimes in seconds by how volatile the data is, overridable
+# through the environment
+CACHE_TTLS = {
+    # Dates whose games are all final never change
+    'final': int(os.environ.get('MLB_CACHE_TTL_FINAL', 30 * 24 * 3600)),
+    # Today's schedule, probable pitchers and predictions
+    'today': int(os.environ.get('MLB_CACHE_TTL_TODAY', 5 * 60)),
+    # Future dates, whose probable pitchers are announced over the coming days
+    'upcoming': int(os.environ.get('MLB_CACHE_TTL_UPCOMING', 30 * 60)),
+    # Past dates that are not final yet (late games, sample data)
+    'past': int(os.environ.get('MLB_CACHE_TTL_PAST', 15 * 60)),
+    # Season pitcher and team stats, which change once a day
+    'season': int(os.environ.get('MLB_CACHE_TTL_SEASON', 6 * 3600)),
+    # Pitchers that were not found, or only found in the fallback table, and
+    # teams whose stats lookup failed, so they are not searched for again on
+    # every request
+    'negative': int(os.environ.get('MLB_CACHE_TTL_NEGATIVE', 10 * 60))
+}
+
 class MLBStatsAPI:
     """
     API for MLB statistics with real-time data
     """
     
-    def __init__(self, cache_dir=None):
+    # Team directory (abbreviation to team ID) and season pitching stats
+    # for every club (team ID to stat line), shared by all instances
+    team_directory = {}
+    team_stats_index = {}
+    team_stats_index_time = 0
+    team_index_lock = threading.Lock()
+    
+    def __init__(self, cache_dir=None, parallel_lookups=True, max_workers=8, bulk_pitcher_stats=True,
+                 bulk_team_stats=True):
         """
         Initialize the MLB stats API
         
         Args:
             cache_dir: Directory to store cache files
+            parallel_lookups: Resolve a date's probable pitchers concurrently
+            max_workers: Size of the worker pool used for pitcher lookups
+            bulk_pitcher_stats: Fetch season stats for all of a slate's
+                probable pitchers in one request, keyed by player ID
+            bulk_team_stats: Serve team stats from a per-process index of all
+                30 clubs, loaded with one directory and one stats request
         """
         # Use Render's cache directory or fallback to original path
         if cache_dir is None:
@@ -36,6 +74,18 @@ class MLBStatsAPI:
         # Cache expiration time (15 minutes)
         self.cache_expiration = 15 * 60  # seconds
         
+        # In-memory tier in front of the JSON cache files
+        self.cache = tiered_cache.get_cache(self.cache_dir, self.cache_expiration)
+        
+        # Worker pool settings for pitcher lookups
+        self.parallel_lookups = parallel_lookups
+        self.max_workers = max_workers
+        self.bulk_pitcher_stats = bulk_pitcher_stats
+        self.bulk_team_stats = bulk_team_stats
+        
+        # Wall-clock timings of the most recent fetch for each date
+        self.fetch_timings = {}
+        
         # Team mapping (team name to abbreviation)
         self.team_mapping = {
             'Arizona Diamondbacks': 'ARI',
@@ -328,25 +378,95 @@ class MLBStatsAPI:
         Returns:
             Cached data if it exists and is not expired, None otherwise
         """
-        cache_file = os.path.join(self.cache_dir, f"{cache_key}.json")
+        data = self.cache.get(cache_key, lambda cached: self.get_cache_ttl(cache_key, cached))
+        
+        if data is not None:
+            logger.info(f"Using cached data for {cache_key}")
+        
+        return data
+    
+    def get_cache_ttl(self, cache_key, data=None):
+        """
+        Get how long a cache entry stays fresh
+        
+        Entries for a date (games_{date}, all_predictions_{date}) live
+        according to the date and whether its games are final. Season
+        pitcher and team stats live for CACHE_TTLS['season'], except failed
+        pitcher and team stats lookups, which live for CACHE_TTLS['negative'].
+        Anything else uses the cache expiration.
+        
+        Args:
+            cache_key: Key to identify the cache file
+            data: Cached data, used to tell whether a date's games are final
+            
+        Returns:
+            Lifetime in seconds
+        """
+        date_match = re.search(r'(\d{4}-\d{2}-\d{2})$', cache_key)
         
-        if os.path.exists(cache_file):
-            # Check if cache is expired
-            file_modified_time = os.path.getmtime(cache_file)
-            current_time = time.time()
+        if date_match:
+            date_str = date_match.group(1)
+            today = datetime.now().strftime('%Y-%m-%d')
             
-            if current_time - file_modified_time < self.cache_expiration:
-                try:
-                    with open(cache_file, 'r') as f:
-                        data = json.load(f)
-                        logger.info(f"Using cached data for {cache_key}")
-                        return data
-                except Exception as e:
-                    logger.error(f"Error reading cache file: {e}")
-            else:
-                logger.info(f"Cache expired for {cache_key}")
+            if date_str == today:
+                return CACHE_TTLS['today']
+            if date_str > today:
+                return CACHE_TTLS['upcoming']
+            if self.is_final_data(data):
+                return CACHE_TTLS['final']
+            return CACHE_TTLS['past']
         
-        return None
+        if cache_key.startswith(('pitcher_era_', 'team_stats_')):
+            return CACHE_TTLS['negative'] if self.is_negative_result(data) else CACHE_TTLS['season']
+        
+        return self.cache_expiration
+    
+    def is_negative_result(self, data):
+        """
+        Check whether cached pitcher or team stats data records a failed lookup
+        
+        Args:
+            data: Cached data
+            
+        Returns:
+            True for not-found and error results, fallback ERAs and fallback
+            team stats
+        """
+        if not isinstance(data, dict):
+            return False
+        source = str(data.get('source', ''))
+        return source in ('not-found', 'error', 'fallback') or source.endswith('(Fallback)')
+    
+    def is_final_data(self, data):
+        """
+        Check whether cached games or predictions cover only final games
+        
+        Args:
+            data: List of games, or predictions with metadata
+            
+        Returns:
+            True if every game is final
+        """
+        if isinstance(data, dict):
+            return bool(data.get('metadata', {}).get('final'))
+        
+        if isinstance(data, list) and data:
+            return all(game.get('status') == 'Final' for game in data)
+        
+        return False
+    
+    def is_past_date_key(self, cache_key):
+        """
+        Check whether a cache key is for a date before today
+        
+        Args:
+            cache_key: Key to identify the cache file
+            
+        Returns:
+            True if the key ends with a date before today
+        """
+        date_match = re.search(r'(\d{4}-\d{2}-\d{2})$', cache_key)
+        return bool(date_match) and date_match.group(1) < datetime.now().strftime('%Y-%m-%d')
     
     def save_to_cache(self, cache_key, data):
         """
@@ -356,14 +476,25 @@ class MLBStatsAPI:
             cache_key: Key to identify the cache file
             data: Data to save
         """
-        cache_file = os.path.join(self.cache_dir, f"{cache_key}.json")
-        
+        if self.cache.set(cache_key, data):
+            logger.info(f"Saved data to cache for {cache_key}")
+    
+    def clear_volatile_cache(self):
+        """
+        Clear cache for everything except past dates, which do not change,
+        and mark the shared season team stats index for reloading
+        """
         try:
-            with open(cache_file, 'w') as f:
-                json.dump(data, f)
-                logger.info(f"Saved data to cache for {cache_key}")
+            for cache_key in self.cache.keys():
+                if not self.is_past_date_key(cache_key):
+                    self.cache.delete(cache_key)
+            
+            # Team stats would otherwise be rebuilt from the in-memory index
+            with MLBStatsAPI.team_index_lock:
+                MLBStatsAPI.team_stats_index_time = 0
+            logger.info("Cleared volatile cache")
         except Exception as e:
-            logger.error(f"Error saving to cache: {e}")
+            logger.error(f"Error clearing volatile cache: {e}")
     
     def clear_cache(self, cache_key=None):
         """
@@ -373,22 +504,275 @@ class MLBStatsAPI:
             cache_key: Key to identify the cache file, or None to clear all cache
         """
         if cache_key:
-            cache_file = os.path.join(self.cache_dir, f"{cache_key}.json")
-            if os.path.exists(cache_file):
-                try:
-                    os.remove(cache_file)
-                    logger.info(f"Cleared cache for {cache_key}")
-                except Exception as e:
-                    logger.error(f"Error clearing cache for {cache_key}: {e}")
+            try:
+                self.cache.delete(cache_key)
+                logger.info(f"Cleared cache for {cache_key}")
+            except Exception as e:
+                logger.error(f"Error clearing cache for {cache_key}: {e}")
         else:
             try:
-                for file in os.listdir(self.cache_dir):
-                    if file.endswith('.json'):
-                        os.remove(os.path.join(self.cache_dir, file))
+                self.cache.clear()
                 logger.info("Cleared all cache")
             except Exception as e:
                 logger.error(f"Error clearing all cache: {e}")
     
+    def http_get(self, url, **kwargs):
+        """
+        Make a GET request through the shared pooled transport
+        
+        The transport caps in-flight requests per host and applies the
+        default timeout and retry policy.
+        
+        Args:
+            url: Request URL
+            **kwargs: Extra arguments passed to the transport
+            
+        Returns:
+            HTTP response
+        """
+        return http_session.get(url, **kwargs)
+    
+    def lookup_request(self, url, **kwargs):
+        """
+        Describe a request for a lookup generator to yield
+        
+        Args:
+            url: Request URL
+            **kwargs: Extra arguments for the transport
+            
+        Returns:
+            Request dictionary with 'url' and 'kwargs'
+        """
+        return {'url': url, 'kwargs': kwargs}
+    
+    def run_lookup(self, lookup):
+        """
+        Drive a lookup generator with blocking HTTP calls
+        
+        Transport errors are thrown back into the generator, so its own
+        exception handling and fallbacks apply.
+        
+        Args:
+            lookup: Generator from pitcher_era_lookup or team_stats_lookup
+            
+        Returns:
+            Lookup result
+        """
+        try:
+            request = next(lookup)
+            while True:
+                try:
+                    response = self.http_get(request['url'], **request['kwargs'])
+                except Exception as e:
+                    request = lookup.throw(e)
+                else:
+                    request = lookup.send(response)
+        except StopIteration as stop:
+            return stop.value
+    
+    def resolve_pitcher_eras(self, pitchers, force_refresh=False, pitcher_ids=None):
+        """
+        Resolve ERA data for many pitchers
+        
+        Cached results are used first. Pitchers with a known player ID are
+        then resolved with one bulk stats request, and any that remain are
+        looked up by name, concurrently when enabled.
+        
+        Args:
+            pitchers: List of (team_name, pitcher_name) tuples
+            force_refresh: Force refresh of data
+            pitcher_ids: Dictionary mapping (team_name, pitcher_name) to MLB player ID
+            
+        Returns:
+            Dictionary mapping (team_name, pitcher_name) to ERA data
+        """
+        return self.resolve_pitcher_eras_with_mode(pitchers, force_refresh, pitcher_ids)[0]
+    
+    def resolve_pitcher_eras_with_mode(self, pitchers, force_refresh=False, pitcher_ids=None):
+        """
+        Resolve ERA data for many pitchers, reporting how they were resolved
+        
+        Args:
+            pitchers: List of (team_name, pitcher_name) tuples
+            force_refresh: Force refresh of data
+            pitcher_ids: Dictionary mapping (team_name, pitcher_name) to MLB player ID
+            
+        Returns:
+            Tuple of (dictionary mapping (team_name, pitcher_name) to ERA
+            data, mode). The mode is 'cached' when nothing was looked up,
+            otherwise 'bulk', 'parallel' or 'serial' for the lookups that
+            were made, joined with '+' (e.g. 'bulk+serial' when the bulk
+            request missed a pitcher)
+        """
+        # Drop duplicates while keeping the schedule order
+        unique_pitchers = list(dict.fromkeys(pitchers))
+        
+        results = self.get_cached_pitcher_eras(unique_pitchers, force_refresh)
+        modes = []
+        
+        bulk_ids = self.get_bulk_pitcher_ids(unique_pitchers, results, pitcher_ids)
+        if bulk_ids:
+            bulk_stats = self.run_lookup(self.pitcher_stats_bulk_lookup(bulk_ids.values()))
+            bulk_results = self.pitcher_eras_from_bulk(bulk_ids, bulk_stats)
+            results.update(bulk_results)
+            if bulk_results:
+                modes.append('bulk')
+        
+        remaining = [pitcher for pitcher in unique_pitchers if pitcher not in results]
+        
+        if remaining:
+            modes.append('parallel' if self.parallel_lookups and len(remaining) > 1 else 'serial')
+        
+        if not self.parallel_lookups or len(remaining) <= 1:
+            for team_name, pitcher_name in remaining:
+                results[(team_name, pitcher_name)] = self.get_pitcher_era(team_name, pitcher_name, force_refresh)
+        else:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(remaining))) as executor:
+                # Each lookup runs in a copy of this context, keeping its
+                # rate limiter priority
+                futures = [
+                    executor.submit(contextvars.copy_context().run, self.get_pitcher_era,
+                                    team_name, pitcher_name, force_refresh)
+                    for team_name, pitcher_name in remaining
+                ]
+                
+                # Results are keyed by pitcher, so completion order does not matter
+                for key, future in zip(remaining, futures):
+                    results[key] = future.result()
+        
+        return {key: results[key] for key in unique_pitchers}, '+'.join(modes) or 'cached'
+    
+    def get_cached_pitcher_eras(self, pitchers, force_refresh=False):
+        """
+        Get cached ERA data for pitchers
+        
+        Args:
+            pitchers: List of (team_name, pitcher_name) tuples
+            force_refresh: Skip the cache
+            
+        Returns:
+            Dictionary mapping (team_name, pitcher_name) to cached ERA data
+        """
+        results = {}
+        
+        if not force_refresh:
+            for team_name, pitcher_name in pitchers:
+                cached_data = self.get_cached_data(f"pitcher_era_{team_name}_{pitcher_name}")
+                if cached_data:
+                    results[(team_name, pitcher_name)] = cached_data
+        
+        return results
+    
+    def get_bulk_pitcher_ids(self, pitchers, resolved, pitcher_ids):
+        """
+        Pick the unresolved pitchers that can be looked up in bulk
+        
+        Args:
+            pitchers: List of (team_name, pitcher_name) tuples
+            resolved: Dictionary of pitchers already resolved
+            pitcher_ids: Dictionary mapping (team_name, pitcher_name) to MLB player ID
+            
+        Returns:
+            Dictionary mapping (team_name, pitcher_name) to MLB player ID
+        """
+        if not self.bulk_pitcher_stats or not pitcher_ids:
+            return {}
+        
+        return {
+            pitcher: pitcher_ids[pitcher]
+            for pitcher in pitchers
+            if pitcher not in resolved and pitcher_ids.get(pitcher)
+        }
+    
+    def pitcher_stats_bulk_lookup(self, player_ids):
+        """
+        Look up season pitching stats for many players in one request
+        
+        Like pitcher_era_lookup, this is a generator driven by run_lookup
+        or by the asyncio engine.
+        
+        Args:
+            player_ids: MLB player IDs
+            
+        Returns:
+            Dictionary mapping player ID to season ERA (None if the player
+            has no season stats). Players missing from the response, or all
+            players if the request fails, are left out.
+        """
+        ids = ','.join(str(player_id) for player_id in sorted(set(player_ids)))
+        bulk_url = f"{self.mlb_api_base_url}/people?personIds={ids}&hydrate=stats(group=[pitching],type=[season],season=2025)"
+        
+        try:
+            response = yield self.lookup_request(bulk_url, timeout=10)
+            
+            if response.status_code != 200:
+                logger.error(f"Error getting bulk pitcher stats: HTTP {response.status_code}")
+                return {}
+            
+            eras = {}
+            for person in response.json().get('people', []):
+                era = None
+                for stats_group in person.get('stats', []):
+                    if stats_group.get('group', {}).get('displayName', 'pitching') != 'pitching':
+                        continue
+                    splits = stats_group.get('splits', [])
+                    if splits:
+                        era = splits[0].get('stat', {}).get('era')
+                        break
+                eras[person.get('id')] = era
+            
+            return eras
+            
+        except Exception as e:
+            logger.error(f"Error getting bulk pitcher stats: {e}")
+            return {}
+    
+    def pitcher_eras_from_bulk(self, bulk_ids, bulk_stats):
+        """
+        Build and cache ERA data from a bulk stats lookup
+        
+        Args:
+            bulk_ids: Dictionary mapping (team_name, pitcher_name) to MLB player ID
+            bulk_stats: Dictionary from pitcher_stats_bulk_lookup
+            
+        Returns:
+            Dictionary mapping (team_name, pitcher_name) to ERA data for the
+            pitchers present in the bulk response
+        """
+        results = {}
+        
+        for (team_name, pitcher_name), player_id in bulk_ids.items():
+            if player_id not in bulk_stats:
+                continue
+            
+            era = bulk_stats[player_id]
+            if era is not None:
+                result = {'era': era, 'source': 'MLB Stats API', 'method': 'id-lookup'}
+            elif pitcher_name in self.era_mapping:
+                result = {'era': self.era_mapping.get(pitcher_name), 'source': 'MLB Stats API (Fallback)', 'method': 'name-lookup'}
+            else:
+                logger.error(f"Pitcher ERA not found: {pitcher_name} for team {team_name}")
+                result = {'era': 'N/A', 'source': 'not-found', 'method': 'api-failed'}
+            
+            self.save_to_cache(f"pitcher_era_{team_name}_{pitcher_name}", result)
+            results[(team_name, pitcher_name)] = result
+        
+        return results
+    
+    def get_fetch_timings(self, date_str=None):
+        """
+        Get wall-clock timings recorded by get_games_for_date
+        
+        Args:
+            date_str: Date string in format YYYY-MM-DD, or None for all dates
+            
+        Returns:
+            Timings for the date, or a dictionary of timings keyed by date
+        """
+        if date_str:
+            return self.fetch_timings.get(date_str)
+        return dict(self.fetch_timings)
+    
     def get_pitcher_era(self, team_name, pitcher_name, force_refresh=False):
         """
         Get pitcher ERA from MLB Stats API
@@ -408,6 +792,25 @@ class MLBStatsAPI:
             if cached_data:
                 return cached_data
         
+        return self.run_lookup(self.pitcher_era_lookup(team_name, pitcher_name))
+    
+    def pitcher_era_lookup(self, team_name, pitcher_name):
+        """
+        Look up pitcher ERA from MLB Stats API, skipping the cache
+        
+        This is a generator: it yields each request it needs (see
+        lookup_request) and is sent back the response, so the same lookup
+        can be driven by run_lookup or by the asyncio engine.
+        
+        Args:
+            team_name: Name of the team
+            pitcher_name: Name of the pitcher
+            
+        Returns:
+            Pitcher ERA data
+        """
+        cache_key = f"pitcher_era_{team_name}_{pitcher_name}"
+        
         # Try to get ERA from MLB API
         try:
             # Get team abbreviation
@@ -425,11 +828,13 @@ class MLBStatsAPI:
                     result = {'era': era, 'source': 'MLB Stats API (Fallback)', 'method': 'name-lookup'}
                     self.save_to_cache(cache_key, result)
                     return result
-                return {'era': 'N/A', 'source': 'not-found', 'method': 'team-not-found'}
+                result = {'era': 'N/A', 'source': 'not-found', 'method': 'team-not-found'}
+                self.save_to_cache(cache_key, result)
+                return result
             
             # Search for player by name
             search_url = f"{self.mlb_api_base_url}/players?search={pitcher_name}"
-            response = requests.get(search_url)
+            response = yield self.lookup_request(search_url)
             
             if response.status_code == 200:
                 player_data = response.json()
@@ -450,7 +855,7 @@ class MLBStatsAPI:
                     
                     # Get player stats
                     stats_url = f"{self.mlb_api_base_url}/people/{player_id}/stats?stats=season&season=2025&group=pitching"
-                    stats_response = requests.get(stats_url)
+                    stats_response = yield self.lookup_request(stats_url)
                     
                     if stats_response.status_code == 200:
                         stats_data = stats_response.json()
@@ -475,7 +880,9 @@ class MLBStatsAPI:
                 return result
             
             logger.error(f"Pitcher ERA not found: {pitcher_name} for team {team_name}")
-            return {'era': 'N/A', 'source': 'not-found', 'method': 'api-failed'}
+            result = {'era': 'N/A', 'source': 'not-found', 'method': 'api-failed'}
+            self.save_to_cache(cache_key, result)
+            return result
             
         except Exception as e:
             logger.error(f"Error getting pitcher ERA: {e}")
@@ -487,7 +894,9 @@ class MLBStatsAPI:
                 self.save_to_cache(cache_key, result)
                 return result
             
-            return {'era': 'N/A', 'source': 'error', 'method': 'exception'}
+            result = {'era': 'N/A', 'source': 'error', 'method': 'exception'}
+            self.save_to_cache(cache_key, result)
+            return result
     
     def get_games_for_date(self, date_str, force_refresh=False):
         """
@@ -507,78 +916,47 @@ class MLBStatsAPI:
             if cached_data:
                 return cached_data
         
+        # Only one worker fetches a date's games; the others wait and reuse them
+        with self.cache.fill_lock(cache_key):
+            if not force_refresh:
+                cached_data = self.get_cached_data(cache_key)
+                if cached_data:
+                    return cached_data
+            
+            return self.fetch_games_for_date(date_str, force_refresh)
+    
+    def fetch_games_for_date(self, date_str, force_refresh=False):
+        """
+        Fetch MLB games for a date from the MLB Stats API and cache them
+        
+        Args:
+            date_str: Date string in format YYYY-MM-DD
+            force_refresh: Force refresh of pitcher data
+            
+        Returns:
+            List of MLB games for the specified date
+        """
+        cache_key = f"games_{date_str}"
+        
         # Try to get games from MLB API
+        start_time = time.time()
+        
         try:
             # Get schedule for the date
-            schedule_url = f"{self.mlb_api_base_url}/schedule?sportId=1&date={date_str}&hydrate=team,probablePitcher,venue"
-            response = requests.get(schedule_url, timeout=10)  # Add timeout
+            response = self.http_get(self.get_schedule_url(date_str), timeout=10)  # Add timeout
+            schedule_time = time.time()
             
             if response.status_code == 200:
-                schedule_data = response.json()
+                scheduled_games = self.parse_schedule(response.json())
                 
-                games = []
+                # Get pitcher ERA for every probable pitcher on the slate at once
+                era_data, mode = self.resolve_pitcher_eras_with_mode(self.get_slate_pitchers(scheduled_games), force_refresh,
+                                                                     self.get_slate_pitcher_ids(scheduled_games))
+                pitcher_time = time.time()
                 
-                if 'dates' in schedule_data and schedule_data['dates']:
-                    date_data = schedule_data['dates'][0]
-                    
-                    if 'games' in date_data:
-                        for game in date_data['games']:
-                            # Get game data
-                            game_id = game.get('gamePk')
-                            status = game.get('status', {}).get('abstractGameState')
-                            
-                            # Get teams
-                            home_team = game.get('teams', {}).get('home', {}).get('team', {})
-                            away_team = game.get('teams', {}).get('away', {}).get('team', {})
-                            
-                            home_team_name = home_team.get('name')
-                            away_team_name = away_team.get('name')
-                            
-                            # Get venue
-                            venue = game.get('venue', {}).get('name')
-                            
-                            # Get game time
-                            game_time = game.get('gameDate')
-                            if game_time:
-                                game_time = datetime.fromisoformat(game_time.replace('Z', '+00:00'))
-                                game_time_str = game_time.strftime('%H:%M')
-                            else:
-                                game_time_str = 'TBD'
-                            
-                            # Get probable pitchers
-                            home_pitcher = game.get('teams', {}).get('home', {}).get('probablePitcher', {})
-                            away_pitcher = game.get('teams', {}).get('away', {}).get('probablePitcher', {})
-                            
-                            home_pitcher_name = home_pitcher.get('fullName', 'TBD')
-                            away_pitcher_name = away_pitcher.get('fullName', 'TBD')
-                            
-                            # Get pitcher ERA
-                            home_era_data = self.get_pitcher_era(home_team_name, home_pitcher_name)
-                            away_era_data = self.get_pitcher_era(away_team_name, away_pitcher_name)
-                            
-                            home_era = home_era_data.get('era', 'N/A')
-                            away_era = away_era_data.get('era', 'N/A')
-                            
-                            home_era_source = home_era_data.get('source', 'not-found')
-                            away_era_source = away_era_data.get('source', 'not-found')
-                            
-                            # Create game object
-                            game_obj = {
-                                'game_id': game_id,
-                                'status': status,
-                                'home_team': home_team_name,
-                                'away_team': away_team_name,
-                                'venue': venue,
-                                'game_time': game_time_str,
-                                'home_pitcher': home_pitcher_name,
-                                'away_pitcher': away_pitcher_name,
-                                'home_era': home_era,
-                                'away_era': away_era,
-                                'home_era_source': home_era_source,
-                                'away_era_source': away_era_source
-                            }
-                            
-                            games.append(game_obj)
+                games = self.build_games(scheduled_games, era_data)
+                
+                self.record_fetch_timings(date_str, start_time, schedule_time, pitcher_time, len(era_data), mode)
                 
                 # If no games found, use sample data
                 if not games:
@@ -603,6 +981,162 @@ class MLBStatsAPI:
             self.save_to_cache(cache_key, games)
             return games
     
+    def get_schedule_url(self, date_str):
+        """
+        Get the schedule URL for a date
+        
+        Args:
+            date_str: Date string in format YYYY-MM-DD
+            
+        Returns:
+            Schedule URL with teams, probable pitchers and venue hydrated
+        """
+        return f"{self.mlb_api_base_url}/schedule?sportId=1&date={date_str}&hydrate=team,probablePitcher,venue"
+    
+    def parse_schedule(self, schedule_data):
+        """
+        Parse a schedule response into games without pitcher ERA
+        
+        Args:
+            schedule_data: Schedule response from MLB Stats API
+            
+        Returns:
+            List of scheduled games
+        """
+        scheduled_games = []
+        
+        if 'dates' in schedule_data and schedule_data['dates']:
+            date_data = schedule_data['dates'][0]
+            
+            if 'games' in date_data:
+                for game in date_data['games']:
+                    # Get game data
+                    game_id = game.get('gamePk')
+                    status = game.get('status', {}).get('abstractGameState')
+                    
+                    # Get teams
+                    home_team = game.get('teams', {}).get('home', {}).get('team', {})
+                    away_team = game.get('teams', {}).get('away', {}).get('team', {})
+                    
+                    # Get venue
+                    venue = game.get('venue', {}).get('name')
+                    
+                    # Get game time
+                    game_time = game.get('gameDate')
+                    if game_time:
+                        game_time = datetime.fromisoformat(game_time.replace('Z', '+00:00'))
+                        game_time_str = game_time.strftime('%H:%M')
+                    else:
+                        game_time_str = 'TBD'
+                    
+                    # Get probable pitchers
+                    home_pitcher = game.get('teams', {}).get('home', {}).get('probablePitcher', {})
+                    away_pitcher = game.get('teams', {}).get('away', {}).get('probablePitcher', {})
+                    
+                    scheduled_games.append({
+                        'game_id': game_id,
+                        'status': status,
+                        'home_team': home_team.get('name'),
+                        'away_team': away_team.get('name'),
+                        'venue': venue,
+                        'game_time': game_time_str,
+                        'home_pitcher': home_pitcher.get('fullName', 'TBD'),
+                        'away_pitcher': away_pitcher.get('fullName', 'TBD'),
+                        'home_pitcher_id': home_pitcher.get('id'),
+                        'away_pitcher_id': away_pitcher.get('id')
+                    })
+        
+        return scheduled_games
+    
+    def get_slate_pitchers(self, scheduled_games):
+        """
+        List the probable pitchers of a slate in schedule order
+        
+        Args:
+            scheduled_games: Games from parse_schedule
+            
+        Returns:
+            List of (team_name, pitcher_name) tuples
+        """
+        pitchers = []
+        for game in scheduled_games:
+            pitchers.append((game['home_team'], game['home_pitcher']))
+            pitchers.append((game['away_team'], game['away_pitcher']))
+        return pitchers
+    
+    def get_slate_pitcher_ids(self, scheduled_games):
+        """
+        Map a slate's probable pitchers to their MLB player IDs
+        
+        Args:
+            scheduled_games: Games from parse_schedule
+            
+        Returns:
+            Dictionary mapping (team_name, pitcher_name) to MLB player ID
+        """
+        pitcher_ids = {}
+        for game in scheduled_games:
+            if game.get('home_pitcher_id'):
+                pitcher_ids[(game['home_team'], game['home_pitcher'])] = game['home_pitcher_id']
+            if game.get('away_pitcher_id'):
+                pitcher_ids[(game['away_team'], game['away_pitcher'])] = game['away_pitcher_id']
+        return pitcher_ids
+    
+    def build_games(self, scheduled_games, era_data):
+        """
+        Combine scheduled games with pitcher ERA data
+        
+        Args:
+            scheduled_games: Games from parse_schedule
+            era_data: Dictionary mapping (team_name, pitcher_name) to ERA data
+            
+        Returns:
+            List of game objects
+        """
+        games = []
+        
+        for game in scheduled_games:
+            home_era_data = era_data[(game['home_team'], game['home_pitcher'])]
+            away_era_data = era_data[(game['away_team'], game['away_pitcher'])]
+            
+            # Create game object
+            game_obj = dict(game)
+            game_obj['home_era'] = home_era_data.get('era', 'N/A')
+            game_obj['away_era'] = away_era_data.get('era', 'N/A')
+            game_obj['home_era_source'] = home_era_data.get('source', 'not-found')
+            game_obj['away_era_source'] = away_era_data.get('source', 'not-found')
+            
+            games.append(game_obj)
+        
+        return games
+    
+    def record_fetch_timings(self, date_str, start_time, schedule_time, pitcher_time, pitcher_lookups, mode):
+        """
+        Record wall-clock timings for a date's schedule fetch
+        
+        Args:
+            date_str: Date string in format YYYY-MM-DD
+            start_time: Time the fetch started
+            schedule_time: Time the schedule response arrived
+            pitcher_time: Time the last pitcher lookup finished
+            pitcher_lookups: Number of distinct pitchers looked up
+            mode: How the pitchers were resolved (cached, bulk, parallel,
+                serial or a combination, or async for the asyncio engine)
+        """
+        timings = {
+            'mode': mode,
+            'schedule_seconds': round(schedule_time - start_time, 3),
+            'pitcher_era_seconds': round(pitcher_time - schedule_time, 3),
+            'total_seconds': round(pitcher_time - start_time, 3),
+            'pitcher_lookups': pitcher_lookups,
+            'timestamp': datetime.now().timestamp()
+        }
+        
+        self.fetch_timings[date_str] = timings
+        logger.info(f"Fetched games for {date_str} in {timings['total_seconds']}s "
+                    f"(schedule {timings['schedule_seconds']}s, {pitcher_lookups} pitchers "
+                    f"in {timings['pitcher_era_seconds']}s, {timings['mode']})")
+    
     def get_sample_games_for_date(self, date_str):
         """
         Get sample games for a specific date
@@ -648,68 +1182,217 @@ class MLBStatsAPI:
             if cached_data:
                 return cached_data
         
+        if self.bulk_team_stats:
+            self.prefetch_team_stats()
+            team_stats = self.team_stats_from_index(team_name)
+            if team_stats:
+                return team_stats
+        
+        return self.run_lookup(self.team_stats_lookup(team_name))
+    
+    def find_team_abbr(self, team_name):
+        """
+        Get the abbreviation for a team name
+        
+        Args:
+            team_name: Full or partial name of the team
+            
+        Returns:
+            Team abbreviation, or None if the team is unknown
+        """
+        for name, abbr in self.team_mapping.items():
+            if team_name.lower() in name.lower() or name.lower() in team_name.lower():
+                return abbr
+        return None
+    
+    def build_team_stats(self, team_name, team_abbr, stat):
+        """
+        Build a team stats object from a season pitching stat line
+        
+        Args:
+            team_name: Name of the team
+            team_abbr: Team abbreviation
+            stat: Season pitching 'stat' dictionary from MLB Stats API
+            
+        Returns:
+            Team stats data
+        """
+        team_era = stat.get('era')
+        
+        # Get bullpen stats (approximation)
+        try:
+            bullpen_era = round(float(team_era) + 0.5, 2)  # Bullpen typically has higher ERA
+        except (TypeError, ValueError):
+            bullpen_era = None
+        
+        return {
+            'team_name': team_name,
+            'team_abbr': team_abbr,
+            'team_era': team_era,
+            'team_whip': stat.get('whip'),
+            'team_strikeouts': stat.get('strikeOuts'),
+            'team_walks': stat.get('walks'),
+            'bullpen_era': bullpen_era
+        }
+    
+    def team_index_expired(self):
+        """
+        Check whether the shared season team stats index needs reloading
+        
+        Returns:
+            True if the index is empty or older than the season stats lifetime
+        """
+        return (not MLBStatsAPI.team_stats_index or
+                time.time() - MLBStatsAPI.team_stats_index_time >= CACHE_TTLS['season'])
+    
+    def team_index_lookup(self, force_refresh=False):
+        """
+        Load the team directory and season pitching stats for every club
+        
+        The directory is loaded once per process. The stats index is loaded
+        with a single request and reloaded once it expires. Like
+        pitcher_era_lookup, this is a generator driven by run_lookup or by
+        the asyncio engine.
+        
+        Args:
+            force_refresh: Reload both even if they are fresh
+            
+        Returns:
+            True if the stats index is available
+        """
+        try:
+            if force_refresh or not MLBStatsAPI.team_directory:
+                response = yield self.lookup_request(f"{self.mlb_api_base_url}/teams?sportId=1", timeout=10)
+                
+                if response.status_code == 200:
+                    directory = {
+                        team.get('abbreviation'): team.get('id')
+                        for team in response.json().get('teams', [])
+                        if team.get('abbreviation') and team.get('id')
+                    }
+                    if directory:
+                        MLBStatsAPI.team_directory = directory
+                else:
+                    logger.error(f"Error getting team directory: HTTP {response.status_code}")
+            
+            if force_refresh or self.team_index_expired():
+                stats_url = f"{self.mlb_api_base_url}/teams/stats?stats=season&season=2025&group=pitching&sportIds=1"
+                response = yield self.lookup_request(stats_url, timeout=10)
+                
+                if response.status_code == 200:
+                    index = {}
+                    for stats_group in response.json().get('stats', []):
+                        for split in stats_group.get('splits', []):
+                            team_id = split.get('team', {}).get('id')
+                            if team_id:
+                                index[team_id] = split.get('stat', {})
+                    
+                    if index:
+                        MLBStatsAPI.team_stats_index = index
+                        MLBStatsAPI.team_stats_index_time = time.time()
+                        logger.info(f"Loaded season pitching stats for {len(index)} teams")
+                else:
+                    logger.error(f"Error getting season team stats: HTTP {response.status_code}")
+        
+        except Exception as e:
+            logger.error(f"Error loading team stats index: {e}")
+        
+        return bool(MLBStatsAPI.team_stats_index)
+    
+    def prefetch_team_stats(self, force_refresh=False):
+        """
+        Make sure the shared season team stats index is loaded
+        
+        Args:
+            force_refresh: Reload the index even if it is fresh
+            
+        Returns:
+            True if the stats index is available
+        """
+        with MLBStatsAPI.team_index_lock:
+            return self.run_lookup(self.team_index_lookup(force_refresh))
+    
+    def team_stats_from_index(self, team_name):
+        """
+        Get team stats from the shared season team stats index
+        
+        Args:
+            team_name: Name of the team
+            
+        Returns:
+            Team stats data, or None if the team is not in the index
+        """
+        if not team_name:
+            return None
+        
+        team_abbr = self.find_team_abbr(team_name)
+        stat = MLBStatsAPI.team_stats_index.get(MLBStatsAPI.team_directory.get(team_abbr))
+        
+        if not stat:
+            return None
+        
+        team_stats = self.build_team_stats(team_name, team_abbr, stat)
+        self.save_to_cache(f"team_stats_{team_name}", team_stats)
+        
+        return team_stats
+    
+    def team_stats_lookup(self, team_name):
+        """
+        Look up team stats from MLB Stats API, skipping the cache
+        
+        Like pitcher_era_lookup, this is a generator driven by run_lookup
+        or by the asyncio engine.
+        
+        Args:
+            team_name: Name of the team
+            
+        Returns:
+            Team stats data
+        """
+        cache_key = f"team_stats_{team_name}"
+        team_abbr = None
+        
         # Try to get team stats from MLB API
         try:
-            # Get team ID
-            team_abbr = None
-            for name, abbr in self.team_mapping.items():
-                if team_name.lower() in name.lower() or name.lower() in team_name.lower():
-                    team_abbr = abbr
-                    break
+            # Get team abbreviation
+            team_abbr = self.find_team_abbr(team_name)
             
             if not team_abbr:
                 logger.warning(f"Team not found: {team_name}")
                 return {'error': 'Team not found'}
             
-            # Get team ID from abbreviation
-            teams_url = f"{self.mlb_api_base_url}/teams"
-            response = requests.get(teams_url)
+            # Get team ID from the team directory, or from the teams list
+            team_id = MLBStatsAPI.team_directory.get(team_abbr)
             
-            if response.status_code == 200:
-                teams_data = response.json()
+            if not team_id:
+                teams_url = f"{self.mlb_api_base_url}/teams"
+                response = yield self.lookup_request(teams_url)
                 
-                if 'teams' in teams_data:
-                    team_id = None
-                    for team in teams_data['teams']:
+                if response.status_code == 200:
+                    for team in response.json().get('teams', []):
                         if team.get('abbreviation') == team_abbr:
                             team_id = team.get('id')
                             break
+            
+            if team_id:
+                # Get team stats
+                stats_url = f"{self.mlb_api_base_url}/teams/{team_id}/stats?stats=season&season=2025&group=pitching"
+                stats_response = yield self.lookup_request(stats_url)
+                
+                if stats_response.status_code == 200:
+                    stats_data = stats_response.json()
                     
-                    if team_id:
-                        # Get team stats
-                        stats_url = f"{self.mlb_api_base_url}/teams/{team_id}/stats?stats=season&season=2025&group=pitching"
-                        stats_response = requests.get(stats_url)
+                    if 'stats' in stats_data and stats_data['stats'] and 'splits' in stats_data['stats'][0]:
+                        splits = stats_data['stats'][0]['splits']
                         
-                        if stats_response.status_code == 200:
-                            stats_data = stats_response.json()
+                        if splits:
+                            # Create team stats object
+                            team_stats = self.build_team_stats(team_name, team_abbr, splits[0].get('stat', {}))
                             
-                            if 'stats' in stats_data and stats_data['stats'] and 'splits' in stats_data['stats'][0]:
-                                splits = stats_data['stats'][0]['splits']
-                                
-                                if splits:
-                                    team_era = splits[0].get('stat', {}).get('era')
-                                    team_whip = splits[0].get('stat', {}).get('whip')
-                                    team_strikeouts = splits[0].get('stat', {}).get('strikeOuts')
-                                    team_walks = splits[0].get('stat', {}).get('walks')
-                                    
-                                    # Get bullpen stats (approximation)
-                                    bullpen_era = team_era + 0.5 if team_era else None  # Bullpen typically has higher ERA
-                                    
-                                    # Create team stats object
-                                    team_stats = {
-                                        'team_name': team_name,
-                                        'team_abbr': team_abbr,
-                                        'team_era': team_era,
-                                        'team_whip': team_whip,
-                                        'team_strikeouts': team_strikeouts,
-                                        'team_walks': team_walks,
-                                        'bullpen_era': bullpen_era
-                                    }
-                                    
-                                    # Save to cache
-                                    self.save_to_cache(cache_key, team_stats)
-                                    
-                                    return team_stats
+                            # Save to cache
+                            self.save_to_cache(cache_key, team_stats)
+                            
+                            return team_stats
             
             logger.error(f"Error getting team stats for {team_name}")
             
@@ -721,10 +1404,11 @@ class MLBStatsAPI:
                 'team_whip': 1.3,  # Fallback WHIP
                 'team_strikeouts': 500,  # Fallback strikeouts
                 'team_walks': 200,  # Fallback walks
-                'bullpen_era': 4.5  # Fallback bullpen ERA
+                'bullpen_era': 4.5,  # Fallback bullpen ERA
+                'source': 'fallback'
             }
             
-            # Save to cache
+            # Save to cache, for CACHE_TTLS['negative'] only
             self.save_to_cache(cache_key, fallback_stats)
             
             return fallback_stats
@@ -740,10 +1424,11 @@ class MLBStatsAPI:
                 'team_whip': 1.3,  # Fallback WHIP
                 'team_strikeouts': 500,  # Fallback strikeouts
                 'team_walks': 200,  # Fallback walks
-                'bullpen_era': 4.5  # Fallback bullpen ERA
+                'bullpen_era': 4.5,  # Fallback bullpen ERA
+                'source': 'fallback'
             }
             
-            # Save to cache
+            # Save to cache, for CACHE_TTLS['negative'] only
             self.save_to_cache(cache_key, fallback_stats)
             
             return fallback_stats
@@ -1,5 +1,7 @@
-import requests
-import json
+import http_session
+import tiered_cache
+import serializer
+import data_sources
 import os
 import re
 import time
@@ -18,40 +20,15 @@ class MLBStatsDirectAPI:
         self.cache_dir = 'cache/mlb_direct'
         self.cache_expiry = 3600 * 3  # Cache expiry in seconds (3 hours)
         os.makedirs(self.cache_dir, exist_ok=True)
+        self.cache = tiered_cache.get_cache(self.cache_dir, self.cache_expiry, envelope=True)
     
     def get_cached_data(self, cache_key):
         """Get data from cache if available and not expired"""
-        cache_file = os.path.join(self.cache_dir, f"{cache_key}.json")
-        
-        if os.path.exists(cache_file):
-            try:
-                with open(cache_file, 'r') as f:
-                    cached_data = json.load(f)
-                
-                # Check if cache is expired
-                cache_time = cached_data.get('cache_time', 0)
-                if (datetime.now() - datetime.fromtimestamp(cache_time)).total_seconds() < self.cache_expiry:
-                    return cached_data.get('data')
-            except Exception as e:
-                print(f"Error reading MLB direct cache: {e}")
-        
-        return None
+        return self.cache.get(cache_key, self.cache_expiry)
     
     def save_to_cache(self, cache_key, data):
         """Save data to cache"""
-        cache_file = os.path.join(self.cache_dir, f"{cache_key}.json")
-        
-        try:
-            with open(cache_file, 'w') as f:
-                json.dump({
-                    'data': data,
-                    'cache_time': datetime.now().timestamp()
-                }, f)
-            
-            return True
-        except Exception as e:
-            print(f"Error saving MLB direct data to cache: {e}")
-            return False
+        return self.cache.set(cache_key, data)
     
     def get_team_id(self, team_name):
         """
@@ -119,7 +96,7 @@ class MLBStatsDirectAPI:
         
         try:
             url = f"{self.base_url}/v1/teams/{team_id}/roster"
-            response = requests.get(url)
+            response = http_session.get(url)
             
             if response.status_code != 200:
                 print(f"Error fetching team roster: {response.status_code}")
@@ -167,12 +144,15 @@ class MLBStatsDirectAPI:
                     "whip": 1.30,
                     "strikeouts": 0,
                     "innings": 0,
-                    "source": "default"
+                    "source": "default",
+                    # An empty roster for a known team means it could not be
+                    # fetched, not that the pitcher is missing
+                    "method": "not-found" if roster or not self.get_team_id(team_name) else "roster-failed"
                 }
             
             # Get pitcher stats
             url = f"{self.base_url}/v1/people/{pitcher_id}/stats?stats=season&group=pitching"
-            response = requests.get(url)
+            response = http_session.get(url)
             
             if response.status_code != 200:
                 print(f"Error fetching pitcher stats: {response.status_code}")
@@ -264,8 +244,7 @@ class MultiSourceStatsAPI:
         # Check if cached data exists and is recent
         if os.path.exists(cache_file):
             try:
-                with open(cache_file, 'r') as f:
-                    cached_data = json.load(f)
+                cached_data = serializer.load_file(cache_file)
                 
                 # Use cached data if it's from today
                 cache_date = datetime.fromtimestamp(cached_data.get('timestamp', 0))
@@ -275,32 +254,23 @@ class MultiSourceStatsAPI:
             except Exception as e:
                 print(f"Error reading multi-source cache: {e}")
         
-        # Try MLB direct API first
-        mlb_stats = self.mlb_direct_api.get_pitcher_stats(team_name, pitcher_name)
+        # MLB direct API first (most authoritative), then Baseball Reference,
+        # skipping either while its circuit is open
+        result, source = data_sources.fetch('pitcher_season', ('mlb-direct', 'baseball-reference'),
+                                            team_name=team_name, pitcher_name=pitcher_name)
         
-        # If MLB direct API returned real data, use it
-        if mlb_stats.get('source') != 'default':
-            result = mlb_stats
-            print(f"Using MLB direct data for {pitcher_name}")
+        if result:
+            print(f"Using {source} data for {pitcher_name}")
         else:
-            # Try Baseball Reference as fallback
-            bbref_team_abbr = self.bbref_api.get_team_abbreviation(team_name)
-            bbref_stats = self.bbref_api.scrape_pitcher_stats(bbref_team_abbr, pitcher_name)
-            
-            # If Baseball Reference returned real data, use it
-            if bbref_stats.get('source') != 'default':
-                result = bbref_stats
-                print(f"Using Baseball Reference data for {pitcher_name}")
-            else:
-                # Use default values as last resort
-                result = {
-                    "era": 4.50,
-                    "whip": 1.30,
-                    "strikeouts": 0,
-                    "innings": 0,
-                    "source": "default"
-                }
-                print(f"Using default data for {pitcher_name}")
+            # Use default values as last resort
+            result = {
+                "era": 4.50,
+                "whip": 1.30,
+                "strikeouts": 0,
+                "innings": 0,
+                "source": "default"
+            }
+            print(f"Using default data for {pitcher_name}")
         
         # Add metadata
         result['name'] = pitcher_name
@@ -309,11 +279,10 @@ class MultiSourceStatsAPI:
         
         # Save to cache
         try:
-            with open(cache_file, 'w') as f:
-                json.dump({
-                    'stats': result,
-                    'timestamp': datetime.now().timestamp()
-                }, f)
+            serializer.dump_file(cache_file, {
+                'stats': result,
+                'timestamp': datetime.now().timestamp()
+            })
             print(f"Saved multi-source data to cache for {pitcher_name}")
         except Exception as e:
             print(f"Error saving multi-source data to cache: {e}")
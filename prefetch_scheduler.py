@@ -0,0 +1,276 @@
+import os
+import time
+import logging
+import tempfile
+import threading
+import http_session
+from datetime import datetime, timedelta
+
+try:
+    import fcntl
+except ImportError:  # Every process warms its own window where file locks are unavailable
+    fcntl = None
+
+logger = logging.getLogger('prefetch_scheduler')
+
+# Defaults, overridable through the environment
+DEFAULT_DAYS = int(os.environ.get('MLB_PREFETCH_DAYS', 7))
+DEFAULT_INTERVAL = float(os.environ.get('MLB_PREFETCH_INTERVAL', 300))
+DEFAULT_PAUSE = float(os.environ.get('MLB_PREFETCH_PAUSE', 1.0))
+DEFAULT_LOCK_FILE = os.environ.get('MLB_PREFETCH_LOCK_FILE',
+                                   os.path.join(tempfile.gettempdir(), 'mlb_prefetch.lock'))
+
+
+class PrefetchScheduler:
+    """
+    Background thread that keeps predictions warm for the dates /api/dates advertises
+
+    Every gunicorn worker starts a scheduler, but only the one holding the
+    lock file warms the window. The others check the lock each interval and
+    take over if the leader's process exits.
+    """
+
+    def __init__(self, prediction_api, days=DEFAULT_DAYS, interval=DEFAULT_INTERVAL, pause=DEFAULT_PAUSE,
+                 lock_file=DEFAULT_LOCK_FILE):
+        """
+        Initialize the scheduler
+
+        Args:
+            prediction_api: MLBPredictionAPI whose predictions are warmed
+            days: Dates before and after today to warm
+            interval: Seconds between passes over the window
+            pause: Seconds to wait after each rebuilt date, to spread
+                requests to the upstream APIs
+            lock_file: File locked by the one scheduler that warms the
+                window (None to always warm)
+        """
+        self.prediction_api = prediction_api
+        self.days = days
+        self.interval = interval
+        self.pause = pause
+        self.lock_file = lock_file
+
+        # Open lock file while this scheduler is the leader
+        self.leader_file = None
+
+        self.thread = None
+        self.stop_event = threading.Event()
+        self.lock = threading.Lock()
+
+        # Queue state and timings
+        self.queue = []
+        self.current_date = None
+        self.runs = 0
+        self.last_run = None
+        self.date_timings = {}
+
+    def get_prefetch_dates(self, today=None):
+        """
+        List the dates to warm, most important first
+
+        Today and tomorrow come first, then the remaining dates alternate
+        outward from today. With days=0 only today is warmed.
+
+        Args:
+            today: Date to center the window on (defaults to today)
+
+        Returns:
+            List of date strings in format YYYY-MM-DD
+        """
+        today = today or datetime.now()
+        offsets = [0, 1] if self.days else [0]
+
+        for i in range(1, self.days + 1):
+            offsets.append(-i)
+            if i + 1 <= self.days:
+                offsets.append(i + 1)
+
+        return [(today + timedelta(days=offset)).strftime('%Y-%m-%d') for offset in offsets]
+
+    def start(self):
+        """
+        Start the scheduler thread
+
+        Returns:
+            True if the thread was started, False if it was already running
+        """
+        with self.lock:
+            if self.thread and self.thread.is_alive():
+                return False
+
+            self.stop_event.clear()
+            self.thread = threading.Thread(target=self.run, name='prefetch-scheduler', daemon=True)
+            self.thread.start()
+
+        logger.info(f"Started prefetch scheduler for today +/- {self.days} days every {self.interval}s")
+        return True
+
+    def stop(self, timeout=None):
+        """
+        Stop the scheduler thread after the date in progress
+
+        Args:
+            timeout: Seconds to wait for the thread to finish
+        """
+        self.stop_event.set()
+        if self.thread:
+            self.thread.join(timeout)
+        self.release_leadership()
+
+    def acquire_leadership(self):
+        """
+        Take the lock file if no other scheduler holds it
+
+        The lock is held until release_leadership or until the process
+        exits, so a new leader is chosen when a worker is restarted.
+
+        Returns:
+            True if this scheduler is the leader
+        """
+        if fcntl is None or self.lock_file is None or self.leader_file is not None:
+            return True
+
+        try:
+            leader_file = open(self.lock_file, 'a+')
+        except OSError as e:
+            logger.warning(f"Cannot open {self.lock_file}, warming without a leader: {e}")
+            return True
+
+        try:
+            fcntl.flock(leader_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            leader_file.close()
+            return False
+
+        self.leader_file = leader_file
+        logger.info(f"Prefetch scheduler in process {os.getpid()} is the leader")
+        return True
+
+    def release_leadership(self):
+        """
+        Release the lock file so another scheduler can take over
+        """
+        if self.leader_file is not None:
+            fcntl.flock(self.leader_file, fcntl.LOCK_UN)
+            self.leader_file.close()
+            self.leader_file = None
+
+    def run(self):
+        """
+        Warm the window on startup, then once per interval until stopped,
+        whenever this scheduler is the leader
+
+        Requests made while warming are background requests for the rate
+        limiter, so they never hold up live requests.
+        """
+        with http_session.background():
+            while not self.stop_event.is_set():
+                try:
+                    if self.acquire_leadership():
+                        self.run_once()
+                except Exception as e:
+                    logger.error(f"Error in prefetch run: {e}")
+
+                self.stop_event.wait(self.interval)
+
+    def run_once(self):
+        """
+        Make one pass over the window, rebuilding dates that are missing or
+        close to expiring
+
+        Returns:
+            Dictionary with the run's start time, duration and counts
+        """
+        dates = self.get_prefetch_dates()
+        start_time = time.time()
+        built = 0
+        errors = 0
+
+        with self.lock:
+            self.queue = list(dates)
+            self.date_timings = {
+                date_str: timing for date_str, timing in self.date_timings.items() if date_str in dates
+            }
+
+        for date_str in dates:
+            if self.stop_event.is_set():
+                break
+
+            with self.lock:
+                self.queue.remove(date_str)
+                self.current_date = date_str
+
+            status = self.warm_date(date_str)
+            if status == 'built':
+                built += 1
+                self.stop_event.wait(self.pause)
+            elif status == 'error':
+                errors += 1
+
+        with self.lock:
+            self.queue = []
+            self.current_date = None
+            self.runs += 1
+            self.last_run = {
+                'started': start_time,
+                'seconds': round(time.time() - start_time, 3),
+                'dates': len(dates),
+                'built': built,
+                'errors': errors
+            }
+            last_run = dict(self.last_run)
+
+        logger.info(f"Prefetch run built {built} of {len(dates)} dates in {last_run['seconds']}s")
+        return last_run
+
+    def warm_date(self, date_str):
+        """
+        Rebuild a date's predictions if they are missing or due
+
+        Args:
+            date_str: Date string in format YYYY-MM-DD
+
+        Returns:
+            'fresh' if nothing was needed, 'built' if the date was rebuilt,
+            or 'error'
+        """
+        start_time = time.time()
+
+        try:
+            if self.prediction_api.predictions_due(date_str):
+                self.prediction_api.refresh_predictions(date_str)
+                status = 'built'
+            else:
+                status = 'fresh'
+        except Exception as e:
+            logger.error(f"Error prefetching predictions for {date_str}: {e}")
+            status = 'error'
+
+        with self.lock:
+            self.date_timings[date_str] = {
+                'status': status,
+                'seconds': round(time.time() - start_time, 3),
+                'finished': time.time()
+            }
+
+        return status
+
+    def get_status(self):
+        """
+        Get queue state and timings
+
+        Returns:
+            Scheduler status for /api/status
+        """
+        with self.lock:
+            return {
+                'running': bool(self.thread and self.thread.is_alive()),
+                'leader': self.leader_file is not None,
+                'days': self.days,
+                'interval': self.interval,
+                'queue': list(self.queue),
+                'current_date': self.current_date,
+                'runs': self.runs,
+                'last_run': dict(self.last_run) if self.last_run else None,
+                'dates': {date_str: dict(timing) for date_str, timing in sorted(self.date_timings.items())}
+            }
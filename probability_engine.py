@@ -0,0 +1,302 @@
+import math
+from collections import namedtuple
+
+try:
+    import numpy as np
+except ImportError:  # Without NumPy, columns are Python lists scored one game at a time
+    np = None
+
+# Markets as (prediction list key, key within a game's 'predictions', run threshold)
+MARKETS = [
+    ('under_1_run_first_inning', 'under_1_run_first_inning', None),
+    ('over_2.5_runs_first_3_innings', 'over_2_5_runs_first_three_innings', 2.5),
+    ('over_3.5_runs_first_3_innings', 'over_3_5_runs_first_three_innings', 3.5)
+]
+
+# Inputs for a slate, one entry per game in each column. Missing stats are NaN.
+SlateColumns = namedtuple('SlateColumns', [
+    'game_ids',
+    'home_era', 'away_era',
+    'home_whip', 'away_whip',
+    'home_strikeouts', 'away_strikeouts',
+    'home_innings_pitched', 'away_innings_pitched',
+    'park_factor', 'weather_factor'
+])
+
+
+def get_rating(probability):
+    """
+    Get rating based on probability (same cutoffs as MLBPredictionAPI.get_rating)
+
+    Args:
+        probability: Prediction probability
+
+    Returns:
+        Rating (Bet, Lean, Pass)
+    """
+    if probability >= 60:
+        return "Bet"
+    elif probability >= 52:
+        return "Lean"
+    else:
+        return "Pass"
+
+
+class ScalarOps:
+    """
+    Element-wise operations on Python floats, used when NumPy is unavailable
+    """
+
+    @staticmethod
+    def clip(value, low, high):
+        return max(low, min(high, value))
+
+    @staticmethod
+    def where(condition, if_true, if_false):
+        return if_true if condition else if_false
+
+    @staticmethod
+    def isnan(value):
+        return math.isnan(value)
+
+    @staticmethod
+    def rate(probability):
+        return get_rating(probability)
+
+
+class ArrayOps:
+    """
+    Element-wise operations on NumPy arrays
+    """
+
+    @staticmethod
+    def clip(value, low, high):
+        return np.clip(value, low, high)
+
+    @staticmethod
+    def where(condition, if_true, if_false):
+        return np.where(condition, if_true, if_false)
+
+    @staticmethod
+    def isnan(value):
+        return np.isnan(value)
+
+    @staticmethod
+    def rate(probability):
+        return np.where(probability >= 60, "Bet", np.where(probability >= 52, "Lean", "Pass"))
+
+
+def parse_era(value):
+    """
+    Convert an ERA to a float the way calculate_pitcher_performance_score does
+
+    Args:
+        value: ERA value (number, string, 'N/A' or None)
+
+    Returns:
+        ERA as a float, or NaN if it is missing or invalid
+    """
+    if value is None or value == 'N/A':
+        return math.nan
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+def parse_stat(value):
+    """
+    Convert a WHIP, strikeout or innings value to a float
+
+    Like calculate_pitcher_performance_score, empty and zero values count as
+    missing.
+
+    Args:
+        value: Stat value (number, string, 'N/A' or None)
+
+    Returns:
+        Stat as a float, or NaN if it is missing or invalid
+    """
+    if not value or value == 'N/A':
+        return math.nan
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+def pitcher_score(era, whip, strikeouts, innings_pitched, ops):
+    """
+    Pitcher performance score (0-100), matching calculate_pitcher_performance_score
+
+    Args:
+        era: ERA, NaN if missing
+        whip: WHIP, NaN if missing
+        strikeouts: Strikeouts, NaN if missing
+        innings_pitched: Innings pitched, NaN if missing
+        ops: ScalarOps for single values or ArrayOps for columns
+
+    Returns:
+        Pitcher performance score
+    """
+    era_score = ops.clip(100 - (era * 10), 0, 100)
+
+    # K/9 (strikeouts per 9 innings), 0 when no innings were pitched
+    pitched = innings_pitched > 0
+    k9 = ops.where(pitched, (strikeouts / ops.where(pitched, innings_pitched, 1)) * 9, 0)
+
+    whip_score = ops.clip(100 - (whip * 50), 0, 100)
+    k9_score = ops.clip((k9 / 15) * 100, 0, 100)
+    combined_score = (era_score * 0.6) + (whip_score * 0.25) + (k9_score * 0.15)
+
+    # WHIP, strikeouts and innings are only used when all three are available
+    # (the sum is NaN if any of them is missing)
+    score = ops.where(ops.isnan(whip + strikeouts + innings_pitched), era_score, combined_score)
+
+    # Missing ERA gives a neutral score
+    return ops.where(ops.isnan(era), 50, score)
+
+
+def score_game(home_era, away_era, home_whip, away_whip, home_strikeouts, away_strikeouts,
+               home_innings_pitched, away_innings_pitched, park_factor, weather_factor, ops):
+    """
+    Score one game, or a whole slate of columns at once
+
+    Args:
+        home_era ... weather_factor: Values (or columns) from SlateColumns
+        ops: ScalarOps for single values or ArrayOps for columns
+
+    Returns:
+        Dictionary with 'pitcher_score', 'factor_pitcher_score' and each
+        market's (probability, rating)
+    """
+    home_score = pitcher_score(home_era, home_whip, home_strikeouts, home_innings_pitched, ops)
+    away_score = pitcher_score(away_era, away_whip, away_strikeouts, away_innings_pitched, ops)
+    score = (home_score + away_score) / 2
+
+    # Factor breakdowns score the pitchers' combined ERA, using 4.50 for a missing ERA
+    combined_era = ops.where(ops.isnan(home_era), 4.50, home_era) + ops.where(ops.isnan(away_era), 4.50, away_era)
+    factor_score = ops.clip(100 - (combined_era * 10), 0, 100) / 2
+
+    scores = {'pitcher_score': score, 'factor_pitcher_score': factor_score}
+
+    for market, game_key, run_threshold in MARKETS:
+        if run_threshold is None:
+            # Higher pitcher score = higher probability of no runs
+            base_probability = 30 + (score * 0.4)
+        else:
+            # Lower pitcher score = higher probability of the over, and
+            # higher thresholds are harder to go over
+            threshold_factor = {2.5: 1.1, 3.5: 0.9}.get(run_threshold, 1.0)
+            base_probability = 30 + ((100 - score) * 0.4 * threshold_factor)
+
+        probability = ops.clip(base_probability * park_factor * weather_factor, 0, 100)
+        scores[market] = (probability, ops.rate(probability))
+
+    return scores
+
+
+class ProbabilityEngine:
+    """
+    Scores whole slates (or seasons) of games in one pass over columnar arrays
+    """
+
+    def __init__(self, use_numpy=None):
+        """
+        Initialize the engine
+
+        Args:
+            use_numpy: Score with NumPy arrays (defaults to True when NumPy is
+                installed). Without it, the same formulas run game by game.
+        """
+        self.use_numpy = np is not None if use_numpy is None else use_numpy
+
+        if self.use_numpy and np is None:
+            raise ImportError("NumPy is not installed")
+
+    def load_games(self, games, park_factors=None):
+        """
+        Load games into columns, converting every stat once
+
+        Args:
+            games: Game objects as returned by get_games_for_date. Optional
+                home_/away_ whip, strikeouts and innings_pitched keys are used
+                when present.
+            park_factors: Dictionary mapping venue to a run factor (defaults
+                to neutral parks)
+
+        Returns:
+            SlateColumns
+        """
+        park_factors = park_factors or {}
+        columns = {'game_ids': [game.get('game_id') for game in games]}
+
+        for side in ('home', 'away'):
+            columns[f'{side}_era'] = [parse_era(game.get(f'{side}_era')) for game in games]
+            for stat in ('whip', 'strikeouts', 'innings_pitched'):
+                columns[f'{side}_{stat}'] = [parse_stat(game.get(f'{side}_{stat}')) for game in games]
+
+        columns['park_factor'] = [float(park_factors.get(game.get('venue'), 1.0)) for game in games]
+        columns['weather_factor'] = [1.0] * len(games)
+
+        if self.use_numpy:
+            columns = {
+                name: values if name == 'game_ids' else np.array(values, dtype=np.float64)
+                for name, values in columns.items()
+            }
+
+        return SlateColumns(**columns)
+
+    def score(self, columns):
+        """
+        Compute pitcher scores and every market's probability and rating
+
+        Args:
+            columns: SlateColumns from load_games
+
+        Returns:
+            Dictionary with 'game_ids', 'pitcher_score' and
+            'factor_pitcher_score' lists, plus {'probability', 'rating'} lists
+            for each market
+        """
+        inputs = columns[1:]
+
+        if self.use_numpy:
+            with np.errstate(invalid='ignore', divide='ignore'):
+                scores = score_game(*inputs, ArrayOps)
+
+            results = {
+                'pitcher_score': scores['pitcher_score'].tolist(),
+                'factor_pitcher_score': scores['factor_pitcher_score'].tolist()
+            }
+            for market, game_key, run_threshold in MARKETS:
+                probabilities, ratings = scores[market]
+                results[market] = {'probability': probabilities.tolist(), 'rating': ratings.tolist()}
+        else:
+            game_scores = [score_game(*row, ScalarOps) for row in zip(*inputs)]
+
+            results = {
+                'pitcher_score': [game['pitcher_score'] for game in game_scores],
+                'factor_pitcher_score': [game['factor_pitcher_score'] for game in game_scores]
+            }
+            for market, game_key, run_threshold in MARKETS:
+                results[market] = {
+                    'probability': [game[market][0] for game in game_scores],
+                    'rating': [game[market][1] for game in game_scores]
+                }
+
+        results['game_ids'] = list(columns.game_ids)
+        return results
+
+    def score_games(self, games, park_factors=None):
+        """
+        Load and score games in one call
+
+        Args:
+            games: Game objects as returned by get_games_for_date
+            park_factors: Dictionary mapping venue to a run factor
+
+        Returns:
+            Scores as returned by score
+        """
+        return self.score(self.load_games(games, park_factors))
@@ -0,0 +1,255 @@
+import os
+import glob
+import json
+import time
+import marshal
+import logging
+
+try:
+    import orjson
+except ImportError:  # Fall back to the stdlib json module
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # The msgpack cache format is unavailable
+    msgpack = None
+
+logger = logging.getLogger('serializer')
+
+
+class StdlibJSONCodec:
+    """
+    JSON through the stdlib json module
+    """
+
+    name = 'json'
+    extension = '.json'
+
+    def dumps(self, data, sort_keys=False):
+        return json.dumps(data, sort_keys=sort_keys, separators=(',', ':')).encode('utf-8')
+
+    def loads(self, contents):
+        return json.loads(contents)
+
+
+class OrjsonCodec:
+    """
+    JSON through orjson, several times faster than the stdlib for large payloads
+
+    Output is interchangeable with StdlibJSONCodec, except that non-ASCII
+    characters are written as UTF-8 rather than escaped.
+    """
+
+    name = 'orjson'
+    extension = '.json'
+
+    def dumps(self, data, sort_keys=False):
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_SORT_KEYS if sort_keys else 0)
+        return orjson.dumps(data, option=option)
+
+    def loads(self, contents):
+        return orjson.loads(contents)
+
+
+class MsgpackCodec:
+    """
+    MessagePack, a compact binary format for on-disk caches
+    """
+
+    name = 'msgpack'
+    extension = '.msgpack'
+
+    def dumps(self, data, sort_keys=False):
+        return msgpack.packb(data, use_bin_type=True)
+
+    def loads(self, contents):
+        return msgpack.unpackb(contents, raw=False, strict_map_key=False)
+
+
+class MarshalCodec:
+    """
+    The stdlib marshal format, a compact binary format for on-disk caches
+
+    Files are only readable by the Python version that wrote them, and an
+    unreadable file is treated as a cache miss, so a Python upgrade just
+    refills the cache.
+    """
+
+    name = 'marshal'
+    extension = '.marshal'
+
+    def dumps(self, data, sort_keys=False):
+        return marshal.dumps(data)
+
+    def loads(self, contents):
+        return marshal.loads(contents)
+
+
+CODECS = {
+    'json': StdlibJSONCodec,
+    'orjson': OrjsonCodec,
+    'msgpack': MsgpackCodec,
+    'marshal': MarshalCodec
+}
+
+# Codecs needing a library that is not installed
+UNAVAILABLE = {name for name, module in (('orjson', orjson), ('msgpack', msgpack)) if module is None}
+
+# Defaults, overridable through the environment: MLB_JSON_CODEC picks the JSON
+# library, MLB_CACHE_FORMAT picks 'json' or a binary format for cache files
+DEFAULT_JSON_CODEC = os.environ.get('MLB_JSON_CODEC', 'json' if orjson is None else 'orjson')
+DEFAULT_CACHE_FORMAT = os.environ.get('MLB_CACHE_FORMAT', 'json')
+
+
+def get_codec(name):
+    """
+    Get a codec by name, falling back to the stdlib if it is unavailable
+
+    Args:
+        name: Codec name ('json', 'orjson', 'msgpack' or 'marshal')
+
+    Returns:
+        Codec instance
+    """
+    if name not in CODECS or name in UNAVAILABLE:
+        logger.warning(f"Codec {name} is not available, using json")
+        name = 'json'
+
+    return CODECS[name]()
+
+
+def get_json_codec():
+    """
+    Get the codec used for JSON responses and JSON files
+
+    Returns:
+        StdlibJSONCodec or OrjsonCodec
+    """
+    codec = get_codec(DEFAULT_JSON_CODEC)
+    return codec if codec.extension == '.json' else get_codec('json')
+
+
+def get_cache_codec():
+    """
+    Get the codec used for cache files
+
+    Returns:
+        JSON codec, or a binary codec if MLB_CACHE_FORMAT selects one
+    """
+    if DEFAULT_CACHE_FORMAT == 'json':
+        return get_json_codec()
+    return get_codec(DEFAULT_CACHE_FORMAT)
+
+
+def dumps(data, sort_keys=False):
+    """
+    Serialize data to compact JSON bytes with the configured JSON codec
+
+    Args:
+        data: JSON-serializable data
+        sort_keys: Sort object keys
+
+    Returns:
+        JSON bytes
+    """
+    return _json_codec.dumps(data, sort_keys)
+
+
+def loads(contents):
+    """
+    Parse JSON with the configured JSON codec
+
+    Args:
+        contents: JSON bytes or string
+
+    Returns:
+        Decoded data
+    """
+    return _json_codec.loads(contents)
+
+
+def load_file(path):
+    """
+    Read a JSON file with the configured JSON codec
+
+    Args:
+        path: File path
+
+    Returns:
+        Decoded data
+    """
+    with open(path, 'rb') as f:
+        return _json_codec.loads(f.read())
+
+
+def dump_file(path, data):
+    """
+    Write a JSON file with the configured JSON codec
+
+    Args:
+        path: File path
+        data: JSON-serializable data
+    """
+    with open(path, 'wb') as f:
+        f.write(_json_codec.dumps(data))
+
+
+def benchmark(paths, repeat=20):
+    """
+    Time every available codec loading and dumping files
+
+    Args:
+        paths: JSON files to benchmark
+        repeat: Loads and dumps per file and codec
+
+    Returns:
+        Dictionary mapping codec name to total bytes and milliseconds per
+        load and dump of all the files
+    """
+    documents = [load_file(path) for path in paths]
+    results = {}
+
+    for name in CODECS:
+        if name in UNAVAILABLE:
+            continue
+
+        codec = get_codec(name)
+        encoded = [codec.dumps(document) for document in documents]
+
+        start_time = time.perf_counter()
+        for _ in range(repeat):
+            for document in documents:
+                codec.dumps(document)
+        dump_ms = (time.perf_counter() - start_time) * 1000 / repeat
+
+        start_time = time.perf_counter()
+        for _ in range(repeat):
+            for contents in encoded:
+                codec.loads(contents)
+        load_ms = (time.perf_counter() - start_time) * 1000 / repeat
+
+        results[name] = {
+            'bytes': sum(len(contents) for contents in encoded),
+            'dump_ms': round(dump_ms, 3),
+            'load_ms': round(load_ms, 3)
+        }
+
+    return results
+
+
+_json_codec = get_json_codec()
+
+
+if __name__ == "__main__":
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    paths = sorted(
+        glob.glob(os.path.join(base_dir, 'cache', '*', '*.json')) +
+        glob.glob(os.path.join(base_dir, '*.json'))
+    )
+    paths = [path for path in paths if os.path.getsize(path) > 0]
+
+    print(f"Benchmarking {len(paths)} files, {sum(os.path.getsize(path) for path in paths)} bytes")
+    print(f"{'codec':<10}{'bytes':>12}{'dump ms':>12}{'load ms':>12}")
+    for name, result in benchmark(paths).items():
+        print(f"{name:<10}{result['bytes']:>12}{result['dump_ms']:>12}{result['load_ms']:>12}")
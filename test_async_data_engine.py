@@ -0,0 +1,156 @@
+import asyncio
+import threading
+import time
+import pytest
+import http_session
+from async_data_engine import AsyncSlateEngine, LocalTransport, TransportResponse
+from mlb_stats_api import MLBStatsAPI
+from conftest import MATCHUPS, ROUTES, TEAMS
+
+pytestmark = pytest.mark.usefixtures('empty_team_index')
+
+
+def sync_get(url, **kwargs):
+    for fragment, handler in ROUTES:
+        if fragment in url:
+            return TransportResponse(200, handler(url) if callable(handler) else handler)
+    return TransportResponse(404, {})
+
+
+def test_engine_matches_sync_games(tmp_path, monkeypatch):
+    transport = http_session.HTTPTransport()
+    monkeypatch.setattr(transport.session, 'get', sync_get)
+    monkeypatch.setattr(http_session, '_transport', transport)
+    sync_games = MLBStatsAPI(cache_dir=str(tmp_path / 'sync')).get_games_for_date('2025-04-16', force_refresh=True)
+
+    engine = AsyncSlateEngine(MLBStatsAPI(cache_dir=str(tmp_path / 'async')), LocalTransport(ROUTES))
+    slate = engine.build_slate('2025-04-16', force_refresh=True)
+
+    assert slate['games'] == sync_games
+    assert set(slate['team_stats']) == {team for matchup in MATCHUPS for team in matchup}
+
+
+def test_engine_fans_out_requests(tmp_path):
+    transport = LocalTransport(ROUTES, delay=0.02)
+    engine = AsyncSlateEngine(MLBStatsAPI(cache_dir=str(tmp_path)), transport)
+
+    engine.build_slate('2025-04-16', force_refresh=True)
+
+    # Schedule, one bulk pitcher stats call, the team directory and one bulk team stats call
+    assert len(transport.requests) == 1 + 1 + 1 + 1
+    assert sum('/teams?sportId=1' in url for url in transport.requests) == 1
+    assert transport.max_in_flight >= 2
+
+
+def test_engine_team_lookups_without_bulk(tmp_path):
+    transport = LocalTransport(ROUTES, delay=0.02)
+    engine = AsyncSlateEngine(MLBStatsAPI(cache_dir=str(tmp_path), bulk_team_stats=False), transport)
+
+    slate = engine.build_slate('2025-04-16', force_refresh=True)
+
+    # One shared team list request and 6 per-team stats calls
+    assert sum(url.endswith('/teams') for url in transport.requests) == 1
+    assert sum('/stats?stats=season' in url for url in transport.requests) == 6
+    assert transport.max_in_flight >= 6
+    assert slate['team_stats']['New York Yankees']['bullpen_era'] == 3.5
+
+
+def test_engine_name_lookup_without_bulk(tmp_path):
+    transport = LocalTransport(ROUTES)
+    engine = AsyncSlateEngine(MLBStatsAPI(cache_dir=str(tmp_path), bulk_pitcher_stats=False), transport)
+
+    slate = engine.build_slate('2025-04-16', force_refresh=True)
+
+    assert sum('/players?search=' in url for url in transport.requests) == 6
+    assert slate['games'][0]['home_era_source'] == 'MLB Stats API'
+
+
+def test_engine_falls_back_to_sample_games(tmp_path):
+    engine = AsyncSlateEngine(MLBStatsAPI(cache_dir=str(tmp_path)), LocalTransport([('/schedule', (500, {}))]))
+
+    slate = engine.build_slate('2025-04-16', force_refresh=True)
+
+    assert [game['game_id'] for game in slate['games']][:2] == [718001, 718002]
+    assert all(stats['team_era'] == 4.0 for stats in slate['team_stats'].values())
+
+
+def test_prediction_api_uses_engine(api):
+    predictions = api.get_all_predictions(force_refresh=True, target_date='2025-04-16')
+
+    assert predictions['metadata']['game_count'] == 3
+    assert {p['game_id'] for p in predictions['under_1_run_first_inning']} == {2000, 2001, 2002}
+
+
+def test_team_stats_served_from_index(tmp_path, monkeypatch):
+    requests_made = []
+
+    def counting_get(url, **kwargs):
+        requests_made.append(url)
+        return sync_get(url, **kwargs)
+
+    transport = http_session.HTTPTransport()
+    monkeypatch.setattr(transport.session, 'get', counting_get)
+    monkeypatch.setattr(http_session, '_transport', transport)
+    api = MLBStatsAPI(cache_dir=str(tmp_path))
+
+    stats = {team: api.get_team_stats(team) for matchup in MATCHUPS for team in matchup}
+
+    assert len(requests_made) == 2
+    assert stats['Boston Red Sox']['team_abbr'] == 'BOS'
+    assert stats['Boston Red Sox']['team_era'] == '4.00'
+    assert stats['Boston Red Sox']['bullpen_era'] == 4.5
+
+    # A second instance in the same process reuses the index
+    other = MLBStatsAPI(cache_dir=str(tmp_path / 'other'))
+    assert other.get_team_stats('Chicago Cubs')['team_era'] == '7.00'
+    assert len(requests_made) == 2
+
+
+def test_engine_waits_for_team_index_lock(tmp_path):
+    transport = LocalTransport(ROUTES)
+    engine = AsyncSlateEngine(MLBStatsAPI(cache_dir=str(tmp_path)), transport)
+    thread = threading.Thread(target=engine.build_slate, args=('2025-04-16',), kwargs={'force_refresh': True})
+
+    with MLBStatsAPI.team_index_lock:
+        thread.start()
+        time.sleep(0.2)
+        assert not any('/teams/stats?' in url for url in transport.requests)
+
+        # Another loader fills the index while the engine waits
+        MLBStatsAPI.team_directory = {team['abbreviation']: team['id'] for team in TEAMS['teams']}
+        MLBStatsAPI.team_stats_index = {team['id']: {'era': '3.50'} for team in TEAMS['teams']}
+        MLBStatsAPI.team_stats_index_time = time.time()
+
+    thread.join(10)
+
+    assert not any('/teams' in url for url in transport.requests)
+    assert not MLBStatsAPI.team_index_lock.locked()
+
+
+class SlowPitcherTransport(LocalTransport):
+    """LocalTransport that answers the lookups for one pitcher late"""
+
+    async def get(self, url, **kwargs):
+        if 'Away Pitcher 2' in url:
+            await asyncio.sleep(0.3)
+        return await super().get(url, **kwargs)
+
+
+def test_stream_yields_games_as_they_resolve(tmp_path):
+    api = MLBStatsAPI(cache_dir=str(tmp_path))
+    api.bulk_pitcher_stats = False
+    engine = AsyncSlateEngine(api, SlowPitcherTransport(ROUTES))
+
+    streamed = list(engine.iter_slate('2025-04-16', force_refresh=True))
+
+    # The game waiting on the slow lookup comes last, the others don't wait for it
+    assert [index for index, game, team_stats in streamed][-1] == 2
+    assert sorted(index for index, game, team_stats in streamed) == [0, 1, 2]
+    assert all(set(team_stats) == {game['home_team'], game['away_team']} for index, game, team_stats in streamed)
+
+    # The full slate is cached in schedule order, the same as a regular build
+    cached = api.get_cached_data('games_2025-04-16')
+    assert cached == [game for index, game, team_stats in sorted(streamed, key=lambda item: item[0])]
+    built_api = MLBStatsAPI(cache_dir=str(tmp_path / 'built'))
+    built_api.bulk_pitcher_stats = False
+    assert cached == AsyncSlateEngine(built_api, LocalTransport(ROUTES)).build_slate('2025-04-16', force_refresh=True)['games']
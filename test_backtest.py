@@ -0,0 +1,98 @@
+import json
+import pytest
+from backtest import Backtester, get_outcomes, load_slate
+from mlb_prediction_api import MLBPredictionAPI
+
+
+def linescore(*innings):
+    return {'innings': [{'num': i + 1, 'away': {'runs': away}, 'home': {'runs': home}} for i, (away, home) in enumerate(innings)]}
+
+
+GAMES = {
+    '2025-04-16': [
+        {'game_id': 1, 'home_era': '1.50', 'away_era': '2.00'},
+        {'game_id': 2, 'home_era': '5.80', 'away_era': 'N/A'}
+    ],
+    '2025-04-17': [
+        {'game_id': 3, 'home_era': 3.2, 'away_era': 6.1},
+        {'game_id': 4, 'home_era': None, 'away_era': '4.40'}
+    ]
+}
+
+LINESCORES = {
+    '2025-04-16': {'1': linescore((0, 0), (1, 0), (0, 0)), '2': linescore((2, 1), (0, 1), (0, 0))},
+    '2025-04-17': {'3': linescore((0, 0), (0, 3), (1, 0)), '4': linescore((0, 0))}
+}
+
+
+@pytest.fixture
+def fixtures(tmp_path):
+    slates = tmp_path / 'slates'
+    linescores = tmp_path / 'linescores'
+    slates.mkdir()
+    linescores.mkdir()
+
+    for date_str, games in GAMES.items():
+        (slates / f'games_{date_str}.json').write_text(json.dumps(games))
+        (linescores / f'linescores_{date_str}.json').write_text(json.dumps(LINESCORES[date_str]))
+
+    return str(slates), str(linescores)
+
+
+def test_outcomes_from_linescore():
+    assert get_outcomes(linescore((0, 0), (1, 0), (0, 0))) == {
+        'under_1_run_first_inning': True,
+        'over_2.5_runs_first_3_innings': False,
+        'over_3.5_runs_first_3_innings': False
+    }
+    assert get_outcomes(linescore((2, 1), (0, 1))) == {'under_1_run_first_inning': False}
+
+
+def test_backtest_replays_prediction_model(fixtures, tmp_path):
+    slates, linescores = fixtures
+    api = MLBPredictionAPI(cache_dir=str(tmp_path / 'predictions'))
+
+    report = Backtester(linescores, slate_dirs=[slates], snapshot_files=[], workers=1).run('2025-04-15', '2025-04-17')
+
+    assert (report['dates'], report['slates'], report['games']) == (3, 2, 4)
+
+    expected_brier = 0
+    for date_str, games in GAMES.items():
+        for game in games:
+            probability = api.calculate_first_inning_no_run_probability(game['home_era'], game['away_era'], 'Home', 'Away')
+            hit = get_outcomes(LINESCORES[date_str][str(game['game_id'])])['under_1_run_first_inning']
+            expected_brier += (probability / 100 - hit) ** 2
+
+    market = report['markets']['under_1_run_first_inning']
+    assert market['games'] == 4
+    assert market['hit_rate'] == 0.75
+    assert market['brier_score'] == round(expected_brier / 4, 4)
+    assert sum(bucket['games'] for bucket in market['calibration']) == 4
+    assert sum(rating['games'] for rating in market['ratings'].values()) == 4
+
+    # Game 4 was stopped after one inning, so only the first-inning market settles
+    assert report['markets']['over_2.5_runs_first_3_innings']['games'] == 3
+
+
+def test_backtest_workers_match_single_process(fixtures):
+    slates, linescores = fixtures
+
+    single = Backtester(linescores, slate_dirs=[slates], snapshot_files=[], workers=1).run('2025-04-16', '2025-04-17')
+    parallel = Backtester(linescores, slate_dirs=[slates], snapshot_files=[], workers=2, chunk_days=1).run('2025-04-16', '2025-04-17')
+
+    single.pop('seconds')
+    parallel.pop('seconds')
+    assert parallel == single
+
+
+def test_recorded_slate_formats(tmp_path):
+    nested = [{'id': '9', 'venue': 'Park', 'home_team': {'probable_pitcher': {'stats': {'era': 3.1, 'whip': 1.2}}}, 'away_team': {}}]
+    (tmp_path / 'games_2025-04-18.json').write_text(json.dumps(nested))
+    (tmp_path / 'all_predictions_2025-04-19.json').write_text(json.dumps({'games': [{'game_id': 7, 'home_pitcher_era': 2.5, 'away_pitcher_era': 'N/A'}]}))
+    snapshot = tmp_path / 'snapshot.json'
+    snapshot.write_text(json.dumps({'prediction_data': {'games': [{'game_id': 5, 'game_date': '2025-04-20', 'home_pitcher_era': 4.0, 'away_pitcher_era': 3.0}]}}))
+
+    assert load_slate('2025-04-18', [str(tmp_path)])[0]['home_whip'] == 1.2
+    assert load_slate('2025-04-19', [str(tmp_path)]) == [{'game_id': '7', 'venue': None, 'home_era': 2.5, 'away_era': 'N/A'}]
+    assert load_slate('2025-04-20', [str(tmp_path)], [str(snapshot)])[0]['game_id'] == '5'
+    assert load_slate('2025-04-21', [str(tmp_path)], [str(snapshot)]) == []
@@ -0,0 +1,150 @@
+import json
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from mlb_stats_api import CACHE_TTLS, MLBStatsAPI
+
+TODAY = datetime.now().strftime('%Y-%m-%d')
+YESTERDAY = (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')
+TOMORROW = (datetime.now() + timedelta(days=1)).strftime('%Y-%m-%d')
+
+
+def age_file(cache, cache_key, seconds):
+    cache.memory.pop(cache_key, None)
+    stale = time.time() - seconds
+    os.utime(cache.get_cache_file(cache_key), (stale, stale))
+
+
+def test_ttl_depends_on_volatility(tmp_path):
+    stats_api = MLBStatsAPI(cache_dir=str(tmp_path))
+
+    assert stats_api.get_cache_ttl(f"games_{TODAY}") == CACHE_TTLS['today']
+    assert stats_api.get_cache_ttl(f"all_predictions_{TOMORROW}") == CACHE_TTLS['upcoming']
+    assert stats_api.get_cache_ttl(f"games_{YESTERDAY}", [{'status': 'Final'}]) == CACHE_TTLS['final']
+    assert stats_api.get_cache_ttl(f"games_{YESTERDAY}", [{'status': 'Preview'}]) == CACHE_TTLS['past']
+    assert stats_api.get_cache_ttl(f"all_predictions_{YESTERDAY}", {'metadata': {'final': True}}) == CACHE_TTLS['final']
+    assert stats_api.get_cache_ttl('team_stats_Boston Red Sox') == CACHE_TTLS['season']
+    assert stats_api.get_cache_ttl('team_stats_Boston Red Sox', {'team_era': 4.0, 'source': 'fallback'}) == CACHE_TTLS['negative']
+
+
+def test_final_games_outlive_todays(tmp_path):
+    stats_api = MLBStatsAPI(cache_dir=str(tmp_path))
+    stats_api.save_to_cache(f"games_{YESTERDAY}", [{'status': 'Final'}])
+    stats_api.save_to_cache(f"games_{TODAY}", [{'status': 'Preview'}])
+
+    age_file(stats_api.cache, f"games_{YESTERDAY}", 3600)
+    age_file(stats_api.cache, f"games_{TODAY}", 3600)
+
+    assert stats_api.get_cached_data(f"games_{YESTERDAY}") == [{'status': 'Final'}]
+    assert stats_api.get_cached_data(f"games_{TODAY}") is None
+
+
+def test_periodic_check_keeps_cache(api):
+    api.save_to_cache(f"all_predictions_{YESTERDAY}", {'metadata': {'final': True}})
+    api.mlb_stats_api.save_to_cache('pitcher_era_New York Yankees_Home Pitcher 0', {'era': '3.00'})
+
+    assert api.refresh_data_if_needed() is False
+
+    assert api.get_cached_data(f"all_predictions_{YESTERDAY}") == {'metadata': {'final': True}}
+    assert api.mlb_stats_api.get_cached_data('pitcher_era_New York Yankees_Home Pitcher 0') == {'era': '3.00'}
+
+
+def test_fallback_team_stats_expire_on_negative_ttl(api, monkeypatch):
+    stats_api = api.mlb_stats_api
+
+    def unavailable(url, **kwargs):
+        raise ConnectionError(url)
+
+    monkeypatch.setattr(stats_api, 'http_get', unavailable)
+
+    team_stats = stats_api.get_team_stats('Boston Red Sox')
+
+    assert team_stats['source'] == 'fallback'
+    assert stats_api.get_cached_data('team_stats_Boston Red Sox') == team_stats
+    age_file(stats_api.cache, 'team_stats_Boston Red Sox', CACHE_TTLS['negative'] + 1)
+    assert stats_api.get_cached_data('team_stats_Boston Red Sox') is None
+
+
+def test_forced_refresh_keeps_past_dates(api):
+    api.save_to_cache(f"all_predictions_{YESTERDAY}", {'metadata': {'final': True}})
+    api.save_to_cache(f"all_predictions_{TODAY}", {'metadata': {}})
+    api.mlb_stats_api.save_to_cache('team_stats_Boston Red Sox', {'team_era': '4.00'})
+
+    api.refresh_data_if_needed(True)
+
+    assert sorted(os.listdir(api.cache_dir)) == [f"all_predictions_{YESTERDAY}.json"]
+    assert api.mlb_stats_api.get_cached_data('team_stats_Boston Red Sox') is None
+
+
+def test_forced_refresh_reloads_team_stats_index(api, monkeypatch):
+    monkeypatch.setattr(MLBStatsAPI, 'team_stats_index', {111: {'era': '4.00'}})
+    monkeypatch.setattr(MLBStatsAPI, 'team_stats_index_time', time.time())
+    assert not api.mlb_stats_api.team_index_expired()
+
+    api.refresh_data_if_needed(True)
+
+    assert api.mlb_stats_api.team_index_expired()
+
+
+def test_background_refresh_serves_previous_value(api):
+    predictions = api.get_all_predictions(target_date=TODAY)
+    cache_key = f"all_predictions_{TODAY}"
+    age_file(api.cache, cache_key, CACHE_TTLS['today'] * 0.9)
+    age_file(api.mlb_stats_api.cache, f"games_{TODAY}", CACHE_TTLS['today'] * 0.9)
+    api.last_refresh_check = 0
+
+    # Still fresh, so the previous predictions are served while a rebuild starts
+    served = api.get_all_predictions(target_date=TODAY)
+    api.refresh_thread.join(10)
+
+    assert served['metadata']['timestamp'] == predictions['metadata']['timestamp']
+    refreshed = json.loads(open(api.cache.get_cache_file(cache_key)).read())
+    assert refreshed['metadata']['timestamp'] > predictions['metadata']['timestamp']
+    assert api.cache.get_age(cache_key) < 5
+    assert api.mlb_stats_api.cache.get_age(f"games_{TODAY}") < 5
+    assert api.last_refresh_time > 0
+
+
+def test_expired_predictions_served_while_revalidating(api, monkeypatch):
+    predictions = api.get_all_predictions(target_date=TODAY)
+    cache_key = f"all_predictions_{TODAY}"
+    age_file(api.cache, cache_key, CACHE_TTLS['today'] * 2)
+
+    release = threading.Event()
+    builds = []
+    build_predictions = api.build_predictions
+
+    def slow_build(target_date, force_refresh=False):
+        builds.append(target_date)
+        release.wait(10)
+        return build_predictions(target_date, force_refresh)
+
+    monkeypatch.setattr(api, 'build_predictions', slow_build)
+
+    # Both requests get the expired predictions at once, and share one rebuild
+    first = api.get_all_predictions(target_date=TODAY)
+    second = api.get_all_predictions(target_date=TODAY)
+    thread = api.revalidation_threads[TODAY]
+    release.set()
+    thread.join(10)
+
+    assert first['metadata']['stale'] is True
+    assert second['metadata']['stale'] is True
+    assert first['metadata']['timestamp'] == predictions['metadata']['timestamp']
+    assert first['under_1_run_first_inning'] == predictions['under_1_run_first_inning']
+    assert builds == [TODAY]
+
+    fresh = api.get_all_predictions(target_date=TODAY)
+    assert fresh['metadata']['stale'] is False
+    assert fresh['metadata']['age_seconds'] < 5
+    assert fresh['metadata']['timestamp'] > predictions['metadata']['timestamp']
+
+
+def test_freshness_does_not_change_cached_predictions(api):
+    api.get_all_predictions(target_date=TODAY)
+
+    cached = api.cache.get(f"all_predictions_{TODAY}")
+
+    assert 'stale' not in cached['metadata']
+    assert 'age_seconds' not in cached['metadata']
@@ -0,0 +1,138 @@
+import time
+import pytest
+import data_sources
+from data_sources import DataSource, DataSourceRouter, SourceError, checked_era, espn_schedule_games
+
+
+def failing(entity, **params):
+    raise SourceError('down')
+
+
+def answering(era):
+    def fetch(entity, team_name=None, pitcher_name=None):
+        return {'era': era, 'source': 'test'}
+    return fetch
+
+
+def test_cheapest_source_answers_first():
+    router = DataSourceRouter()
+    router.register(DataSource('expensive', ('pitcher_season',), answering(2.10), cost=5))
+    router.register(DataSource('cheap', ('pitcher_season',), answering(3.40), cost=1))
+    router.register(DataSource('weather-only', ('weather',), answering(9.99), cost=0))
+
+    assert router.fetch('pitcher_season', team_name='Boston Red Sox', pitcher_name='Pitcher') == ({'era': 3.40, 'source': 'test'}, 'cheap')
+    assert router.fetch('pitcher_season', ('expensive',), team_name='Boston Red Sox', pitcher_name='Pitcher')[1] == 'expensive'
+    assert router.get_stats()['expensive']['calls'] == 1
+
+
+def test_misses_and_failures_fall_through():
+    router = DataSourceRouter()
+    router.register(DataSource('missing', ('pitcher_season',), lambda entity, **params: None, cost=1))
+    router.register(DataSource('broken', ('pitcher_season',), lambda entity, **params: 1 / 0, cost=2))
+    router.register(DataSource('good', ('pitcher_season',), answering(4.05), cost=3))
+
+    assert router.fetch('pitcher_season', team_name='Boston Red Sox', pitcher_name='Pitcher')[1] == 'good'
+
+    stats = router.get_stats()
+    assert (stats['missing']['misses'], stats['missing']['error_rate']) == (1, 0.0)
+    assert (stats['broken']['errors'], stats['broken']['error_rate']) == (1, 1.0)
+    assert stats['good']['p95_ms'] is not None
+
+
+def test_failing_source_is_circuit_broken(monkeypatch):
+    calls = []
+
+    def flaky(entity, **params):
+        calls.append(params)
+        raise SourceError('timeout')
+
+    router = DataSourceRouter()
+    router.register(DataSource('dead', ('schedule',), flaky, cost=1, min_calls=3, cooldown=60))
+    router.register(DataSource('backup', ('schedule',), lambda entity, date_str=None: [{'game_id': 1}], cost=2))
+
+    for _ in range(5):
+        assert router.fetch('schedule', date_str='2025-04-16')[1] == 'backup'
+
+    # Open after three failures, then skipped without being called
+    assert len(calls) == 3
+    assert router.get_stats()['dead']['state'] == 'open'
+    assert router.get_stats()['dead']['skipped'] == 2
+
+    # Tried again once the cooldown has passed
+    monkeypatch.setattr(time, 'time', lambda real=time.time: real() + 61)
+    router.fetch('schedule', date_str='2025-04-16')
+    assert len(calls) == 4
+
+
+def test_sources_ordered_by_measured_latency_within_a_cost():
+    router = DataSourceRouter()
+    slow = router.register(DataSource('slow', ('weather',), lambda entity, city=None: time.sleep(0.05) or {}, latency=0.01))
+    fast = router.register(DataSource('fast', ('weather',), lambda entity, city=None: {}, latency=0.02))
+
+    assert router.get_sources('weather') == [slow, fast]
+    slow.fetch('weather', city='Boston')
+    assert router.get_sources('weather') == [fast, slow]
+
+
+def test_unknown_entities_rejected():
+    with pytest.raises(ValueError):
+        DataSourceRouter().register(DataSource('odd', ('box_score',), failing))
+
+
+def test_era_contract():
+    assert checked_era({'era': 3.1, 'source': 'espn'}) == {'era': 3.1, 'source': 'espn'}
+    assert checked_era({'era': 'N/A', 'source': 'not-found'}) is None
+    assert checked_era({'era': 2.5, 'source': 'MLB Stats API (Fallback)'}) is None
+    with pytest.raises(SourceError):
+        checked_era({'era': 4.50, 'source': 'default'})
+    assert checked_era({'era': 4.50, 'source': 'default', 'method': 'not-found'}) is None
+
+
+def test_espn_scoreboard_normalized():
+    scoreboard = {'events': [{
+        'id': '401', 'date': '2025-04-16T23:05Z', 'status': {'type': {'state': 'pre'}},
+        'competitions': [{
+            'venue': {'fullName': 'Fenway Park'},
+            'competitors': [
+                {'homeAway': 'home', 'team': {'displayName': 'Boston Red Sox'}, 'probables': [{'athlete': {'displayName': 'Home Pitcher'}}]},
+                {'homeAway': 'away', 'team': {'displayName': 'New York Yankees'}}
+            ]
+        }]
+    }]}
+
+    assert espn_schedule_games(scoreboard) == [{
+        'game_id': '401', 'status': 'Preview', 'home_team': 'Boston Red Sox', 'away_team': 'New York Yankees',
+        'venue': 'Fenway Park', 'game_time': '23:05', 'home_pitcher': 'Home Pitcher', 'away_pitcher': 'TBD'
+    }]
+
+
+def test_default_sources_registered():
+    router = DataSourceRouter()
+    data_sources.register_default_sources(router)
+
+    for entity in data_sources.ENTITIES:
+        assert router.get_sources(entity)
+    assert router.get_sources('pitcher_season')[0].name == 'mlb-stats-api'
+    assert router.get_sources('pitcher_season')[-1].name == 'hardcoded'
+
+
+def test_unknown_pitchers_leave_circuit_closed(monkeypatch):
+    from multi_source_stats_api import MLBStatsDirectAPI
+
+    roster = [{'person': {'id': 1, 'fullName': 'Known Pitcher'}}]
+    monkeypatch.setattr(MLBStatsDirectAPI, 'get_team_roster', lambda self, team_name: roster)
+
+    router = DataSourceRouter()
+    data_sources.register_default_sources(router)
+
+    for i in range(8):
+        assert router.fetch('pitcher_season', ('mlb-direct',), team_name='Boston Red Sox',
+                            pitcher_name=f'Called Up {i}') == (None, None)
+
+    stats = router.get_stats()['mlb-direct']
+    assert (stats['misses'], stats['errors'], stats['state']) == (8, 0, 'closed')
+
+    # A roster that could not be fetched is still a failure
+    roster.clear()
+    router.fetch('pitcher_season', ('mlb-direct',), team_name='Boston Red Sox', pitcher_name='Known Pitcher')
+    assert router.get_stats()['mlb-direct']['errors'] == 1
@@ -0,0 +1,83 @@
+import glob
+import os
+import pytest
+import espn_page_parser
+from espn_direct_scraper import ESPNDirectScraper
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+TEAM_PAGES = sorted(glob.glob(os.path.join(BASE_DIR, '*_team_page.html')))
+PARSERS = ['html.parser'] + (['lxml'] if espn_page_parser.lxml is not None else [])
+
+
+def read_page(name):
+    with open(os.path.join(BASE_DIR, name), encoding='utf-8') as f:
+        return f.read()
+
+
+class FakeResponse:
+    def __init__(self, text, status_code=200):
+        self.text = text
+        self.status_code = status_code
+
+
+def test_page_data_read_without_parsing():
+    for path in TEAM_PAGES:
+        with open(path, encoding='utf-8') as f:
+            data = espn_page_parser.extract_page_data(f.read())
+        assert 'clubhouse' in data
+
+    assert espn_page_parser.extract_page_data('<html><body>No data</body></html>') is None
+    assert espn_page_parser.extract_page_data("<script>window['__espnfitt__']={broken</script>") is None
+
+
+@pytest.mark.parametrize('parser', PARSERS)
+def test_strained_parse_keeps_the_tables(parser):
+    html = read_page('nyy_team_stats_page.html')
+
+    full = espn_page_parser.parse_html(html, parser=parser)
+    tables = espn_page_parser.parse_html(html, espn_page_parser.STATS_TABLES, parser=parser)
+
+    assert [str(table) for table in tables.select('table')] == [str(table) for table in full.select('table')]
+    assert tables.select('script') == []
+
+
+def test_stats_found_in_page_data():
+    data = espn_page_parser.extract_page_data(read_page('nyy_team_page.html'))
+
+    assert espn_page_parser.find_pitcher_era(data, 'Max Fried') == (1.88, 'https://www.espn.com/mlb/player/_/id/32685')
+    assert espn_page_parser.find_pitcher_era(data, 'Nobody Here') is None
+
+    player_info = {'stats': {'baseball': {'pitching': {'era': '3.45'}}}}
+    assert espn_page_parser.find_stat(player_info) == '3.45'
+    player_page = {'player': {'stats': [{'lbl': 'W-L', 'val': '3-1'}, {'lbl': 'ERA', 'val': '2.10'}]}}
+    assert espn_page_parser.find_stat(player_page) == '2.10'
+
+
+def test_roster_from_page_data():
+    data = {'roster': {'groups': [{'name': 'Pitchers', 'athletes': [
+        {'name': 'Max Fried', 'position': 'SP', 'href': 'https://www.espn.com/mlb/player/_/id/32685/max-fried'}
+    ]}]}}
+
+    assert espn_page_parser.roster_from_page_data(data) == [{
+        'name': 'Max Fried',
+        'position': 'SP',
+        'link': 'https://www.espn.com/mlb/player/_/id/32685/max-fried',
+        'id': '32685'
+    }]
+    assert espn_page_parser.roster_from_page_data({'clubhouse': {}}) is None
+
+
+def test_scraper_reads_team_page_data(monkeypatch):
+    scraper = ESPNDirectScraper()
+    monkeypatch.setattr('http_session.get', lambda url, **kwargs: FakeResponse(read_page('nyy_team_page.html')))
+
+    result = scraper.get_pitcher_era_from_team_page('New York Yankees', 'Max Fried')
+
+    assert result == {'era': 1.88, 'source': 'espn-team-page', 'url': 'https://www.espn.com/mlb/player/_/id/32685'}
+
+
+def test_benchmark_covers_every_method():
+    results = espn_page_parser.benchmark(TEAM_PAGES[:1], repeat=1)
+
+    assert set(results) >= {'full html.parser', 'tables html.parser', 'page data'}
+    assert results['page data'] < results['full html.parser']
@@ -0,0 +1,108 @@
+import os
+import sys
+import json
+import subprocess
+import pytest
+from mlb_prediction_api import MARKETS, MLBPredictionAPI
+
+
+def test_markets_match_scalar_path(api):
+    predictions = api.build_predictions('2025-04-16')
+
+    for game in predictions['games']:
+        args = (game['home_pitcher_era'], game['away_pitcher_era'], game['home_team'], game['away_team'])
+        markets = game['predictions']
+
+        assert markets['under_1_run_first_inning']['probability'] == api.calculate_first_inning_no_run_probability(*args)
+        assert markets['over_2_5_runs_first_three_innings']['probability'] == api.calculate_first_three_innings_run_probability(*args, 2.5)
+        assert markets['over_3_5_runs_first_three_innings']['probability'] == api.calculate_first_three_innings_run_probability(*args, 3.5)
+
+        home_team = {'name': game['home_team'], 'probable_pitcher': {'name': game['home_pitcher'], 'stats': {'era': game['home_pitcher_era']}}}
+        away_team = {'name': game['away_team'], 'probable_pitcher': {'name': game['away_pitcher'], 'stats': {'era': game['away_pitcher_era']}}}
+        factors = api.generate_factor_breakdown('under_1_run_first_inning', home_team, away_team, 0)
+        assert markets['under_1_run_first_inning']['factors'][0]['score'] == factors[0]['score']
+
+
+def test_slate_scored_in_one_pass(api, monkeypatch):
+    api.get_slate('2025-04-16')
+    calls = []
+    score = api.probability_engine.score
+
+    def counting_score(columns):
+        calls.append(columns)
+        return score(columns)
+
+    monkeypatch.setattr(api.probability_engine, 'score', counting_score)
+    monkeypatch.setattr(api, 'calculate_pitcher_performance_score', lambda *args: pytest.fail('scored per game'))
+    predictions = api.build_predictions('2025-04-16')
+
+    assert len(calls) == 1
+    assert list(calls[0].game_ids) == [game['game_id'] for game in predictions['games']]
+
+
+def test_team_blocks_shared_across_markets(api):
+    predictions = api.build_predictions('2025-04-16')
+    payload = json.dumps(predictions)
+
+    for game in predictions['games']:
+        assert payload.count(json.dumps(game['stats_comparison']['teams']['home'])) == 1
+
+    for market, game_key, run_threshold in MARKETS:
+        entries = predictions[market]
+        assert set(entries[0]) == {'game_id', 'probability', 'rating'}
+        assert [entry['probability'] for entry in entries] == sorted((entry['probability'] for entry in entries), reverse=True)
+
+
+def test_market_predictions_inline_game_details(api):
+    predictions = api.build_predictions('2025-04-16')
+
+    expanded = api.get_market_predictions(predictions, 'over_3.5_runs_first_3_innings')
+
+    assert [p['game_id'] for p in expanded] == [e['game_id'] for e in predictions['over_3.5_runs_first_3_innings']]
+    assert expanded[0]['home_team']['probable_pitcher']['stats']['era'] is not None
+    assert expanded[0]['home_team']['stats']['team_abbr']
+    assert len(expanded[0]['factors']) == 12
+
+
+def test_games_carry_their_date(api):
+    predictions = api.build_predictions('2025-04-16')
+
+    assert predictions['games']
+    assert {game['game_date'] for game in predictions['games']} == {'2025-04-16'}
+    streamed = [data for event, data in api.stream_predictions('2025-04-16', force_refresh=True) if event == 'game']
+    assert {game['game_date'] for game in streamed} == {'2025-04-16'}
+
+
+def test_game_features_are_immutable(api):
+    games, team_stats = api.get_slate('2025-04-16')
+    features = api.build_game_features(games[0], team_stats)
+
+    with pytest.raises(AttributeError):
+        features.pitcher_score = 0
+
+
+def test_factor_breakdowns_reproducible(api, tmp_path):
+    first = api.build_predictions('2025-04-16')
+
+    other = MLBPredictionAPI(cache_dir=str(tmp_path / 'other'))
+    other.mlb_stats_api = api.mlb_stats_api
+    other.slate_engine = api.slate_engine
+    second = other.build_predictions('2025-04-16')
+
+    assert json.dumps(first['games']) == json.dumps(second['games'])
+
+    # Each game gets its own scores, shared by its markets
+    bullpen_scores = [game['predictions']['under_1_run_first_inning']['factors'][1]['score'] for game in first['games']]
+    assert len(set(bullpen_scores)) == len(bullpen_scores)
+    assert first['games'][0]['predictions']['over_2_5_runs_first_three_innings']['factors'][1]['score'] == -bullpen_scores[0]
+
+
+def test_factor_scores_stable_across_processes():
+    script = 'from mlb_prediction_api import MLBPredictionAPI; print(MLBPredictionAPI.get_seeded_factor_scores("778297"))'
+    outputs = {
+        subprocess.run([sys.executable, '-c', script], env={**os.environ, 'PYTHONHASHSEED': seed},
+                       capture_output=True, text=True, check=True).stdout
+        for seed in ('1', '2')
+    }
+
+    assert outputs == {f"{MLBPredictionAPI.get_seeded_factor_scores('778297')}\n"}
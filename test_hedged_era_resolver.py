@@ -0,0 +1,65 @@
+import time
+from integrated_espn_data_api import ERASource, HedgedERAResolver, IntegratedESPNDataAPI
+
+
+def source(name, era, delay=0.0, budget=1.0):
+    def lookup(team_name, pitcher_name, force_refresh):
+        time.sleep(delay)
+        if isinstance(era, Exception):
+            raise era
+        return {'name': pitcher_name, 'team': team_name, 'era': era, 'source': name, 'method': 'test'}
+    return ERASource(name, lookup, budget)
+
+
+def test_fastest_trusted_answer_wins():
+    resolver = HedgedERAResolver([source('slow', 2.10, delay=0.5), source('fast', 3.40, delay=0.01)])
+
+    start_time = time.time()
+    era_data, name = resolver.resolve('Boston Red Sox', 'Pitcher')
+
+    assert (era_data['era'], name) == (3.40, 'fast')
+    assert time.time() - start_time < 0.3
+
+    stats = resolver.get_stats()
+    assert stats['fast']['wins'] == 1 and stats['fast']['win_rate'] == 1.0
+    assert stats['slow']['wins'] == 0 and stats['slow']['calls'] == 1
+
+
+def test_untrusted_and_failed_answers_fall_through():
+    resolver = HedgedERAResolver([source('missing', 'N/A'), source('broken', RuntimeError('down')),
+                                  source('good', 4.05, delay=0.05)])
+
+    era_data, name = resolver.resolve('Boston Red Sox', 'Pitcher')
+    stats = resolver.get_stats()
+
+    assert name == 'good'
+    assert stats['missing']['misses'] == 1
+    assert stats['broken']['errors'] == 1
+
+
+def test_sources_over_budget_are_ignored():
+    resolver = HedgedERAResolver([source('slow', 2.10, delay=0.5, budget=0.05), source('missing', 'N/A', budget=0.05)])
+
+    start_time = time.time()
+    assert resolver.resolve('Boston Red Sox', 'Pitcher') == (None, None)
+    assert time.time() - start_time < 0.3
+    assert resolver.get_stats()['slow']['timeouts'] == 1
+
+    # The ignored call still finishes and is counted in the latency
+    time.sleep(0.6)
+    assert resolver.get_stats()['slow']['avg_latency_ms'] >= 500
+
+
+def test_integrated_api_uses_first_answer(tmp_path, monkeypatch):
+    api = IntegratedESPNDataAPI(cache_dir=str(tmp_path))
+    monkeypatch.setattr(api.espn_scraper, 'get_pitcher_era', lambda team_name, pitcher_name: time.sleep(0.5) or
+                        {'era': 2.10, 'source': 'espn-direct', 'method': 'roster'})
+    monkeypatch.setattr(api.espn_api, 'get_pitcher_era', lambda team_name, pitcher_name, force_refresh=False:
+                        {'era': 3.40, 'source': 'espn-api', 'method': 'api'})
+
+    assert api.get_pitcher_era('Boston Red Sox', 'Pitcher')['source'] == 'espn-api'
+    assert api.get_source_stats()['espn-api']['wins'] == 1
+
+    # Cached afterwards, so the sources are not queried again
+    assert api.get_pitcher_era('Boston Red Sox', 'Pitcher')['era'] == 3.40
+    assert api.get_source_stats()['espn-api']['calls'] == 1
@@ -0,0 +1,183 @@
+import json
+import time
+import requests
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+import http_session
+
+
+class StatsHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    failures_left = 0
+
+    def do_GET(self):
+        if StatsHandler.failures_left > 0:
+            StatsHandler.failures_left -= 1
+            status, body = 503, b'{}'
+        else:
+            status, body = 200, json.dumps({'path': self.path}).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), StatsHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_connections_are_reused(server):
+    transport = http_session.HTTPTransport(pool_maxsize=2, max_retries=0)
+
+    for i in range(5):
+        response = transport.get(f"{server}/api/v1/people/{i}")
+        assert response.json() == {'path': f'/api/v1/people/{i}'}
+
+    stats = transport.get_stats()
+    assert stats['requests'] == 5
+    assert stats['connections_opened'] == 1
+    assert stats['handshakes_saved'] == 4
+    transport.close()
+
+
+def test_retries_with_backoff(server):
+    StatsHandler.failures_left = 2
+    transport = http_session.HTTPTransport(max_retries=2, backoff_factor=0)
+
+    response = transport.get(f"{server}/api/v1/schedule")
+
+    assert response.status_code == 200
+    assert StatsHandler.failures_left == 0
+    transport.close()
+
+
+def test_default_timeout_applied(monkeypatch):
+    transport = http_session.HTTPTransport(timeout=3.5)
+    seen = {}
+
+    def fake_get(url, **kwargs):
+        seen.update(kwargs)
+        return None
+
+    monkeypatch.setattr(transport.session, 'get', fake_get)
+    transport.get('https://statsapi.mlb.com/api/v1/teams')
+
+    assert seen['timeout'] == 3.5
+
+
+def test_circuit_opens_and_probes(server):
+    StatsHandler.failures_left = 2
+    transport = http_session.HTTPTransport(max_retries=0, breaker_failures=2, breaker_cooldown=0.2)
+
+    assert transport.get(f"{server}/api/v1/schedule").status_code == 503
+    assert transport.get(f"{server}/api/v1/schedule").status_code == 503
+
+    # Open: fails at once without reaching the server
+    StatsHandler.failures_left = 1
+    with pytest.raises(http_session.HostUnavailable):
+        transport.get(f"{server}/api/v1/schedule")
+    assert StatsHandler.failures_left == 1
+
+    # Half-open: a failed probe opens the circuit again
+    time.sleep(0.25)
+    assert transport.get(f"{server}/api/v1/schedule").status_code == 503
+    with pytest.raises(http_session.HostUnavailable):
+        transport.get(f"{server}/api/v1/schedule")
+
+    # A successful probe closes it
+    time.sleep(0.25)
+    assert transport.get(f"{server}/api/v1/schedule").status_code == 200
+    assert transport.get(f"{server}/api/v1/teams").status_code == 200
+
+    host = server.split('//')[1]
+    assert transport.get_stats()['hosts'][host]['rejected'] == 2
+    assert transport.get_stats()['hosts'][host]['circuit'] == 'closed'
+    transport.close()
+
+
+def test_unreachable_host_fails_fast():
+    transport = http_session.HTTPTransport(max_retries=0, breaker_failures=1, breaker_cooldown=60, timeout=0.5)
+
+    # Nothing listens on port 9 (discard) here
+    with pytest.raises(requests.exceptions.ConnectionError):
+        transport.get('http://127.0.0.1:9/api/v1/schedule')
+
+    start_time = time.time()
+    with pytest.raises(requests.exceptions.ConnectionError):
+        transport.get('http://127.0.0.1:9/api/v1/schedule')
+    assert time.time() - start_time < 0.05
+    transport.close()
+
+
+def test_rate_limit_shared_between_workers(tmp_path):
+    # Two limiters on the same directory stand in for two gunicorn workers
+    first = http_session.TokenBucketLimiter(rate=20, burst=2, reserve=0, state_dir=str(tmp_path), host_rates={})
+    second = http_session.TokenBucketLimiter(rate=20, burst=2, reserve=0, state_dir=str(tmp_path), host_rates={})
+
+    assert first.acquire('statsapi.mlb.com') == 0
+    assert second.acquire('statsapi.mlb.com') == 0
+    assert first.acquire('statsapi.mlb.com') > 0.02
+
+    stats = first.get_stats()['hosts']['statsapi.mlb.com']['live']
+    assert stats['requests'] == 2
+    assert stats['waited'] == 1
+    assert stats['max_wait_seconds'] > 0.02
+
+
+def test_live_requests_use_reserved_tokens(tmp_path):
+    limiter = http_session.TokenBucketLimiter(rate=1, burst=3, reserve=2, max_wait=0.1,
+                                              state_dir=str(tmp_path), host_rates={})
+
+    assert limiter.acquire('www.espn.com', 'background') == 0
+    with pytest.raises(http_session.RateLimited):
+        limiter.acquire('www.espn.com', 'background')
+
+    # The reserved tokens are still there for live requests
+    assert limiter.acquire('www.espn.com') == 0
+    assert limiter.acquire('www.espn.com') == 0
+    assert limiter.get_stats()['hosts']['www.espn.com']['background']['rejected'] == 1
+
+
+def test_background_priority_follows_context(server, tmp_path):
+    limiter = http_session.TokenBucketLimiter(rate=100, burst=5, reserve=1, state_dir=str(tmp_path), host_rates={})
+    transport = http_session.HTTPTransport(limiter=limiter)
+
+    transport.get(f"{server}/api/v1/schedule")
+    with http_session.background():
+        transport.get(f"{server}/api/v1/schedule")
+    assert http_session.get_priority() == 'live'
+
+    host = server.split('//')[1]
+    stats = transport.get_stats()['rate_limits']['hosts'][host]
+    assert stats['live']['requests'] == 1
+    assert stats['background']['requests'] == 1
+    transport.close()
+
+
+def test_open_circuit_skips_rate_limiter(tmp_path):
+    limiter = http_session.TokenBucketLimiter(rate=1, burst=1, reserve=0, state_dir=str(tmp_path), host_rates={})
+    transport = http_session.HTTPTransport(max_retries=0, breaker_failures=1, breaker_cooldown=60,
+                                           timeout=0.5, limiter=limiter)
+
+    # Nothing listens on port 9 (discard) here. The failure opens the
+    # circuit and takes the only token.
+    with pytest.raises(requests.exceptions.ConnectionError):
+        transport.get('http://127.0.0.1:9/api/v1/schedule')
+
+    start_time = time.time()
+    with pytest.raises(http_session.HostUnavailable):
+        transport.get('http://127.0.0.1:9/api/v1/schedule')
+    assert time.time() - start_time < 0.05
+    assert limiter.get_stats()['hosts']['127.0.0.1:9']['live']['requests'] == 1
+    transport.close()
@@ -0,0 +1,157 @@
+import threading
+import time
+import http_session
+from mlb_stats_api import MLBStatsAPI
+
+SCHEDULE = {
+    'dates': [{
+        'games': [
+            {
+                'gamePk': 1000 + i,
+                'status': {'abstractGameState': 'Preview'},
+                'gameDate': '2025-04-16T23:05:00Z',
+                'venue': {'name': f'Park {i}'},
+                'teams': {
+                    'home': {'team': {'name': home}, 'probablePitcher': {'id': 10 + i, 'fullName': f'Home Pitcher {i}'}},
+                    'away': {'team': {'name': away}, 'probablePitcher': {'id': 50 + i, 'fullName': f'Away Pitcher {i}'}}
+                }
+            }
+            for i, (home, away) in enumerate([
+                ('New York Yankees', 'Boston Red Sox'),
+                ('Los Angeles Dodgers', 'San Francisco Giants'),
+                ('Chicago Cubs', 'St. Louis Cardinals'),
+                ('Houston Astros', 'Seattle Mariners')
+            ])
+        ]
+    }]
+}
+
+
+class FakeResponse:
+    def __init__(self, data, status_code=200):
+        self.data = data
+        self.status_code = status_code
+
+    def json(self):
+        return self.data
+
+
+class FakeStatsAPI:
+    """Stand-in for statsapi.mlb.com that tracks in-flight requests"""
+
+    def __init__(self, delay=0.05):
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.calls = 0
+
+    def get(self, url, **kwargs):
+        with self.lock:
+            self.calls += 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            time.sleep(self.delay)
+            if '/schedule' in url:
+                return FakeResponse(SCHEDULE)
+            if '/people?personIds=' in url:
+                ids = url.split('personIds=')[1].split('&')[0].split(',')
+                people = [
+                    {'id': int(player_id), 'stats': [{'splits': [{'stat': {'era': f'{int(player_id) % 5}.10'}}]}]}
+                    for player_id in ids if int(player_id) != 11
+                ]
+                return FakeResponse({'people': people})
+            if '/players?search=' in url:
+                name = url.split('search=')[1]
+                player_id = sum(ord(c) for c in name)
+                return FakeResponse({'people': [{'id': player_id, 'primaryPosition': {'code': '1'}}]})
+            if '/people/' in url:
+                player_id = int(url.split('/people/')[1].split('/')[0])
+                return FakeResponse({'stats': [{'splits': [{'stat': {'era': f'{player_id % 7}.00'}}]}]})
+            return FakeResponse({}, 404)
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+
+
+def make_api(tmp_path, monkeypatch, pool_maxsize=6, **kwargs):
+    fake = FakeStatsAPI()
+    transport = http_session.HTTPTransport(pool_maxsize=pool_maxsize)
+    monkeypatch.setattr(transport.session, 'get', fake.get)
+    monkeypatch.setattr(http_session, '_transport', transport)
+    api = MLBStatsAPI(cache_dir=str(tmp_path), **kwargs)
+    return api, fake
+
+
+def test_parallel_matches_serial(tmp_path, monkeypatch):
+    serial_api, _ = make_api(tmp_path / 'serial', monkeypatch, parallel_lookups=False, bulk_pitcher_stats=False)
+    parallel_api, _ = make_api(tmp_path / 'parallel', monkeypatch, parallel_lookups=True, bulk_pitcher_stats=False)
+
+    serial_games = serial_api.get_games_for_date('2025-04-16', force_refresh=True)
+    parallel_games = parallel_api.get_games_for_date('2025-04-16', force_refresh=True)
+
+    assert parallel_games == serial_games
+    assert [game['game_id'] for game in parallel_games] == [1000, 1001, 1002, 1003]
+    assert parallel_games[0]['home_era_source'] == 'MLB Stats API'
+
+
+def test_parallel_lookups_respect_host_cap(tmp_path, monkeypatch):
+    api, fake = make_api(tmp_path, monkeypatch, pool_maxsize=3, max_workers=8, bulk_pitcher_stats=False)
+
+    api.get_games_for_date('2025-04-16', force_refresh=True)
+
+    assert fake.calls == 1 + 8 * 2
+    assert 1 < fake.max_in_flight <= 3
+
+
+def test_fetch_timings_recorded(tmp_path, monkeypatch):
+    api, _ = make_api(tmp_path, monkeypatch, bulk_pitcher_stats=False)
+
+    api.get_games_for_date('2025-04-16', force_refresh=True)
+    timings = api.get_fetch_timings('2025-04-16')
+
+    assert timings['mode'] == 'parallel'
+    assert timings['pitcher_lookups'] == 8
+    assert timings['total_seconds'] >= timings['schedule_seconds']
+
+
+def test_bulk_lookup_by_player_id(tmp_path, monkeypatch):
+    api, fake = make_api(tmp_path, monkeypatch)
+
+    games = api.get_games_for_date('2025-04-16', force_refresh=True)
+
+    # Schedule, one bulk call, then a name search and stats call for the
+    # one pitcher missing from the bulk response
+    assert fake.calls == 1 + 1 + 2
+    assert games[0]['home_era'] == '0.10'
+    assert games[0]['home_pitcher_id'] == 10
+    assert games[1]['home_era_source'] == 'MLB Stats API'
+    assert api.get_fetch_timings('2025-04-16')['mode'] == 'bulk+serial'
+
+    # Every pitcher is cached now
+    api.fetch_games_for_date('2025-04-16')
+    assert api.get_fetch_timings('2025-04-16')['mode'] == 'cached'
+
+
+def test_not_found_pitcher_cached_briefly(tmp_path, monkeypatch):
+    api, fake = make_api(tmp_path, monkeypatch)
+    search = fake.get
+
+    def get(url, **kwargs):
+        if 'search=Nobody' in url:
+            fake.calls += 1
+            return FakeResponse({'people': []})
+        return search(url, **kwargs)
+
+    monkeypatch.setattr(http_session.get_transport().session, 'get', get)
+
+    first = api.get_pitcher_era('New York Yankees', 'Nobody')
+    calls = fake.calls
+    second = api.get_pitcher_era('New York Yankees', 'Nobody')
+
+    assert first['source'] == 'not-found'
+    assert second == first
+    assert fake.calls == calls
+    assert api.get_cache_ttl('pitcher_era_New York Yankees_Nobody', first) < api.get_cache_ttl(
+        'pitcher_era_New York Yankees_Home Pitcher 0', {'era': '3.10', 'source': 'MLB Stats API'})
@@ -0,0 +1,219 @@
+import os
+import gzip
+import json
+import time
+import pytest
+from mlb_prediction_api import MLBPredictionAPI
+from mlb_stats_api import CACHE_TTLS
+
+os.environ.setdefault('MLB_PREFETCH_ENABLED', 'false')
+import app as app_module
+
+
+@pytest.fixture
+def client(api, monkeypatch):
+    monkeypatch.setattr(app_module, 'mlb_prediction_api', api)
+    return app_module.app.test_client()
+
+
+def test_predictions_have_validators(api, client):
+    response = client.get('/api/predictions?date=2025-04-16')
+    snapshot, stale = api.get_predictions_snapshot(target_date='2025-04-16')
+
+    assert response.status_code == 200
+    assert response.get_json() == api.with_freshness(snapshot, False, with_age=False)
+    assert response.get_json()['metadata']['stale'] is False
+    assert response.headers['ETag'] == f'W/"{api.get_etag(snapshot)}"'
+    assert response.headers['Last-Modified']
+    assert 'public' in response.headers['Cache-Control']
+    assert response.headers['Vary'] == 'Accept-Encoding'
+    assert response.headers['X-Predictions-Stale'] == 'false'
+
+
+def test_gzip_body_stored_next_to_snapshot(api, client):
+    plain = client.get('/api/predictions?date=2025-04-16')
+    compressed = client.get('/api/predictions?date=2025-04-16', headers={'Accept-Encoding': 'gzip, br'})
+
+    assert compressed.headers['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(compressed.data) == plain.data
+    assert len(compressed.data) < len(plain.data) / 4
+
+    blobs = [file for file in os.listdir(api.cache_dir) if file.endswith('.gz')]
+    assert blobs == [f"all_predictions_2025-04-16.all.{api.get_etag(api.get_predictions_snapshot(target_date='2025-04-16')[0])}.gz"]
+
+
+def test_conditional_requests_return_304(api, client):
+    first = client.get('/api/predictions?date=2025-04-16')
+
+    by_etag = client.get('/api/predictions?date=2025-04-16', headers={'If-None-Match': first.headers['ETag']})
+    by_date = client.get('/api/predictions?date=2025-04-16', headers={'If-Modified-Since': first.headers['Last-Modified']})
+
+    assert by_etag.status_code == 304
+    assert by_etag.data == b''
+    assert by_etag.headers['ETag'] == first.headers['ETag']
+    assert by_date.status_code == 304
+
+
+def test_rebuild_changes_etag_and_replaces_body(api, client):
+    first = client.get('/api/predictions?date=2025-04-16', headers={'Accept-Encoding': 'gzip'})
+    rebuilt = client.get('/api/predictions?date=2025-04-16&refresh=true', headers={
+        'Accept-Encoding': 'gzip', 'If-None-Match': first.headers['ETag']
+    })
+
+    assert rebuilt.status_code == 200
+    assert rebuilt.headers['ETag'] != first.headers['ETag']
+    assert len([file for file in os.listdir(api.cache_dir) if file.endswith('.gz')]) == 1
+
+
+def test_market_endpoint_uses_own_validator(api, client):
+    all_markets = client.get('/api/predictions?date=2025-04-16')
+    response = client.get('/api/predictions/over_3.5_runs_first_3?date=2025-04-16', headers={'Accept-Encoding': 'gzip'})
+    snapshot, stale = api.get_predictions_snapshot(target_date='2025-04-16')
+
+    assert response.headers['ETag'] != all_markets.headers['ETag']
+    assert json.loads(gzip.decompress(response.data)) == {
+        'predictions': api.get_market_predictions(snapshot, 'over_3.5_runs_first_3_innings'),
+        'metadata': dict(snapshot['metadata'], stale=False, age_seconds=None)
+    }
+
+
+def test_hot_reads_skip_serialization(api, client, monkeypatch):
+    serialized = []
+    serialize = api.serialize_response
+
+    def counting_serialize(predictions, market=None, stale=False):
+        serialized.append(market)
+        return serialize(predictions, market, stale=stale)
+
+    monkeypatch.setattr(api, 'serialize_response', counting_serialize)
+
+    for _ in range(3):
+        client.get('/api/predictions?date=2025-04-16')
+        client.get('/api/predictions?date=2025-04-16', headers={'Accept-Encoding': 'gzip'})
+        client.get('/api/predictions/under_1_run_1st?date=2025-04-16')
+
+    assert sorted(serialized, key=str) == [None, 'under_1_run_first_inning']
+    assert api.cache.get_stats()['blob_hits'] == 0
+
+    client.get('/api/predictions?date=2025-04-16&refresh=true')
+    assert len(serialized) == 3
+
+
+def test_stale_snapshot_says_so_in_body(api, client, monkeypatch):
+    fresh = client.get('/api/predictions?date=2025-04-16')
+    snapshot, stale = api.get_predictions_snapshot(target_date='2025-04-16')
+    monkeypatch.setattr(api, 'get_predictions_snapshot', lambda force_refresh, date_str: (snapshot, True))
+
+    response = client.get('/api/predictions?date=2025-04-16', headers={'If-None-Match': fresh.headers['ETag']})
+    compressed = client.get('/api/predictions?date=2025-04-16', headers={'Accept-Encoding': 'gzip'})
+
+    assert response.status_code == 200
+    assert response.headers['ETag'] != fresh.headers['ETag']
+    assert response.headers['X-Predictions-Stale'] == 'true'
+    assert response.get_json()['metadata']['stale'] is True
+    assert response.get_json()['metadata']['age_seconds'] is None
+    assert gzip.decompress(compressed.data) == response.data
+    assert fresh.get_json()['metadata']['stale'] is False
+
+
+def test_game_lookup_uses_index(api, client, tmp_path, monkeypatch):
+    client.get('/api/predictions?date=2025-04-16')
+    monkeypatch.setattr(api, 'build_predictions', lambda *args: pytest.fail('built a slate for a game lookup'))
+
+    response = client.get('/api/games/2001')
+    entry = response.get_json()
+
+    assert response.status_code == 200
+    assert entry['date'] == '2025-04-16'
+    assert entry['game']['game_id'] == 2001
+    assert set(entry['game']['predictions']) == {'under_1_run_first_inning', 'over_2_5_runs_first_three_innings', 'over_3_5_runs_first_three_innings'}
+    assert client.get('/api/games/999999').status_code == 404
+
+    # The index is on disk, so other workers share it
+    other = MLBPredictionAPI(cache_dir=api.cache_dir)
+    other.game_index.memory.clear()
+    assert other.get_game('2001')['game'] == entry['game']
+    assert other.get_prediction_for_game_id(2001)['probability'] == entry['game']['predictions']['under_1_run_first_inning']['probability']
+
+
+def test_game_index_stays_bounded(api):
+    predictions = api.build_predictions('2025-04-16')
+    api.save_predictions('2025-04-16', predictions)
+
+    assert api.get_game(2001)['date'] == '2025-04-16'
+
+    # A game dropped from the date on a rebuild leaves the index
+    api.index_games('2025-04-16', dict(predictions, games=[game for game in predictions['games'] if game['game_id'] != 2001]))
+    assert api.get_game(2001) is None
+    assert api.get_game(2000)['date'] == '2025-04-16'
+
+    # Dates not indexed again within the final TTL are dropped
+    stale = time.time() - CACHE_TTLS['final'] - 60
+    os.utime(api.game_index.get_cache_file('date_2025-04-16'), (stale, stale))
+    api.index_games('2025-04-17', {'games': []})
+
+    assert api.get_game(2000) is None
+    assert api.game_index.keys() == ['date_2025-04-17']
+
+
+def test_filtered_predictions_match_full_list(api, client):
+    full = client.get('/api/predictions/under_1_run_1st?date=2025-04-16').get_json()['predictions']
+    response = client.get('/api/predictions/under_1_run_1st?date=2025-04-16&rating=bet,lean&min_probability=50&offset=1&limit=2&exclude=factors,stats')
+    body = response.get_json()
+
+    expected = [p for p in full if p['rating'] in ('Bet', 'Lean') and p['probability'] >= 50]
+    assert response.status_code == 200
+    assert body['metadata']['matches'] == len(expected)
+    assert [p['game_id'] for p in body['predictions']] == [p['game_id'] for p in expected[1:3]]
+    assert all('factors' not in p and 'stats' not in p['home_team'] for p in body['predictions'])
+
+    # Filtered responses have their own validators
+    assert response.headers['ETag'] != client.get('/api/predictions/under_1_run_1st?date=2025-04-16').headers['ETag']
+    assert client.get('/api/predictions/under_1_run_1st?date=2025-04-16&limit=1&fields=probability').get_json()['predictions'] == [
+        {'game_id': full[0]['game_id'], 'probability': full[0]['probability']}
+    ]
+
+
+def test_filtered_all_markets_keeps_layout(api, client):
+    full = client.get('/api/predictions?date=2025-04-16').get_json()
+    body = client.get('/api/predictions?date=2025-04-16&limit=1&exclude=factors').get_json()
+
+    top_ids = set()
+    for market in ('under_1_run_first_inning', 'over_2.5_runs_first_3_innings', 'over_3.5_runs_first_3_innings'):
+        assert body[market] == full[market][:1]
+        assert body['metadata']['matches'][market] == len(full[market])
+        top_ids.add(body[market][0]['game_id'])
+
+    assert {game['game_id'] for game in body['games']} == top_ids
+    assert all('factors' not in prediction for game in body['games'] for prediction in game['predictions'].values())
+
+
+def test_invalid_filters_rejected(api, client):
+    assert client.get('/api/predictions?date=2025-04-16&rating=maybe').status_code == 400
+    assert client.get('/api/predictions/under_1_run_1st?date=2025-04-16&limit=-1').status_code == 400
+    assert client.get('/api/predictions?date=2025-04-16&min_probability=high').status_code == 400
+
+
+def test_stream_sends_games_then_summary(api, client, monkeypatch):
+    response = client.get('/api/predictions/stream?date=2025-04-16')
+    lines = [json.loads(line) for line in response.data.splitlines()]
+
+    assert response.mimetype == 'application/x-ndjson'
+    assert [line['type'] for line in lines] == ['game', 'game', 'game', 'summary']
+    summary = lines[-1]['predictions']
+
+    # The streamed build is cached like a regular one
+    snapshot, stale = api.get_predictions_snapshot(target_date='2025-04-16')
+    assert summary['metadata']['timestamp'] == snapshot['metadata']['timestamp']
+    assert summary['under_1_run_first_inning'] == snapshot['under_1_run_first_inning']
+    assert sorted((line['game'] for line in lines[:-1]), key=lambda game: game['game_id']) == snapshot['games']
+    assert [game['game_id'] for game in api.build_predictions('2025-04-16')['games']] == [game['game_id'] for game in snapshot['games']]
+
+    # Cached predictions are replayed without fetching anything
+    monkeypatch.setattr(api, 'iter_slate', lambda *args: pytest.fail('fetched a cached slate'))
+    replay = client.get('/api/predictions/stream?date=2025-04-16&format=sse')
+    events = replay.data.decode('utf-8').strip().split('\n\n')
+
+    assert replay.mimetype == 'text/event-stream'
+    assert [event.split('\n')[0] for event in events] == ['event: game'] * 3 + ['event: summary']
+    assert json.loads(events[-1].split('data: ')[1])['predictions']['metadata']['stale'] is False
@@ -0,0 +1,62 @@
+import os
+import time
+from datetime import datetime
+from prefetch_scheduler import PrefetchScheduler
+
+
+def test_today_and_tomorrow_first(api):
+    scheduler = PrefetchScheduler(api, days=7)
+
+    dates = scheduler.get_prefetch_dates(datetime(2025, 4, 16))
+
+    assert dates[:4] == ['2025-04-16', '2025-04-17', '2025-04-15', '2025-04-18']
+    assert sorted(dates) == [f'2025-04-{day:02d}' for day in range(9, 24)]
+    assert PrefetchScheduler(api, days=0).get_prefetch_dates(datetime(2025, 4, 16)) == ['2025-04-16']
+
+
+def test_run_warms_window_once(api):
+    scheduler = PrefetchScheduler(api, days=1, pause=0)
+
+    first = scheduler.run_once()
+    second = scheduler.run_once()
+
+    assert first['built'] == 3
+    assert second['built'] == 0
+    assert len([f for f in os.listdir(api.cache_dir) if f.startswith('all_predictions_')]) == 3
+
+    status = scheduler.get_status()
+    assert status['runs'] == 2
+    assert status['queue'] == []
+    assert status['running'] is False
+    assert {timing['status'] for timing in status['dates'].values()} == {'fresh'}
+
+
+def test_thread_starts_and_stops(api, tmp_path):
+    scheduler = PrefetchScheduler(api, days=0, interval=60, pause=0, lock_file=str(tmp_path / 'prefetch.lock'))
+
+    assert scheduler.start() is True
+    assert scheduler.start() is False
+
+    deadline = time.time() + 10
+    while scheduler.get_status()['runs'] == 0 and time.time() < deadline:
+        time.sleep(0.01)
+    scheduler.stop(10)
+
+    assert scheduler.get_status()['runs'] == 1
+    assert scheduler.get_status()['running'] is False
+
+
+def test_one_scheduler_warms_at_a_time(api, tmp_path):
+    lock_file = str(tmp_path / 'prefetch.lock')
+    leader = PrefetchScheduler(api, days=0, lock_file=lock_file)
+    follower = PrefetchScheduler(api, days=0, lock_file=lock_file)
+
+    assert leader.acquire_leadership() is True
+    assert follower.acquire_leadership() is False
+    assert leader.get_status()['leader'] is True
+    assert follower.get_status()['leader'] is False
+
+    leader.stop()
+
+    assert follower.acquire_leadership() is True
+    follower.stop()
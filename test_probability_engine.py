@@ -0,0 +1,79 @@
+import random
+import pytest
+from mlb_prediction_api import MLBPredictionAPI
+from probability_engine import MARKETS, ProbabilityEngine
+
+ERAS = [None, 'N/A', '', 'abc', 0, '0.00', 1.5, '2.75', '3.10', 4, '5.67', 9.9, '12.50', -1]
+STATS = [None, 'N/A', 0, '0', '1.05', 1.4, 35, '120', '0.0', '88.1']
+
+
+def make_games(count, seed=7):
+    rng = random.Random(seed)
+    games = []
+    for i in range(count):
+        game = {'game_id': i, 'venue': f'Park {i % 5}'}
+        for side in ('home', 'away'):
+            game[f'{side}_era'] = rng.choice(ERAS)
+            for stat in ('whip', 'strikeouts', 'innings_pitched'):
+                game[f'{side}_{stat}'] = rng.choice(STATS)
+        games.append(game)
+    return games
+
+
+def scalar_scores(api, game):
+    home = api.calculate_pitcher_performance_score(game['home_era'], game['home_whip'], game['home_strikeouts'], game['home_innings_pitched'])
+    away = api.calculate_pitcher_performance_score(game['away_era'], game['away_whip'], game['away_strikeouts'], game['away_innings_pitched'])
+    return (home + away) / 2
+
+
+@pytest.fixture(params=[False, True], ids=['lists', 'numpy'])
+def engine(request):
+    if request.param:
+        pytest.importorskip('numpy')
+    return ProbabilityEngine(use_numpy=request.param)
+
+
+def test_engine_matches_scalar_path(engine, tmp_path):
+    api = MLBPredictionAPI(cache_dir=str(tmp_path))
+    games = make_games(500)
+
+    scores = engine.score_games(games)
+
+    assert scores['game_ids'] == list(range(500))
+    for index, game in enumerate(games):
+        pitcher_score = scalar_scores(api, game)
+        assert scores['pitcher_score'][index] == pitcher_score
+
+        for market, game_key, run_threshold in MARKETS:
+            if run_threshold is None:
+                probability = api.no_run_probability(pitcher_score)
+            else:
+                probability = api.over_runs_probability(pitcher_score, run_threshold)
+            assert scores[market]['probability'][index] == probability
+            assert scores[market]['rating'][index] == api.get_rating(probability)
+
+
+def test_engine_matches_era_only_predictions(engine, tmp_path):
+    api = MLBPredictionAPI(cache_dir=str(tmp_path))
+    games = [{'game_id': i, 'home_era': home, 'away_era': away} for i, (home, away) in enumerate(zip(ERAS, reversed(ERAS)))]
+
+    scores = engine.score_games(games)
+
+    for index, game in enumerate(games):
+        args = (game['home_era'], game['away_era'], 'Home', 'Away')
+        assert scores['under_1_run_first_inning']['probability'][index] == api.calculate_first_inning_no_run_probability(*args)
+        assert scores['over_3.5_runs_first_3_innings']['probability'][index] == api.calculate_first_three_innings_run_probability(*args, 3.5)
+
+        combined_era = api.era_or_default(game['home_era']) + api.era_or_default(game['away_era'])
+        assert scores['factor_pitcher_score'][index] == api.calculate_pitcher_performance_score(combined_era) / 2
+
+
+def test_park_factors_scale_probabilities(engine):
+    games = [{'game_id': 1, 'venue': 'Coors Field', 'home_era': 4.0, 'away_era': 4.0},
+             {'game_id': 2, 'venue': 'Oracle Park', 'home_era': 4.0, 'away_era': 4.0}]
+
+    scores = engine.score_games(games, park_factors={'Coors Field': 1.2})
+
+    over = scores['over_2.5_runs_first_3_innings']['probability']
+    assert over[0] == pytest.approx(over[1] * 1.2)
+    assert scores['over_2.5_runs_first_3_innings']['rating'] == ['Lean', 'Pass']
@@ -0,0 +1,62 @@
+import glob
+import json
+import os
+import pytest
+import serializer
+from tiered_cache import TieredCache
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_FILES = sorted(glob.glob(os.path.join(BASE_DIR, 'cache', '*', '*.json')))[:10] + [os.path.join(BASE_DIR, 'test_results.json')]
+AVAILABLE = [name for name in serializer.CODECS if name not in serializer.UNAVAILABLE]
+
+
+@pytest.mark.parametrize('name', AVAILABLE)
+def test_codecs_round_trip_repo_files(name):
+    codec = serializer.get_codec(name)
+
+    for path in CACHE_FILES:
+        with open(path) as f:
+            document = json.load(f)
+        assert codec.loads(codec.dumps(document)) == document
+
+
+@pytest.mark.parametrize('name', [name for name in AVAILABLE if serializer.get_codec(name).extension == '.json'])
+def test_json_codecs_are_interchangeable(name):
+    codec = serializer.get_codec(name)
+    document = {'b': [1, 2.5, None, True], 'a': {'pitcher': 'Germán Márquez'}}
+
+    assert json.loads(codec.dumps(document, sort_keys=True)) == document
+    assert codec.loads(json.dumps(document)) == document
+    assert codec.dumps(document, sort_keys=True).startswith(b'{"a"')
+
+
+def test_unavailable_codec_falls_back_to_json(monkeypatch):
+    monkeypatch.setattr(serializer, 'UNAVAILABLE', {'msgpack'})
+
+    assert serializer.get_codec('msgpack').name == 'json'
+    assert serializer.get_codec('nope').name == 'json'
+
+
+@pytest.mark.parametrize('envelope', [False, True])
+def test_binary_cache_files(tmp_path, envelope):
+    cache = TieredCache(str(tmp_path), 60, envelope=envelope, codec=serializer.get_codec('marshal'))
+    cache.set('games_2025-04-16', [{'game_id': 1, 'home_era': '3.10'}])
+    cache.memory.clear()
+
+    assert os.listdir(tmp_path) == ['games_2025-04-16.marshal']
+    assert cache.get('games_2025-04-16') == [{'game_id': 1, 'home_era': '3.10'}]
+    assert cache.keys() == ['games_2025-04-16']
+
+
+def test_unreadable_cache_file_is_a_miss(tmp_path):
+    cache = TieredCache(str(tmp_path), 60, codec=serializer.get_codec('marshal'))
+    (tmp_path / 'games_2025-04-16.marshal').write_bytes(b'not marshal data')
+
+    assert cache.get('games_2025-04-16') is None
+
+
+def test_benchmark_reports_every_codec():
+    results = serializer.benchmark(CACHE_FILES[:3], repeat=1)
+
+    assert set(results) == set(AVAILABLE)
+    assert all(result['bytes'] > 0 for result in results.values())
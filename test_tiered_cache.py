@@ -0,0 +1,168 @@
+import json
+import multiprocessing
+import os
+import time
+import tiered_cache
+from tiered_cache import TieredCache
+
+
+def test_repeat_reads_skip_the_disk(tmp_path, monkeypatch):
+    cache = TieredCache(str(tmp_path), 60)
+    (tmp_path / 'all_predictions_2025-04-16.json').write_text(json.dumps({'games': [1, 2]}))
+
+    assert cache.get('all_predictions_2025-04-16') == {'games': [1, 2]}
+
+    def no_disk(*args, **kwargs):
+        raise AssertionError('cache hit touched the filesystem')
+
+    monkeypatch.setattr(os.path, 'exists', no_disk)
+    monkeypatch.setattr(json, 'load', no_disk)
+
+    for _ in range(3):
+        assert cache.get('all_predictions_2025-04-16') == {'games': [1, 2]}
+
+    stats = cache.get_stats()
+    assert stats['disk_hits'] == 1
+    assert stats['memory_hits'] == 3
+
+
+def test_lru_eviction(tmp_path):
+    cache = TieredCache(str(tmp_path), 60, max_entries=2)
+
+    cache.set('a', 1)
+    cache.set('b', 2)
+    cache.get('a')
+    cache.set('c', 3)
+
+    assert list(cache.memory) == ['a', 'c']
+    assert cache.get_stats()['evictions'] == 1
+
+    # Evicted entries are still served from disk
+    assert cache.get('b') == 2
+    assert cache.get_stats()['disk_hits'] == 1
+
+
+def test_expiration(tmp_path):
+    cache = TieredCache(str(tmp_path), 60)
+    cache.set('team_stats_Boston Red Sox', {'team_era': '4.00'})
+
+    stale = time.time() - 120
+    os.utime(tmp_path / 'team_stats_Boston Red Sox.json', (stale, stale))
+    cache.memory.clear()
+
+    assert cache.get('team_stats_Boston Red Sox') is None
+    assert cache.get('team_stats_Boston Red Sox', max_age=300) == {'team_era': '4.00'}
+
+
+def test_memory_ttl_rereads_disk(tmp_path):
+    cache = TieredCache(str(tmp_path), 60, memory_ttl=0)
+    cache.set('games_2025-04-16', [1])
+
+    # Another process rewrites the file
+    (tmp_path / 'games_2025-04-16.json').write_text(json.dumps([1, 2]))
+
+    assert cache.get('games_2025-04-16') == [1, 2]
+
+
+def test_envelope_files_are_compatible(tmp_path):
+    cache = TieredCache(str(tmp_path), 60, envelope=True)
+    (tmp_path / 'espn_schedule.json').write_text(json.dumps({'data': ['game'], 'cache_time': time.time()}))
+
+    assert cache.get('espn_schedule') == ['game']
+
+    cache.set('weather', {'temp': 70})
+    saved = json.loads((tmp_path / 'weather.json').read_text())
+    assert saved['data'] == {'temp': 70}
+    assert time.time() - saved['cache_time'] < 5
+
+
+def test_shared_per_directory(tmp_path):
+    first = tiered_cache.get_cache(str(tmp_path), 60)
+    second = tiered_cache.get_cache(str(tmp_path) + os.sep, 60)
+
+    first.set('key', 'value')
+    first.clear()
+
+    assert first is second
+    assert second.get('key') is None
+    assert str(tmp_path) in tiered_cache.get_stats()
+
+
+def test_writes_are_atomic(tmp_path):
+    cache = TieredCache(str(tmp_path), 60)
+    cache.set('games_2025-04-16', [1, 2, 3])
+
+    # A value that fails to serialize leaves the previous file intact
+    assert cache.set('games_2025-04-16', [object()]) is False
+
+    assert json.loads((tmp_path / 'games_2025-04-16.json').read_text()) == [1, 2, 3]
+    assert sorted(os.listdir(tmp_path)) == ['games_2025-04-16.json']
+
+
+def fill_slate(cache_dir, results):
+    cache = TieredCache(cache_dir, 60)
+
+    with cache.fill_lock('all_predictions_2025-04-16'):
+        data = cache.get('all_predictions_2025-04-16')
+        if data is None:
+            with open(os.path.join(cache_dir, 'fills.log'), 'a') as f:
+                f.write('fill\n')
+            time.sleep(0.2)
+            data = {'game_count': 15}
+            cache.set('all_predictions_2025-04-16', data)
+
+    results.put(data)
+
+
+def test_single_flight_across_processes(tmp_path):
+    context = multiprocessing.get_context('fork')
+    results = context.Queue()
+    workers = [context.Process(target=fill_slate, args=(str(tmp_path), results)) for _ in range(4)]
+
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(10)
+
+    assert [results.get(timeout=1) for _ in workers] == [{'game_count': 15}] * 4
+    assert (tmp_path / 'fills.log').read_text() == 'fill\n'
+
+
+def test_derived_values_follow_their_entry(tmp_path):
+    cache = TieredCache(str(tmp_path), 60, memory_ttl=0)
+    builds = []
+
+    def build():
+        builds.append(1)
+        return b'body'
+
+    cache.set('all_predictions_2025-04-16', {'games': []})
+    assert cache.get_derived('all_predictions_2025-04-16', 'all', build) == b'body'
+    assert cache.get_derived('all_predictions_2025-04-16', 'all', build) == b'body'
+    assert len(builds) == 1
+
+    # Re-reading an unchanged file keeps them
+    assert cache.get('all_predictions_2025-04-16') == {'games': []}
+    cache.get_derived('all_predictions_2025-04-16', 'all', build)
+    assert len(builds) == 1
+
+    # Replacing the entry drops them
+    cache.set('all_predictions_2025-04-16', {'games': [1]})
+    cache.get_derived('all_predictions_2025-04-16', 'all', build)
+    assert len(builds) == 2
+
+
+def test_blobs_replace_older_versions(tmp_path):
+    cache = TieredCache(str(tmp_path), 60)
+    cache.set('all_predictions_2025-04-16', {'games': []})
+
+    cache.set_blob('all_predictions_2025-04-16', 'all', 'v1', b'one')
+    cache.set_blob('all_predictions_2025-04-16', 'under', 'v1', b'under')
+    cache.set_blob('all_predictions_2025-04-16', 'all', 'v2', b'two')
+
+    assert cache.get_blob('all_predictions_2025-04-16', 'all', 'v1') is None
+    assert cache.get_blob('all_predictions_2025-04-16', 'all', 'v2') == b'two'
+    assert cache.get_blob('all_predictions_2025-04-16', 'under', 'v1') == b'under'
+
+    cache.delete('all_predictions_2025-04-16')
+    assert [file for file in os.listdir(tmp_path) if not file.startswith('.')] == []
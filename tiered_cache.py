@@ -0,0 +1,557 @@
+import os
+import time
+import logging
+import tempfile
+import threading
+import serializer
+from collections import OrderedDict
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Not available on Windows, where fills are only single-flight per process
+    fcntl = None
+
+logger = logging.getLogger('tiered_cache')
+
+# Defaults, overridable through the environment
+DEFAULT_MEMORY_ENTRIES = int(os.environ.get('MLB_CACHE_MEMORY_ENTRIES', 256))
+DEFAULT_MEMORY_TTL = float(os.environ.get('MLB_CACHE_MEMORY_TTL', 60))
+DEFAULT_FILL_TIMEOUT = float(os.environ.get('MLB_CACHE_FILL_TIMEOUT', 120))
+
+
+class TieredCache:
+    """
+    Two-tier cache: an in-process LRU tier in front of a directory of cache files
+    """
+
+    def __init__(self, cache_dir, expiration, envelope=False, max_entries=DEFAULT_MEMORY_ENTRIES,
+                 memory_ttl=DEFAULT_MEMORY_TTL, codec=None):
+        """
+        Initialize the tiered cache
+
+        Args:
+            cache_dir: Directory holding the JSON cache files
+            expiration: Default age in seconds after which an entry is expired
+            envelope: Store files as {'data': ..., 'cache_time': ...} and expire
+                them by cache_time, instead of storing the data as-is and
+                expiring by file modification time
+            max_entries: Maximum entries kept in memory before the least
+                recently used one is evicted
+            memory_ttl: Seconds an entry is served from memory before it is
+                re-read from disk, so writes from other processes show up
+            codec: Serializer codec for the cache files (defaults to the
+                configured cache format)
+        """
+        self.cache_dir = cache_dir
+        self.expiration = expiration
+        self.envelope = envelope
+        self.max_entries = max_entries
+        self.memory_ttl = memory_ttl
+        self.codec = codec or serializer.get_cache_codec()
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+        # key -> (data, stored_time, loaded_time, derived), least recently
+        # used first. derived holds values built from data by get_derived.
+        self.memory = OrderedDict()
+        self.lock = threading.Lock()
+
+        # Per-key locks so only one thread in this process fills a key
+        self.fill_locks = {}
+
+        self.stats = {
+            'memory_hits': 0,
+            'disk_hits': 0,
+            'misses': 0,
+            'evictions': 0,
+            'expirations': 0,
+            'writes': 0,
+            'fills': 0,
+            'fill_wait_seconds': 0.0,
+            'blob_hits': 0,
+            'blob_writes': 0,
+            'derived_hits': 0
+        }
+
+    def get_cache_file(self, key):
+        """
+        Get the path of the cache file for a key
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Path to the cache file
+        """
+        return os.path.join(self.cache_dir, f"{key}{self.codec.extension}")
+
+    def get(self, key, max_age=None):
+        """
+        Get an entry if it exists and is not expired
+
+        Args:
+            key: Cache key
+            max_age: Age in seconds after which the entry is expired
+                (defaults to the cache's expiration), or a function taking
+                the cached data and returning that age
+
+        Returns:
+            Cached data if it exists and is not expired, None otherwise
+        """
+        max_age = self.expiration if max_age is None else max_age
+        current_time = time.time()
+
+        with self.lock:
+            entry = self.memory.get(key)
+            if entry:
+                data, stored_time, loaded_time, derived = entry
+                entry_max_age = max_age(data) if callable(max_age) else max_age
+                if current_time - stored_time < entry_max_age and current_time - loaded_time < self.memory_ttl:
+                    self.memory.move_to_end(key)
+                    self.stats['memory_hits'] += 1
+                    return data
+
+                del self.memory[key]
+                self.stats['expirations'] += 1
+
+        data, stored_time = self.read_file(key, None if callable(max_age) else max_age)
+
+        if stored_time is not None and callable(max_age):
+            max_age = max_age(data)
+
+        if stored_time is None or current_time - stored_time >= max_age:
+            with self.lock:
+                self.stats['misses'] += 1
+            if stored_time is not None:
+                logger.info(f"Cache expired for {key}")
+            return None
+
+        with self.lock:
+            self.stats['disk_hits'] += 1
+            # Values derived from an unchanged file are still valid
+            if entry and entry[1] == stored_time:
+                self.remember(key, data, stored_time, current_time, entry[3])
+            else:
+                self.remember(key, data, stored_time, current_time)
+
+        return data
+
+    def read_file(self, key, max_age):
+        """
+        Read an entry from disk
+
+        Args:
+            key: Cache key
+            max_age: Age in seconds after which the entry is expired, or
+                None if it depends on the data
+
+        Returns:
+            Tuple of (data, stored_time), or (None, None) if the file is
+            missing or unreadable
+        """
+        cache_file = self.get_cache_file(key)
+
+        if not os.path.exists(cache_file):
+            return None, None
+
+        try:
+            if not self.envelope:
+                # Check the modification time before paying for the parse
+                stored_time = os.path.getmtime(cache_file)
+                if max_age is not None and time.time() - stored_time >= max_age:
+                    return None, stored_time
+
+            with open(cache_file, 'rb') as f:
+                data = self.codec.loads(f.read())
+
+            if self.envelope:
+                return data.get('data'), data.get('cache_time', 0)
+
+            return data, stored_time
+        except Exception as e:
+            logger.error(f"Error reading cache file {cache_file}: {e}")
+            return None, None
+
+    def set(self, key, data):
+        """
+        Save an entry to memory and disk
+
+        Args:
+            key: Cache key
+            data: JSON-serializable data
+
+        Returns:
+            True if the entry was written to disk, False otherwise
+        """
+        current_time = time.time()
+
+        with self.lock:
+            self.stats['writes'] += 1
+            self.remember(key, data, current_time, current_time)
+
+        try:
+            if self.envelope:
+                contents = self.codec.dumps({'data': data, 'cache_time': current_time})
+            else:
+                contents = self.codec.dumps(data)
+        except (TypeError, ValueError) as e:
+            logger.error(f"Error serializing cache entry {key}: {e}")
+            return False
+
+        cache_file = self.get_cache_file(key)
+        if not self.write_file(key, cache_file, contents):
+            return False
+
+        if not self.envelope:
+            # Plain files are versioned by modification time, so use it for
+            # the memory entry too and later re-reads are recognized as the
+            # same version
+            try:
+                stored_time = os.path.getmtime(cache_file)
+            except OSError:
+                return True
+
+            with self.lock:
+                entry = self.memory.get(key)
+                if entry and entry[0] is data:
+                    self.memory[key] = (data, stored_time, entry[2], entry[3])
+
+        return True
+
+    def write_file(self, key, path, contents):
+        """
+        Write a file atomically
+
+        The contents go to a temporary file that is renamed over the target,
+        so readers in other workers never see a half-written file.
+
+        Args:
+            key: Cache key the file belongs to
+            path: File path
+            contents: Bytes to write
+
+        Returns:
+            True if the file was written, False otherwise
+        """
+        fd, temp_file = tempfile.mkstemp(dir=self.cache_dir, prefix=f".{key}.", suffix='.tmp')
+
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(contents)
+                f.flush()
+                os.fsync(f.fileno())
+
+            os.replace(temp_file, path)
+            return True
+        except Exception as e:
+            logger.error(f"Error saving to cache file {path}: {e}")
+            try:
+                os.remove(temp_file)
+            except OSError:
+                pass
+            return False
+
+    def get_blob_file(self, key, name, tag):
+        """
+        Get the path of a binary file stored next to a key's JSON file
+
+        Args:
+            key: Cache key
+            name: Blob name (no dots)
+            tag: Version tag of the blob (no dots)
+
+        Returns:
+            Path to the blob file
+        """
+        return os.path.join(self.cache_dir, f"{key}.{name}.{tag}.gz")
+
+    def get_blob(self, key, name, tag):
+        """
+        Read a blob stored for a key
+
+        Blobs are derived from the key's data (such as a compressed response
+        body), and the tag identifies which version of the data they came
+        from, so a blob with a matching tag is never out of date.
+
+        Args:
+            key: Cache key
+            name: Blob name
+            tag: Version tag of the blob
+
+        Returns:
+            Blob bytes, or None if there is no blob with that name and tag
+        """
+        try:
+            with open(self.get_blob_file(key, name, tag), 'rb') as f:
+                contents = f.read()
+        except OSError:
+            return None
+
+        with self.lock:
+            self.stats['blob_hits'] += 1
+
+        return contents
+
+    def set_blob(self, key, name, tag, contents):
+        """
+        Store a blob for a key, replacing other versions of it
+
+        Args:
+            key: Cache key
+            name: Blob name
+            tag: Version tag of the blob
+            contents: Bytes to store
+
+        Returns:
+            True if the blob was written, False otherwise
+        """
+        self.delete_blobs(key, name, keep=tag)
+
+        with self.lock:
+            self.stats['blob_writes'] += 1
+
+        return self.write_file(key, self.get_blob_file(key, name, tag), contents)
+
+    def delete_blobs(self, key, name=None, keep=None):
+        """
+        Remove the blobs stored for a key
+
+        Args:
+            key: Cache key
+            name: Only remove blobs with this name
+            keep: Tag of a blob to keep
+        """
+        for file in os.listdir(self.cache_dir):
+            if not file.endswith('.gz') or file.startswith('.'):
+                continue
+
+            parts = file[:-len('.gz')].rsplit('.', 2)
+            if len(parts) != 3:
+                continue
+
+            blob_key, blob_name, tag = parts
+            if blob_key == key and name in (None, blob_name) and tag != keep:
+                try:
+                    os.remove(os.path.join(self.cache_dir, file))
+                except OSError:
+                    pass
+
+    @contextmanager
+    def fill_lock(self, key, timeout=DEFAULT_FILL_TIMEOUT):
+        """
+        Hold the fill lock for a key, shared by all worker processes
+
+        Callers check the cache again once the lock is held, so only the
+        first caller after an expiry fetches from upstream and the rest reuse
+        its result. If the lock is not acquired within the timeout, the
+        caller proceeds without it.
+
+        Args:
+            key: Cache key being filled
+            timeout: Seconds to wait for another filler to finish
+        """
+        start_time = time.time()
+
+        with self.lock:
+            key_lock = self.fill_locks.setdefault(key, threading.Lock())
+
+        thread_locked = key_lock.acquire(timeout=timeout)
+        lock_file = None
+
+        try:
+            if fcntl is not None:
+                lock_file = open(os.path.join(self.cache_dir, f".{key}.lock"), 'a')
+                while True:
+                    try:
+                        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                        break
+                    except BlockingIOError:
+                        if time.time() - start_time >= timeout:
+                            logger.warning(f"Timed out waiting to fill {key}, filling without the lock")
+                            lock_file.close()
+                            lock_file = None
+                            break
+                        time.sleep(0.05)
+
+            with self.lock:
+                self.stats['fills'] += 1
+                self.stats['fill_wait_seconds'] += time.time() - start_time
+
+            yield
+        finally:
+            if lock_file is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+                lock_file.close()
+            if thread_locked:
+                key_lock.release()
+
+    def remember(self, key, data, stored_time, loaded_time, derived=None):
+        """
+        Put an entry in the memory tier, evicting the least recently used
+        entries when it is full. Callers must hold the lock.
+
+        Args:
+            key: Cache key
+            data: Cached data
+            stored_time: Time the data was written
+            loaded_time: Time the data entered memory
+            derived: Values already derived from this version of the data
+        """
+        self.memory[key] = (data, stored_time, loaded_time, {} if derived is None else derived)
+        self.memory.move_to_end(key)
+
+        while len(self.memory) > self.max_entries:
+            self.memory.popitem(last=False)
+            self.stats['evictions'] += 1
+
+    def get_derived(self, key, name, build):
+        """
+        Get a value derived from an entry's data, building it on first use
+
+        Derived values (such as serialized response bodies) live in the
+        entry's memory slot, so they are dropped together with the data when
+        the entry is replaced or evicted. Names should identify the version
+        of the data they were built from.
+
+        Args:
+            key: Cache key
+            name: Name of the derived value
+            build: Function returning the value
+
+        Returns:
+            Derived value
+        """
+        with self.lock:
+            entry = self.memory.get(key)
+            if entry and name in entry[3]:
+                self.stats['derived_hits'] += 1
+                return entry[3][name]
+
+        value = build()
+
+        with self.lock:
+            entry = self.memory.get(key)
+            if entry:
+                entry[3][name] = value
+
+        return value
+
+    def get_age(self, key):
+        """
+        Get how long ago an entry was written, whether or not it is expired
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Age in seconds, or None if there is no entry
+        """
+        if self.envelope:
+            with self.lock:
+                entry = self.memory.get(key)
+            stored_time = entry[1] if entry else self.read_file(key, None)[1]
+        else:
+            # The modification time also reflects writes from other processes
+            try:
+                stored_time = os.path.getmtime(self.get_cache_file(key))
+            except OSError:
+                stored_time = None
+
+        return None if stored_time is None else time.time() - stored_time
+
+    def keys(self):
+        """
+        List the keys stored on disk
+
+        Returns:
+            List of cache keys
+        """
+        extension = self.codec.extension
+        return [file[:-len(extension)] for file in os.listdir(self.cache_dir) if file.endswith(extension)]
+
+    def delete(self, key):
+        """
+        Remove an entry from memory and disk
+
+        Args:
+            key: Cache key
+        """
+        with self.lock:
+            self.memory.pop(key, None)
+
+        cache_file = self.get_cache_file(key)
+        if os.path.exists(cache_file):
+            os.remove(cache_file)
+
+        self.delete_blobs(key)
+
+    def clear(self):
+        """Remove all entries from memory and disk"""
+        with self.lock:
+            self.memory.clear()
+
+        for file in os.listdir(self.cache_dir):
+            if file.endswith((self.codec.extension, '.gz')):
+                os.remove(os.path.join(self.cache_dir, file))
+
+    def get_stats(self):
+        """
+        Get cache counters
+
+        Returns:
+            Hit, miss, eviction and size counters
+        """
+        with self.lock:
+            stats = dict(self.stats)
+            stats['memory_entries'] = len(self.memory)
+
+        lookups = stats['memory_hits'] + stats['disk_hits'] + stats['misses']
+        stats['hit_ratio'] = round((stats['memory_hits'] + stats['disk_hits']) / lookups, 3) if lookups else None
+        stats['fill_wait_seconds'] = round(stats['fill_wait_seconds'], 3)
+        stats['max_entries'] = self.max_entries
+        stats['codec'] = self.codec.name
+        stats['memory_ttl'] = self.memory_ttl
+
+        return stats
+
+
+# Process-wide caches, one per cache directory
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_cache(cache_dir, expiration, envelope=False):
+    """
+    Get the shared cache for a directory, creating it on first use
+
+    Instances of the same class (or different classes) using one directory
+    share a memory tier.
+
+    Args:
+        cache_dir: Directory holding the JSON cache files
+        expiration: Default expiration in seconds
+        envelope: Whether files use the {'data', 'cache_time'} format
+
+    Returns:
+        Shared TieredCache
+    """
+    key = (os.path.abspath(cache_dir), envelope)
+
+    with _caches_lock:
+        if key not in _caches:
+            _caches[key] = TieredCache(cache_dir, expiration, envelope=envelope)
+        return _caches[key]
+
+
+def get_stats():
+    """
+    Get counters for every shared cache
+
+    Returns:
+        Dictionary mapping cache directory to cache counters
+    """
+    with _caches_lock:
+        caches = list(_caches.values())
+
+    return {cache.cache_dir: cache.get_stats() for cache in caches}
@@ -1,4 +1,5 @@
-import requests
+import http_session
+import tiered_cache
 import json
 import os
 from datetime import datetime
@@ -14,40 +15,15 @@ class WeatherAPI:
         self.cache_dir = 'cache/weather'
         self.cache_expiry = 3600 * 3  # Cache expiry in seconds (3 hours)
         os.makedirs(self.cache_dir, exist_ok=True)
+        self.cache = tiered_cache.get_cache(self.cache_dir, self.cache_expiry, envelope=True)
     
     def get_cached_data(self, city):
         """Get weather data from cache if available and not expired"""
-        cache_file = os.path.join(self.cache_dir, f"{city.replace(',', '_')}.json")
-        
-        if os.path.exists(cache_file):
-            try:
-                with open(cache_file, 'r') as f:
-                    cached_data = json.load(f)
-                
-                # Check if cache is expired
-                cache_time = cached_data.get('cache_time', 0)
-                if (datetime.now() - datetime.fromtimestamp(cache_time)).total_seconds() < self.cache_expiry:
-                    return cached_data.get('data')
-            except Exception as e:
-                print(f"Error reading weather cache: {e}")
-        
-        return None
+        return self.cache.get(city.replace(',', '_'), self.cache_expiry)
     
     def save_to_cache(self, city, data):
         """Save weather data to cache"""
-        cache_file = os.path.join(self.cache_dir, f"{city.replace(',', '_')}.json")
-        
-        try:
-            with open(cache_file, 'w') as f:
-                json.dump({
-                    'data': data,
-                    'cache_time': datetime.now().timestamp()
-                }, f)
-            
-            return True
-        except Exception as e:
-            print(f"Error saving weather to cache: {e}")
-            return False
+        return self.cache.set(city.replace(',', '_'), data)
     
     def get_weather(self, city):
         """
@@ -60,7 +36,7 @@ class WeatherAPI:
         
         try:
             url = f"https://api.openweathermap.org/data/2.5/weather?q={city}&appid={self.api_key}&units=imperial"
-            response = requests.get(url)
+            response = http_session.get(url)
             data = response.json()
             
             if data.get('cod') != 200: